@@ -7,16 +7,25 @@ Designed for 3rd-6th class county finance departments
 
 import streamlit as st
 import pandas as pd
-import sys
-import tempfile
 import os
+import sys
+import time
 from pathlib import Path
 from io import BytesIO
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
-from data_ingestion import BudgetDataIngester
+from data_validation import VALIDATION_RULES
+from detail_query import FILTER_COLUMNS, RULE_FILTER, DetailQuery
+from pipeline_metrics import PipelineMetrics
+from ingest_cache import IngestCache, content_hash
+from job_runner import JOB_DONE, JOB_QUEUED, JOB_RUNNING, JobRunner, ingest_job
+from memory_cache import MemoryLRU
+from trend_series import DEFAULT_TOP_N, OTHER_LABEL
+from vendor_schemas import get_schema, schema_names
+# forecasting, narratives and export_writer are imported where first used,
+# so cold start pays only for streamlit and the ingestion core
 
 # Page configuration
 st.set_page_config(
@@ -63,24 +72,228 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_ingest_cache():
+    """Shared on-disk cache of processed exports"""
+    return IngestCache()
+
+# Seconds between status checks while a background job runs
+JOB_POLL_SECONDS = 0.5
+
+# Memory budget for processed uploads and export files kept across reruns
+RESULT_CACHE_BYTES = 1024 ** 3
+
+@st.cache_resource
+def get_result_cache():
+    """Processed uploads and built exports shared by all sessions"""
+    return MemoryLRU(max_bytes=RESULT_CACHE_BYTES)
+
+def upload_key(uploaded_file, system):
+    """Cache key for an upload: content hash and system type (hashed once per upload)"""
+    hashes = st.session_state.setdefault('upload_hashes', {})
+    file_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    if file_id not in hashes:
+        hashes[file_id] = content_hash(uploaded_file.getvalue())
+    return f"{hashes[file_id]}:{system}"
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def summary_views(data_key, _ingester):
+    """
+    Totals and formatted fund summary for processed data
+    
+    Keyed by data_key only; the ingester argument is not hashed.
+    Totals come from the rollup cube, so a workspace server dataset needs
+    no detail rows here.
+    """
+    sums = _ingester.get_rollup_cube().query([])
+    totals = {col: float(sums[col].iloc[0]) for col in sums.columns if len(sums)}
+    
+    summary = _ingester.get_fund_summary()
+    display_summary = format_for_display(summary) if not summary.empty else summary
+    return totals, display_summary
+
+@st.cache_resource
+def get_forecast_cache():
+    """On-disk cache of fitted forecast models shared by all sessions"""
+    from forecasting import ForecastCache
+    return ForecastCache()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def fund_forecast(data_key, _ingester, horizon, value_column):
+    """Per-fund projections for processed data, keyed by data_key"""
+    from forecasting import forecast_summary
+    return forecast_summary(
+        _ingester.get_fund_summary(),
+        horizon=horizon,
+        value_column=value_column,
+        cache=get_forecast_cache()
+    )
+
+@st.cache_resource
+def get_narrative_cache():
+    """On-disk cache of generated narratives shared by all sessions"""
+    from narratives import NarrativeCache
+    return NarrativeCache()
+
+def narratives_configured():
+    """Narratives need a real model backend; the offline stub is for tests and benchmarks"""
+    return bool(os.environ.get('OPENAI_API_KEY'))
+
+def fund_narratives(data_key, ingester):
+    """Narrative per fund; complete sets are kept in the result cache for later reruns"""
+    cache = get_result_cache()
+    narratives = cache.get(('narratives', data_key))
+    if narratives is None:
+        from narratives import NarrativeGenerator, OpenAIBackend, generate_fund_narratives
+        
+        generator = NarrativeGenerator(OpenAIBackend(), get_narrative_cache())
+        cube = ingester.get_rollup_cube()
+        dept_summary = None
+        if {'dept_code', 'fiscal_year'} <= set(cube.dimensions):
+            dept_summary = cube.query(['fund_code', 'dept_code', 'fiscal_year']).dropna(subset=['dept_code'])
+        narratives = generate_fund_narratives(ingester.get_fund_summary(), generator=generator,
+                                              dept_summary=dept_summary)
+        # Failed funds come back empty; only keep a complete set so a retry asks again
+        if (narratives['narrative'] != '').all():
+            cache.put(('narratives', data_key), narratives)
+    return narratives
+
+@st.cache_resource
+def get_job_runner():
+    """Worker pool shared by all sessions for processing uploads"""
+    return JobRunner()
+
+@st.cache_resource
+def get_workspace_client():
+    """Client of the shared workspace server when BUDGETBUDDY_SERVER_URL is set, else None"""
+    if not os.environ.get('BUDGETBUDDY_SERVER_URL'):
+        return None
+    from workspace_server import WorkspaceClient
+    return WorkspaceClient()
+
+def job_status(job_id):
+    """Status snapshot of an upload job, from the workspace server or the local pool"""
+    client = get_workspace_client()
+    if client is None:
+        return get_job_runner().status(job_id)
+    from workspace_server import WorkspaceError
+    try:
+        return client.job(job_id)
+    except WorkspaceError:
+        return None
+
+def open_dataset(client, county, dataset):
+    """(RemoteDataset, is_valid, issues) of a processed dataset on the workspace server"""
+    remote = client.open(county, dataset)
+    return remote, remote.is_valid, remote.issues
+
+def job_result(job_id, data_key):
+    """(ingester, is_valid, issues) of a finished upload job"""
+    client = get_workspace_client()
+    if client is None:
+        return get_job_runner().result(job_id)
+    # Server data keys are "county:dataset"
+    return open_dataset(client, *data_key.split(':'))
+
+def row_count(ingester):
+    """Cleaned line items of a local ingester or a workspace server dataset"""
+    if get_workspace_client() is not None:
+        return ingester.rows
+    return len(ingester.standardized_data)
+
 def format_currency(value):
     """Format number as currency"""
     return f"${value:,.2f}"
 
-def create_excel_download(ingester):
-    """Create Excel file in memory for download"""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # Detail sheet
-        ingester.standardized_data.to_excel(writer, sheet_name='Detail', index=False)
-        
-        # Fund summary sheet
-        summary = ingester.get_fund_summary()
-        if not summary.empty:
-            summary.to_excel(writer, sheet_name='Fund Summary', index=False)
+def format_for_display(frame):
+    """Copy of a (small) frame with currency and percent columns as text"""
+    display = frame.copy()
+    for col in ['budgeted_amount', 'actual_amount', 'variance', 'forecast', 'lower', 'upper']:
+        if col in display.columns:
+            display[col] = display[col].astype('float64').map('${:,.2f}'.format)
+    if 'variance_pct' in display.columns:
+        display['variance_pct'] = display['variance_pct'].astype('float64').map('{:.2f}%'.format)
+    return display
+
+def get_detail_query(data_key, ingester):
+    """Indexed query layer over processed data, shared across reruns and sessions"""
+    cache = get_result_cache()
+    query = cache.get(('query', data_key))
+    if query is None:
+        if not st.session_state.get('is_valid', True):
+            ingester.invalid_rows()  # make sure row flags exist
+        query = DetailQuery(ingester.standardized_data, ingester.validation_flags)
+        # Indexes hold one position per row for each filter column
+        cache.put(('query', data_key), query, size=len(query) * 8 * len(FILTER_COLUMNS))
+    return query
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def detail_options(data_key, _ingester):
+    """
+    (columns, filter options, rows per validation rule, total rows) for the detail tab
+    
+    Keyed by data_key only; the ingester argument is not hashed.
+    """
+    if get_workspace_client() is not None:
+        # Every page carries these; a one-row page is enough
+        first_rows, info = _ingester.detail_page(page_size=1)
+        return list(first_rows.columns), info['options'], info['rule_counts'], info['rows_total']
+    query = get_detail_query(data_key, _ingester)
+    columns = list(query.df.columns)
+    options = {col: query.options(col) for col in FILTER_COLUMNS if col in columns}
+    return columns, options, query.rule_counts(), len(query)
+
+def show_processing_result(ingester, is_valid, issues, seconds=None):
+    """Validation warnings and success message for a finished ingest"""
+    if not is_valid:
+        st.markdown('<div class="warning-box">', unsafe_allow_html=True)
+        st.warning("⚠️ Data Quality Issues Detected")
+        for issue in issues:
+            st.write(f"- {issue}")
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.info("Proceeding with data cleaning - please review results carefully")
+    
+    if ingester.detected_system and st.session_state.get('system_choice') == "auto":
+        st.caption(f"Detected system: {get_schema(ingester.detected_system).label}")
+    
+    timing = f" in {seconds:.1f}s" if seconds is not None else " (cached)"
+    st.markdown('<div class="success-box">', unsafe_allow_html=True)
+    st.success(f"✓ Successfully processed {row_count(ingester):,} budget line items{timing}!")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Download formats offered on the Export tab: label -> (suffix, mime type)
+EXPORT_FORMATS = {
+    "Excel report (.xlsx)": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Compressed CSV (.csv.gz)": (".csv.gz", "application/gzip"),
+    "Parquet (.parquet)": (".parquet", "application/octet-stream"),
+}
+
+def create_excel_download(detail, summary):
+    """Create Excel file in memory for download (streaming workbook)"""
+    from export_writer import excel_bytes
+    return excel_bytes(detail, summary)
+
+def create_download(ingester, suffix):
+    """Build the export file for the chosen format in memory"""
+    from export_writer import write_csv, write_parquet
+    
+    if get_workspace_client() is not None:
+        if suffix == ".parquet":
+            return ingester.detail_parquet()
+        # Exports are the one view that needs every row; fetched only for this build
+        detail = ingester.detail()
+    else:
+        detail = ingester.standardized_data
+    
+    if suffix == ".xlsx":
+        return create_excel_download(detail, ingester.get_fund_summary())
     
-    output.seek(0)
-    return output
+    output = BytesIO()
+    if suffix == ".parquet":
+        write_parquet(detail, output)
+    else:
+        write_csv(detail, output, compression={'method': 'gzip'})
+    return output.getvalue()
 
 def main():
     # Header
@@ -111,6 +324,22 @@ def main():
         - 📞 Phone: (435) 830-3452
         """)
         
+        client = get_workspace_client()
+        if client is not None:
+            st.markdown("---")
+            county = st.text_input(
+                "🏛️ County workspace",
+                value=os.environ.get('BUDGETBUDDY_COUNTY', 'default'),
+                help="Uploads are processed once per county on the shared server; "
+                     "everyone in the workspace sees the same results"
+            )
+        
+        st.markdown("---")
+        collect_metrics = st.checkbox(
+            "🩺 Pipeline diagnostics",
+            help="Time each processing stage and track peak memory (slower)"
+        )
+        
         st.markdown("---")
         st.caption("Built for Utah counties by financial data experts")
     
@@ -119,28 +348,38 @@ def main():
     
     col1, col2 = st.columns(2)
     with col1:
-        system_type = st.radio(
+        system = st.radio(
             "Which system does your county use?",
-            options=["Munis (Tyler Technologies)", "Caselle (Harris Computer)"],
-            help="Select your county's financial management system"
+            options=["auto"] + schema_names(),
+            key="system_choice",
+            format_func=lambda name: "Auto-detect from file" if name == "auto" else get_schema(name).label,
+            help="Select your county's financial management system, or let BudgetBuddy "
+                 "recognize it from the export's column headers"
         )
     
-    system = "munis" if "Munis" in system_type else "caselle"
-    
     with col2:
-        st.info(f"""
-        **Selected: {system_type}**
-        
-        BudgetBuddy will automatically map your {system_type.split()[0]} 
-        export columns to a standardized format.
-        """)
+        if system == "auto":
+            st.info("""
+            **Selected: Auto-detect**
+            
+            BudgetBuddy will recognize your system from the export's column
+            headers and map them to a standardized format.
+            """)
+        else:
+            system_type = get_schema(system).label
+            st.info(f"""
+            **Selected: {system_type}**
+            
+            BudgetBuddy will automatically map your {system_type.split()[0]} 
+            export columns to a standardized format.
+            """)
     
     st.markdown("---")
     st.markdown("## Step 2: Upload Your Budget Export")
     
     # File upload with instructions
     with st.expander("📋 How to export from your system", expanded=False):
-        if system == "munis":
+        if system in ("auto", "munis"):
             st.markdown("""
             **Munis Export Instructions:**
             1. Navigate to: General Ledger → Reports → Budget vs Actual
@@ -148,7 +387,7 @@ def main():
             3. Include columns: Fund, Department, Account, FY, Budget, Actual, Encumbrance
             4. Export as CSV or Excel
             """)
-        else:
+        if system in ("auto", "caselle"):
             st.markdown("""
             **Caselle Export Instructions:**
             1. Navigate to: Financial Reports → Budget Detail
@@ -160,7 +399,7 @@ def main():
     uploaded_file = st.file_uploader(
         "Upload your budget export file",
         type=['csv', 'xlsx', 'xls'],
-        help="Accepts CSV or Excel files from Munis or Caselle"
+        help="Accepts CSV or Excel files from Munis, Caselle, Incode or Springbrook"
     )
     
     if uploaded_file is not None:
@@ -169,53 +408,85 @@ def main():
         
         # Process button
         if st.button("🚀 Process Budget Data", type="primary", use_container_width=True):
-            with st.spinner("Processing your budget data..."):
+            for key in ['ingester', 'is_valid', 'data_key', 'job_id']:
+                st.session_state.pop(key, None)
+            
+            if client is not None:
+                # The server shares processing and results across sessions
                 try:
-                    # Initialize ingester
-                    ingester = BudgetDataIngester(system_type=system)
-                    
-                    # Save uploaded file temporarily (Windows-compatible)
-                    temp_dir = tempfile.gettempdir()
-                    temp_path = os.path.join(temp_dir, uploaded_file.name)
-                    with open(temp_path, 'wb') as f:
-                        f.write(uploaded_file.getvalue())
-                    
-                    # Process data
-                    ingester.load_file(temp_path)
-                    ingester.standardize_columns()
-                    is_valid, issues = ingester.validate_data()
-                    
-                    # Show validation results
-                    if not is_valid:
-                        st.markdown('<div class="warning-box">', unsafe_allow_html=True)
-                        st.warning("⚠️ Data Quality Issues Detected")
-                        for issue in issues:
-                            st.write(f"- {issue}")
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        st.info("Proceeding with data cleaning - please review results carefully")
-                    
-                    # Clean data
-                    df = ingester.clean_data()
-                    
-                    # Success message
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.success(f"✓ Successfully processed {len(df):,} budget line items!")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    # Store in session state
-                    st.session_state.ingester = ingester
-                    st.session_state.processed_data = df
-                    st.session_state.is_valid = is_valid
-                    
+                    record = client.upload(county, uploaded_file.getvalue(), system, uploaded_file.name)
                 except Exception as e:
-                    st.error(f"Error processing file: {str(e)}")
-                    st.info("Please check that your file matches the expected format for your system")
+                    st.error(f"Workspace server unavailable: {e}")
                     return
+                data_key = f"{record['county']}:{record['dataset']}"
+                if record['status'] == 'processing':
+                    st.session_state.job_id = record['job_id']
+                    st.session_state.job_data_key = data_key
+                    cached = None
+                else:
+                    cached = get_result_cache().get_or_create(
+                        ('ingest', data_key), lambda: open_dataset(client, record['county'], record['dataset'])
+                    )
+            else:
+                data_key = upload_key(uploaded_file, system)
+                cached = get_result_cache().get(('ingest', data_key))
+            if cached is not None:
+                # Same export already processed in this server: no job at all
+                ingester, is_valid, issues = cached
+                show_processing_result(ingester, is_valid, issues)
+                st.session_state.ingester = ingester
+                st.session_state.is_valid = is_valid
+                st.session_state.data_key = data_key
+            elif client is None:
+                # Process the uploaded bytes in place, off the request path
+                # (reuses on-disk cached results for identical exports);
+                # this session polls until the job is done
+                st.session_state.job_id = get_job_runner().submit(
+                    ingest_job, uploaded_file.getvalue(), system,
+                    cache=get_ingest_cache(),
+                    metrics=PipelineMetrics(enabled=collect_metrics, track_memory=True),
+                    name=uploaded_file.name,
+                    label=uploaded_file.name
+                )
+                st.session_state.job_data_key = data_key
+        
+        if 'job_id' in st.session_state:
+            job = job_status(st.session_state.job_id)
+            
+            if job is not None and job['status'] in (JOB_QUEUED, JOB_RUNNING):
+                stage = job['stage'] or 'waiting for a free worker'
+                st.progress(job['progress'], text=f"Processing {job['label']}: {stage.replace('_', ' ')}...")
+                time.sleep(JOB_POLL_SECONDS)
+                st.rerun()
+            
+            job_id = st.session_state.pop('job_id')
+            data_key = st.session_state.pop('job_data_key')
+            
+            if job is None or job['status'] != JOB_DONE:
+                error = job['error'] if job else "job expired"
+                st.error(f"Error processing file: {error}")
+                st.info("Please check that your file matches the expected format for your system")
+                return
+            
+            result = job_result(job_id, data_key)
+            get_result_cache().put(('ingest', data_key), result)
+            ingester, is_valid, issues = result
+            show_processing_result(ingester, is_valid, issues, job['run_seconds'])
+            
+            # Store in session state
+            st.session_state.ingester = ingester
+            st.session_state.is_valid = is_valid
+            st.session_state.data_key = data_key
         
         # Display results if processed
-        if 'processed_data' in st.session_state:
-            df = st.session_state.processed_data
+        if 'ingester' in st.session_state:
             ingester = st.session_state.ingester
+            data_key = st.session_state.data_key
+            totals, display_summary = summary_views(data_key, ingester)
+            # Trends, year-over-year, narratives and forecasts need fiscal years;
+            # exports without a fiscal year column still get the other views
+            cube = ingester.get_rollup_cube()
+            has_years = 'fiscal_year' in cube.dimensions
             
             st.markdown("---")
             st.markdown("## 📈 Budget Summary")
@@ -223,8 +494,8 @@ def main():
             # Key metrics
             col1, col2, col3, col4 = st.columns(4)
             
-            total_budget = df['budgeted_amount'].sum()
-            total_actual = df['actual_amount'].sum()
+            total_budget = totals.get('budgeted_amount', 0.0)
+            total_actual = totals.get('actual_amount', 0.0)
             total_variance = total_actual - total_budget
             variance_pct = (total_variance / total_budget * 100) if total_budget != 0 else 0
             
@@ -252,73 +523,196 @@ def main():
                 )
             
             with col4:
-                if 'encumbered_amount' in df.columns:
-                    total_encumbered = df['encumbered_amount'].sum()
+                if 'encumbered_amount' in totals:
                     st.metric(
                         "Encumbrances",
-                        format_currency(total_encumbered),
+                        format_currency(totals['encumbered_amount']),
                         help="Outstanding purchase orders and commitments"
                     )
             
+            if client is None and ingester.metrics.enabled and ingester.metrics.stages:
+                with st.expander("🩺 Pipeline Diagnostics", expanded=False):
+                    st.caption(f"Total: {ingester.metrics.total_seconds:.3f}s")
+                    st.dataframe(
+                        ingester.metrics.to_frame(),
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            'seconds': st.column_config.NumberColumn('Seconds', format="%.3f"),
+                            'rows_per_sec': st.column_config.NumberColumn('Rows/sec', format="%.0f"),
+                            'peak_memory_mb': st.column_config.NumberColumn('Peak MB', format="%.1f"),
+                        }
+                    )
+            
             # Tabs for different views
-            tab1, tab2, tab3 = st.tabs(["📊 Fund Summary", "📋 Detail Data", "📁 Export"])
+            tab1, tab2, tab3, tab4 = st.tabs(["📊 Fund Summary", "📋 Detail Data", "🔮 Forecast", "📁 Export"])
             
             with tab1:
                 st.markdown("### Fund-Level Summary")
-                summary = ingester.get_fund_summary()
                 
-                if not summary.empty:
-                    # Format currency columns
-                    display_summary = summary.copy()
-                    for col in ['budgeted_amount', 'actual_amount', 'variance']:
-                        if col in display_summary.columns:
-                            display_summary[col] = display_summary[col].apply(format_currency)
-                    
-                    if 'variance_pct' in display_summary.columns:
-                        display_summary['variance_pct'] = display_summary['variance_pct'].apply(
-                            lambda x: f"{x:.2f}%"
-                        )
-                    
+                if not display_summary.empty:
                     st.dataframe(
                         display_summary,
                         use_container_width=True,
                         hide_index=True
                     )
                     
-                    # Chart
-                    if 'fiscal_year' in summary.columns and len(summary['fiscal_year'].unique()) > 1:
+                    # Cube sums and chart series are computed where the data lives
+                    # (the workspace server, or this process without one)
+                    funds = cube.query(['fund_code'])['fund_code'].dropna().tolist()
+                    
+                    # Chart: precomputed series, top funds only, the rest summed as "Other"
+                    trends = ingester.get_trend_series()
+                    if has_years and cube.query(['fiscal_year'])['fiscal_year'].notna().sum() > 1:
                         st.markdown("### Budget Trends by Fund")
-                        
-                        chart_data = summary.pivot(
-                            index='fiscal_year',
-                            columns='fund_code',
-                            values='budgeted_amount'
+                        trend_fund_col, trend_by_col, trend_amount_col, trend_top_col = st.columns(4)
+                        trend_fund = trend_fund_col.selectbox(
+                            "Trend of", ["All funds"] + funds, key="trend_fund",
+                            format_func=lambda fund: fund if fund == "All funds" else f"Fund {fund}"
+                        )
+                        trend_levels = [dim for dim in cube.dimensions if dim not in ('fiscal_year', 'account_code')
+                                        and (dim != 'fund_code' or trend_fund == "All funds")]
+                        trend_by = trend_by_col.selectbox("Series by", trend_levels, key="trend_by",
+                                                          format_func=lambda dim: dim.replace('_', ' ').title())
+                        trend_amount = trend_amount_col.selectbox(
+                            "Amount", [col for col in ['budgeted_amount', 'actual_amount', 'variance']
+                                       if col in totals],
+                            key="trend_amount", format_func=lambda col: col.replace('_', ' ').title()
                         )
-                        
-                        st.line_chart(chart_data)
+                        trend_top = trend_top_col.slider("Series shown", min_value=1, max_value=25,
+                                                         value=DEFAULT_TOP_N, key="trend_top")
+                        trend_path = {} if trend_fund == "All funds" else {'fund_code': trend_fund}
+                        trend = trends.payload(trend_by, trend_amount, trend_top, trend_path)
+                        st.line_chart(pd.DataFrame(
+                            {series['name']: series['values'] for series in trend['series']},
+                            index=pd.Index(trend['years'], name='fiscal_year'), dtype='float64'
+                        ))
+                        if trend['members'] > trend['shown']:
+                            st.caption(f"Top {trend['shown']} of {trend['members']:,} by total; "
+                                       f"the other {trend['members'] - trend['shown']:,} are summed as \"{OTHER_LABEL}\"")
+                    
+                    st.markdown("### 🔍 Variance Drill-Down")
+                    level_col, fund_col, yoy_col = st.columns(3)
+                    levels = [dim for dim in cube.dimensions if dim not in ('fund_code', 'fiscal_year')]
+                    level = level_col.selectbox("Break down by", levels,
+                                                format_func=lambda dim: dim.replace('_', ' ').title())
+                    fund = fund_col.selectbox("Fund", ["All funds"] + funds)
+                    show_yoy = has_years and yoy_col.checkbox("Year-over-year change")
+                    path = {} if fund == "All funds" else {'fund_code': fund}
+                    if show_yoy:
+                        drill = cube.year_over_year([level], filters=path)
+                    else:
+                        drill = cube.drill_down(path, level)
+                    st.dataframe(format_for_display(drill), use_container_width=True, hide_index=True)
+                    
+                    st.markdown("### 📝 Fund Narratives")
+                    if not narratives_configured():
+                        st.info("Narrative generation is not configured on this server "
+                                "(set OPENAI_API_KEY to enable it)")
+                    elif not has_years:
+                        st.info("Narratives describe a fiscal year; this export has no fiscal year column")
+                    else:
+                        narratives = get_result_cache().get(('narratives', data_key))
+                        if narratives is None and st.button("Generate Narratives"):
+                            with st.spinner("Writing narratives..."):
+                                narratives = fund_narratives(data_key, ingester)
+                        if narratives is not None:
+                            failed = int((narratives['narrative'] == '').sum())
+                            if failed:
+                                st.warning(f"⚠️ {failed} narrative(s) could not be generated; "
+                                           "press Generate Narratives again to retry")
+                            for fund_code, narrative in zip(narratives['fund_code'], narratives['narrative']):
+                                if narrative:
+                                    with st.expander(f"Fund {fund_code}"):
+                                        st.write(narrative)
             
             with tab2:
                 st.markdown("### Detailed Budget Data")
-                st.info(f"Showing first 100 rows of {len(df):,} total records")
-                
-                # Format for display
-                display_df = df.head(100).copy()
-                for col in ['budgeted_amount', 'actual_amount', 'variance']:
-                    if col in display_df.columns:
-                        display_df[col] = display_df[col].apply(format_currency)
+                columns, options, rule_counts, rows_total = detail_options(data_key, ingester)
                 
-                if 'variance_pct' in display_df.columns:
-                    display_df['variance_pct'] = display_df['variance_pct'].apply(
-                        lambda x: f"{x:.2f}%"
+                # Filters (only columns present in the export)
+                filters = {}
+                filter_columns = list(options)
+                for col, container in zip(filter_columns, st.columns(max(len(filter_columns), 1))):
+                    filters[col] = container.multiselect(
+                        col.replace('_', ' ').title(), options[col]
                     )
                 
+                # Offer a jump to rows failing each validation rule
+                if not st.session_state.get('is_valid', True):
+                    rule_options = {"All rows": None}
+                    for rule in VALIDATION_RULES:
+                        count = rule_counts.get(rule, 0)
+                        if count:
+                            label = rule.replace('_', ' ').capitalize()
+                            rule_options[f"{label} ({count:,} rows)"] = rule
+                    shown = rule_options[st.selectbox("Show", list(rule_options))]
+                    if shown is not None:
+                        filters[RULE_FILTER] = [shown]
+                
+                sort_col, order_col, size_col, page_col = st.columns(4)
+                sort_by = sort_col.selectbox("Sort by", ["File order"] + columns)
+                sort_by = None if sort_by == "File order" else sort_by
+                ascending = order_col.selectbox("Order", ["Ascending", "Descending"]) == "Ascending"
+                page_size = size_col.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+                
+                if client is not None:
+                    # Filtered and paged on the server; only visible rows travel
+                    total = ingester.detail_page(0, 1, filters)[1]['total']
+                else:
+                    query = get_detail_query(data_key, ingester)
+                    total = len(query.select(filters, sort_by, ascending))
+                page_count = max((total + page_size - 1) // page_size, 1)
+                page = page_col.number_input("Page", min_value=1, max_value=page_count, value=1)
+                if client is not None:
+                    page_df, info = ingester.detail_page(page - 1, page_size, filters, sort_by, ascending)
+                    total = info['total']
+                else:
+                    page_df, total = query.page(page - 1, page_size, filters, sort_by, ascending)
+                
+                first_row = (page - 1) * page_size
+                st.caption(f"Rows {min(first_row + 1, total):,}-{first_row + len(page_df):,} "
+                           f"of {total:,} matching ({rows_total:,} total), page {page} of {page_count}")
+                
+                # Only the visible page is formatted
                 st.dataframe(
-                    display_df,
+                    format_for_display(page_df),
                     use_container_width=True,
                     hide_index=True
                 )
             
             with tab3:
+                st.markdown("### Fund Projections")
+                
+                horizon_col, amount_col = st.columns(2)
+                horizon = horizon_col.slider("Years ahead", min_value=1, max_value=5, value=3)
+                value_column = amount_col.selectbox(
+                    "Amount", ["actual_amount", "budgeted_amount"],
+                    format_func=lambda col: col.replace('_', ' ').title()
+                )
+                
+                if has_years:
+                    with st.spinner("Fitting forecasts..."):
+                        forecast = fund_forecast(data_key, ingester, horizon, value_column)
+                else:
+                    forecast = pd.DataFrame()
+                
+                if forecast.empty:
+                    st.info("No fiscal year history to project from")
+                else:
+                    st.caption("Short histories use a linear or smoothed trend; "
+                               "longer ones are fitted with Prophet when installed")
+                    forecast_chart = forecast.pivot(
+                        index='fiscal_year', columns='fund_code', values='forecast'
+                    )
+                    st.line_chart(forecast_chart)
+                    st.dataframe(
+                        format_for_display(forecast),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+            
+            with tab4:
                 st.markdown("### Download Standardized Data")
                 
                 st.info("""
@@ -328,23 +722,29 @@ def main():
                 - Standardized column names for easy analysis
                 """)
                 
-                # Create download
-                excel_file = create_excel_download(ingester)
+                export_format = st.selectbox("Format", list(EXPORT_FORMATS))
+                suffix, mime = EXPORT_FORMATS[export_format]
                 
-                st.download_button(
-                    label="📥 Download Excel Report",
-                    data=excel_file,
-                    file_name=f"budget_standardized_{pd.Timestamp.now().strftime('%Y%m%d')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    type="primary",
-                    use_container_width=True
-                )
+                # Build the file only on request, then keep it for later reruns
+                export_key = ('export', data_key, suffix)
+                export_data = get_result_cache().get(export_key)
+                if export_data is None and st.button("⚙️ Prepare Download", use_container_width=True):
+                    with st.spinner("Building export..."):
+                        export_data = create_download(ingester, suffix)
+                        get_result_cache().put(export_key, export_data)
+                if export_data is not None:
+                    st.download_button(
+                        label="📥 Download Standardized Data",
+                        data=export_data,
+                        file_name=f"budget_standardized_{pd.Timestamp.now().strftime('%Y%m%d')}{suffix}",
+                        mime=mime,
+                        type="primary",
+                        use_container_width=True
+                    )
                 
                 st.markdown("---")
                 st.markdown("### 🚀 Coming Soon")
                 st.markdown("""
-                - **AI Budget Narratives**: Auto-generate GFOA-compliant descriptions
-                - **Fund Balance Forecasting**: 3-5 year projections using Prophet
                 - **Cost Reduction Recommendations**: AI-powered efficiency analysis
                 - **Performance Measures**: Automated metric tracking
                 """)
@@ -0,0 +1,122 @@
+"""
+BudgetBuddy Batch Ingestion
+Process many county exports in parallel
+
+Key Functions:
+- Fan BudgetDataIngester pipelines out across a process pool
+- Handle mixed Munis/Caselle inputs in one batch
+- Combine results into one standardized frame keyed by source and county
+- Report per-file validation results and timings
+"""
+
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from data_cleaning import concat_frames
+from data_ingestion import BudgetDataIngester
+
+
+def _ingest_one(filepath: str, system_type: str) -> Dict:
+    """Run the pipeline for one file; errors are captured, not raised"""
+    start = time.perf_counter()
+    result = {
+        'source': Path(filepath).name,
+        'path': str(filepath),
+        'system_type': system_type,
+        'data': None,
+        'is_valid': False,
+        'issues': [],
+        'rows': 0,
+        'error': None,
+    }
+    try:
+        # Keep per-stage progress lines from workers out of the shared console
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingester = BudgetDataIngester(system_type=system_type)
+            df, is_valid, issues = ingester.process_file(filepath)
+        result.update(data=df, is_valid=is_valid, issues=issues, rows=len(df))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _resolve_system_types(paths: List[str],
+                          system_type: Union[str, Dict[str, str]]) -> List[str]:
+    """System type for each path from a single value or a per-path mapping"""
+    if isinstance(system_type, str):
+        return [system_type] * len(paths)
+
+    lookup = {str(Path(path)): system for path, system in system_type.items()}
+    missing = [path for path in paths if str(Path(path)) not in lookup]
+    if missing:
+        raise ValueError(f"No system type given for: {missing}")
+    return [lookup[str(Path(path))] for path in paths]
+
+
+def ingest_many(paths: Sequence[Union[str, Path]],
+                system_type: Union[str, Dict[str, str]] = 'munis',
+                counties: Optional[Dict[str, str]] = None,
+                max_workers: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Ingest many export files in parallel
+
+    Args:
+        paths: Export files to process
+        system_type: 'munis'/'caselle' for every file, or a mapping of
+            path -> system type for mixed batches
+        counties: Optional mapping of path -> county name. Files without an
+            entry use their file stem.
+        max_workers: Worker processes (defaults to CPU count; 1 runs inline)
+
+    Returns:
+        (combined cleaned DataFrame with 'source' and 'county' columns,
+         per-file report with validation results and timings)
+    """
+    paths = [str(path) for path in paths]
+    if not paths:
+        raise ValueError("No files to ingest")
+
+    system_types = _resolve_system_types(paths, system_type)
+    counties = {str(Path(path)): county for path, county in (counties or {}).items()}
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = min(max_workers, len(paths))
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        results = [_ingest_one(path, system) for path, system in zip(paths, system_types)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_ingest_one, paths, system_types))
+    elapsed = time.perf_counter() - start
+
+    frames = []
+    for result in results:
+        df = result.pop('data')
+        county = counties.get(str(Path(result['path'])), Path(result['path']).stem)
+        result['county'] = county
+        if df is not None:
+            df['source'] = pd.Categorical([result['source']] * len(df))
+            df['county'] = pd.Categorical([county] * len(df))
+            frames.append(df)
+
+    report = pd.DataFrame(results)
+    report['rows_per_sec'] = report['rows'] / report['seconds'].where(report['seconds'] > 0)
+    combined = concat_frames(frames)
+    if combined is None:
+        combined = pd.DataFrame()
+
+    failed = report['error'].notna().sum()
+    print(f"✓ Ingested {len(paths) - failed}/{len(paths)} files, "
+          f"{len(combined):,} rows in {elapsed:.2f}s with {max_workers} workers")
+    for _, row in report[report['error'].notna()].iterrows():
+        print(f"  ⚠ {row['source']}: {row['error']}")
+
+    return combined, report
@@ -0,0 +1,57 @@
+"""
+Benchmark: ingest_many scaling with worker count
+
+Writes a directory of synthetic county exports (alternating Munis and
+Caselle, built by scaling the sample files) and times ingest_many with
+1, 2, 4, ... workers up to the CPU count.
+
+Usage:
+    python benchmarks/bench_batch_ingest.py [--files 16] [--scale 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from batch_ingestion import ingest_many
+from memory_report import SAMPLES, scaled_copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--files', type=int, default=16)
+    parser.add_argument('--scale', type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        system_types = {}
+        systems = list(SAMPLES)
+        for n in range(args.files):
+            system = systems[n % len(systems)]
+            path = Path(tmp) / f"county_{n:02d}_{system}.csv"
+            scaled_copy(SAMPLES[system], args.scale, path)
+            system_types[str(path)] = system
+
+        workers = 1
+        baseline = None
+        while True:
+            start = time.perf_counter()
+            combined, _ = ingest_many(list(system_types), system_type=system_types,
+                                      max_workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers:2d}  {elapsed:7.2f} s  "
+                  f"{len(combined) / elapsed:12,.0f} rows/s  speedup {baseline / elapsed:4.1f}x")
+            if workers >= (os.cpu_count() or 1):
+                break
+            workers = min(workers * 2, os.cpu_count())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: clean_data cleaning engine vs. the original per-column cleanup
+
+Builds a synthetic Caselle-style export with currency formatting noise
+(dollar signs, thousands separators, parenthesized and trailing-minus
+negatives, padded codes) and times both implementations on it. First
+checks that malformed amounts parse exactly as the original cleanup
+parsed them (exits 1 otherwise).
+
+Usage:
+    python benchmarks/bench_clean_data.py [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data_cleaning import clean_frame
+
+# The legacy path trips pandas string-dtype deprecation warnings
+warnings.filterwarnings('ignore')
+
+
+def make_export(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic standardized frame with vendor formatting noise"""
+    rng = np.random.default_rng(seed)
+
+    funds = np.array([f"GF{n:03d}" for n in range(40)] + [f" SF{n:03d} " for n in range(20)])
+    depts = np.array(['ADMIN', 'SHERIFF', ' ROADS', 'PARKS ', 'CLERK', 'ASSESSOR', 'LIBRARY'])
+    accounts = np.array([f"{major}-{minor:03d}" for major in range(1000, 9000, 500) for minor in range(0, 400, 25)])
+    descriptions = np.array(['Personnel Salaries', 'Employee Benefits ', 'Contractual Services',
+                             ' Supplies and Materials', 'Capital Outlay', 'Utilities', 'Fuel'])
+
+    def amounts() -> np.ndarray:
+        values = np.round(rng.gamma(2.0, 8000.0, rows), 2)
+        style = rng.integers(0, 4, rows)
+        plain = values.astype(str)
+        formatted = np.array([f"${v:,.2f}" for v in values])
+        return np.select(
+            [style == 0, style == 1, style == 2],
+            [plain, formatted, np.char.add(np.char.add('(', formatted), ')')],
+            np.char.add(plain, '-')
+        ).astype(object)
+
+    return pd.DataFrame({
+        'fund_code': funds[rng.integers(0, len(funds), rows)].astype(object),
+        'dept_code': depts[rng.integers(0, len(depts), rows)].astype(object),
+        'account_code': accounts[rng.integers(0, len(accounts), rows)].astype(object),
+        'fiscal_year': rng.integers(2015, 2026, rows),
+        'budgeted_amount': amounts(),
+        'actual_amount': amounts(),
+        'encumbered_amount': amounts(),
+        'description': descriptions[rng.integers(0, len(descriptions), rows)].astype(object),
+    })
+
+
+def legacy_clean(standardized: pd.DataFrame) -> pd.DataFrame:
+    """clean_data as originally written: one regex/strip pass per column"""
+    df = standardized.copy()
+
+    if 'fiscal_year' in df.columns:
+        df['fiscal_year'] = pd.to_numeric(df['fiscal_year'], errors='coerce').astype('Int64')
+
+    for col in ['budgeted_amount', 'actual_amount', 'encumbered_amount']:
+        if col in df.columns:
+            if df[col].dtype == 'object':
+                df[col] = df[col].str.replace('[$,]', '', regex=True)
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    string_cols = df.select_dtypes(include=['object']).columns
+    for col in string_cols:
+        df[col] = df[col].str.strip() if df[col].dtype == 'object' else df[col]
+
+    if 'budgeted_amount' in df.columns and 'actual_amount' in df.columns:
+        df['variance'] = df['actual_amount'] - df['budgeted_amount']
+        df['variance_pct'] = np.where(
+            df['budgeted_amount'] != 0,
+            (df['variance'] / df['budgeted_amount']) * 100,
+            0
+        )
+
+    if all(col in df.columns for col in ['budgeted_amount', 'actual_amount', 'encumbered_amount']):
+        df['available_balance'] = df['budgeted_amount'] - df['actual_amount'] - df['encumbered_amount']
+
+    return df
+
+
+# Amounts that are not currency values (signs or parentheses inside the
+# number, spaces between digits) plus plain values both cleanups accept;
+# each must come out as the original cleanup parsed it
+MALFORMED_AMOUNTS = [
+    '12-34', '2023-01-05', '1 2 3', '--3', '(12', '12)', '-(5)', '(-5)', '(12)-',
+    '1.2.3', '$,100', '12$', 'abc', '', 'N/A', '1e5', ' 42 ', '$1,200.50', '+7', '-3',
+    '12345678901234567',
+]
+
+
+def parsing_matches_legacy() -> bool:
+    """Compare clean_frame and legacy_clean amounts on MALFORMED_AMOUNTS"""
+    frame = pd.DataFrame({'budgeted_amount': pd.Series(MALFORMED_AMOUNTS, dtype=object)})
+    expected = legacy_clean(frame)['budgeted_amount'].to_numpy(dtype=np.float64)
+    actual = clean_frame(frame.copy())['budgeted_amount'].to_numpy(dtype=np.float64)
+    mismatched = [(value, want, got) for value, want, got in zip(MALFORMED_AMOUNTS, expected, actual)
+                  if want != got]
+    for value, want, got in mismatched:
+        print(f"⚠ {value!r}: original cleanup {want}, cleaning engine {got}")
+    return not mismatched
+
+
+def best_time(func, frames) -> float:
+    """Best wall time of func over a list of pre-built input frames"""
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        func(frame)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not parsing_matches_legacy():
+        sys.exit(1)
+    print(f"✓ {len(MALFORMED_AMOUNTS)} malformed amounts parse as before")
+
+    print(f"Building synthetic export: {args.rows:,} rows")
+    export = make_export(args.rows)
+
+    legacy = best_time(legacy_clean, [export] * args.repeat)
+    # In-place cleaning consumes its input, so each run gets a fresh copy
+    engine = best_time(clean_frame, [export.copy() for _ in range(args.repeat)])
+
+    print(f"legacy clean_data : {legacy:8.3f} s")
+    print(f"cleaning engine   : {engine:8.3f} s")
+    print(f"speedup           : {legacy / engine:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
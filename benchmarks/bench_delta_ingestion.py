@@ -0,0 +1,127 @@
+"""
+Delta ingestion benchmark: monthly refresh versus full reprocessing
+
+Writes a synthetic multi-year export and stores it with process_delta, then
+writes a "next month" export in which a fraction of the latest fiscal
+year's rows changed (plus some added and dropped lines) and times a full
+process_file run against a process_delta refresh of the stored dataset.
+Each refresh is checked against the full run: the same detail rows and
+fund summary, in any order.
+
+Usage:
+    python benchmarks/bench_delta_ingestion.py [--rows 1000000] [--system munis]
+        [--changed 0.001 0.01 0.1] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data_ingestion import BudgetDataIngester
+from data_cleaning import decategorize
+from delta_ingestion import DeltaStore
+from synthetic_exports import generate_export
+
+
+def next_month(export: pd.DataFrame, system_type: str, changed: float, seed: int = 1) -> pd.DataFrame:
+    """Copy of an export with `changed` of its latest-year rows edited, added or dropped"""
+    rng = np.random.default_rng(seed)
+    column_map = BudgetDataIngester(system_type).column_map
+    vendor = {std: col for col, std in column_map.items()}
+    latest = np.flatnonzero(export[vendor['fiscal_year']].to_numpy() == '2025')
+    picked = rng.choice(latest, size=int(len(latest) * changed), replace=False)
+    edited, dropped, added = np.array_split(picked, 3)
+
+    refreshed = export.copy()
+    refreshed.loc[edited, vendor['actual_amount']] = np.round(rng.gamma(2.0, 8000.0, len(edited)), 2).astype(str)
+    new_lines = export.loc[added].copy()
+    new_lines[vendor['account_code']] = [f"9{n:05d}" for n in range(len(added))]
+    return pd.concat([refreshed.drop(index=dropped), new_lines], ignore_index=True)
+
+
+def same_rows(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    """Same columns and rows, ignoring row order and categorical vs plain dtypes"""
+    if sorted(left.columns) != sorted(right.columns) or len(left) != len(right):
+        return False
+    columns = sorted(left.columns)
+    left, right = (decategorize(frame[columns]).sort_values(columns).reset_index(drop=True)
+                   for frame in (left, right))
+    try:
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, rtol=1e-9)
+    except AssertionError:
+        return False
+    return True
+
+
+def timed(call, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            call()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--system', choices=['munis', 'caselle'], default='munis')
+    parser.add_argument('--changed', type=float, nargs='+', default=[0.001, 0.01, 0.1],
+                        help="Fractions of the latest fiscal year's rows that change")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    mismatches = 0
+
+    base = generate_export(args.rows, system_type=args.system)
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = Path(tmp) / 'base.csv'
+        base.to_csv(base_path, index=False)
+        print(f"{args.rows:,} {args.system} rows")
+
+        for fraction in args.changed:
+            refreshed_path = Path(tmp) / f'refresh_{fraction}.csv'
+            next_month(base, args.system, fraction).to_csv(refreshed_path, index=False)
+
+            reference = BudgetDataIngester(args.system)
+            full = timed(lambda: reference.process_file(str(refreshed_path)), args.repeat)
+
+            def refresh():
+                store = DeltaStore(Path(tmp) / 'store')
+                store.clear('county')
+                with contextlib.redirect_stdout(io.StringIO()):
+                    BudgetDataIngester(args.system).process_delta(str(base_path), store, 'county')
+                ingester = BudgetDataIngester(args.system)
+                start = time.perf_counter()
+                ingester.process_delta(str(refreshed_path), store, 'county')
+                return time.perf_counter() - start, ingester
+
+            best, ingester = float('inf'), None
+            for _ in range(args.repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    seconds, ingester = refresh()
+                best = min(best, seconds)
+            stats = ingester.delta_stats
+            match = (same_rows(ingester.standardized_data, reference.standardized_data)
+                     and same_rows(ingester.get_fund_summary(), reference.get_fund_summary()))
+            mismatches += not match
+            print(f"{'✓' if match else '⚠'} {fraction:6.1%} of latest year changed: "
+                  f"full {full:6.2f}s   delta {best:6.2f}s "
+                  f"({stats['added']} added, {stats['changed']} changed, {stats['removed']} removed)"
+                  f"{'' if match else '  RESULT DIFFERS FROM FULL RUN'}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
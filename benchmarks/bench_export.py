@@ -0,0 +1,114 @@
+"""
+Benchmark: export time and peak memory vs. row count
+
+Compares the original pd.ExcelWriter(engine='openpyxl') export with the
+streaming write-only workbook, gzip CSV and Parquet writers. Peak memory
+is the tracemalloc high-water mark of a second, traced run of each write.
+First checks that detail longer than one sheet continues on further
+sheets with no row lost (exits 1 otherwise).
+
+Usage:
+    python benchmarks/bench_export.py [--rows 10000 50000 200000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from bench_clean_data import make_export
+from data_cleaning import clean_frame
+from export_writer import EXCEL_MAX_ROWS, write_csv, write_excel, write_parquet
+
+
+def legacy_excel(detail: pd.DataFrame, summary: pd.DataFrame, path: Path):
+    """Export as originally written: every cell built before saving"""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        detail.to_excel(writer, sheet_name='Detail', index=False)
+        summary.to_excel(writer, sheet_name='Fund Summary', index=False)
+
+
+WRITERS = {
+    'excel (ExcelWriter)': ('.xlsx', legacy_excel),
+    'excel (streaming)': ('.xlsx', lambda detail, summary, path: write_excel(detail, path, summary=summary)),
+    'csv.gz': ('.csv.gz', lambda detail, summary, path: write_csv(detail, path)),
+    'parquet': ('.parquet', lambda detail, summary, path: write_parquet(detail, path)),
+}
+
+
+def sheets_roll_over(path: Path) -> bool:
+    """
+    Write detail across several small sheets and read it back
+
+    Uses a small sheet_rows so the check runs in seconds; the split is the
+    same at EXCEL_MAX_ROWS.
+    """
+    from openpyxl import load_workbook
+
+    sheet_rows = 100
+    detail = clean_frame(make_export(3 * (sheet_rows - 1) + 5))
+    write_excel(detail, path, sheet_rows=sheet_rows)
+    workbook = load_workbook(path, read_only=True)
+    expected = ['Detail', 'Detail (2)', 'Detail (3)', 'Detail (4)']
+    sheets = [list(workbook[name].values) for name in workbook.sheetnames]
+    workbook.close()
+
+    header = [str(col) for col in detail.columns]
+    rows = [row for sheet in sheets for row in sheet[1:]]
+    ok = (workbook.sheetnames == expected
+          and all(list(sheet[0]) == header and len(sheet) <= sheet_rows for sheet in sheets)
+          and len(rows) == len(detail)
+          and [row[0] for row in rows] == detail.iloc[:, 0].astype(str).tolist())
+    if not ok:
+        print(f"⚠ Sheet rollover lost rows: sheets {workbook.sheetnames}, "
+              f"{len(rows):,} of {len(detail):,} rows")
+    return ok
+
+
+def measure(writer, detail: pd.DataFrame, summary: pd.DataFrame, path: Path):
+    """(seconds, peak MB) for one export; tracing runs separately from timing"""
+    start = time.perf_counter()
+    writer(detail, summary, path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    writer(detail, summary, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not sheets_roll_over(Path(tmp) / 'rollover.xlsx'):
+            sys.exit(1)
+    print(f"✓ Detail past {EXCEL_MAX_ROWS:,} rows continues on further sheets")
+
+    print(f"{'rows':>9s}  {'writer':22s} {'seconds':>9s} {'peak MB':>9s} {'file MB':>9s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            detail = clean_frame(make_export(rows))
+            summary = detail.groupby(['fund_code', 'fiscal_year'], observed=True)[
+                ['budgeted_amount', 'actual_amount']
+            ].sum().reset_index()
+
+            for label, (suffix, writer) in WRITERS.items():
+                path = Path(tmp) / f"export_{rows}{suffix}"
+                elapsed, peak_mb = measure(writer, detail, summary, path)
+                size_mb = path.stat().st_size / 1e6
+                print(f"{rows:9,d}  {label:22s} {elapsed:9.2f} {peak_mb:9.1f} {size_mb:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
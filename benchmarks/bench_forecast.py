@@ -0,0 +1,86 @@
+"""
+Benchmark: vectorized linear and Holt forecasts over many fund series
+
+First checks that exactly linear histories (with and without a missing
+year) are projected exactly by both methods (exits 1 otherwise), then
+times forecast_summary on a synthetic summary of many series.
+
+Usage:
+    python benchmarks/bench_forecast.py [--series 10000] [--years 8] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from forecasting import forecast_summary
+
+HORIZON = 3
+
+
+def linear_projected_exactly() -> bool:
+    """Forecast 10, 12, ..., 20 (and the same with 2021 missing) with each method"""
+    years = np.arange(2018, 2024)
+    summary = pd.DataFrame({
+        'fund_code': ['100'] * len(years) + ['200'] * (len(years) - 1),
+        'fiscal_year': np.concatenate([years, years[years != 2021]]),
+        'actual_amount': np.concatenate([10.0 + 2 * (years - 2018), 10.0 + 2 * (years[years != 2021] - 2018)]),
+    })
+    expected = 10.0 + 2 * (np.arange(2024, 2024 + HORIZON) - 2018)
+
+    ok = True
+    for method in ['linear', 'holt']:
+        forecast = forecast_summary(summary, horizon=HORIZON, method=method)
+        for fund_code, rows in forecast.groupby('fund_code'):
+            if not np.allclose(rows['forecast'].to_numpy(), expected):
+                print(f"⚠ {method} forecast of fund {fund_code}: {rows['forecast'].tolist()}, "
+                      f"expected {expected.tolist()}")
+                ok = False
+    return ok
+
+
+def make_summary(series: int, years: int, seed: int = 0) -> pd.DataFrame:
+    """Fund summary with a noisy trend per series and a few missing years"""
+    rng = np.random.default_rng(seed)
+    fiscal_years = np.arange(2024 - years, 2024)
+    base = rng.gamma(2.0, 50_000.0, series)[:, None]
+    growth = rng.normal(0.03, 0.02, series)[:, None]
+    values = base * (1 + growth) ** np.arange(years) * rng.normal(1.0, 0.05, (series, years))
+    frame = pd.DataFrame({
+        'fund_code': np.repeat([f"F{n:05d}" for n in range(series)], years),
+        'fiscal_year': np.tile(fiscal_years, series),
+        'actual_amount': values.ravel(),
+    })
+    return frame[rng.random(len(frame)) > 0.05]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--series', type=int, default=10_000)
+    parser.add_argument('--years', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not linear_projected_exactly():
+        sys.exit(1)
+    print("✓ Linear histories are projected exactly")
+
+    summary = make_summary(args.series, args.years)
+    print(f"Synthetic summary: {args.series:,} series x {args.years} years")
+    for method in ['linear', 'holt']:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            forecast_summary(summary, horizon=HORIZON, method=method)
+            timings.append(time.perf_counter() - start)
+        print(f"{method:8s}: {min(timings):8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Narrative pipeline benchmark against the offline stub backend
+
+Generates one prompt per synthetic fund, dispatches them through the stub
+backend with a simulated per-request latency (and optional rate-limit
+refusals), then regenerates with a fraction of funds changed to show how
+much the response cache saves.
+
+Usage:
+    python benchmarks/bench_narratives.py [--funds 500] [--latency 0.5]
+        [--concurrency 8 32 128] [--rate-limit-every 20] [--changed 0.1]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from narratives import NarrativeCache, NarrativeGenerator, NarrativeRequest, StubBackend
+
+
+def fund_requests(funds: int, changed: int = 0):
+    """One prompt per fund; the first `changed` funds get new figures"""
+    return [
+        NarrativeRequest(key=f"F{fund:04d}",
+                         prompt=f"Fund: F{fund:04d}\nBudgeted: ${fund * 1000 + (fund < changed):,}")
+        for fund in range(funds)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--funds', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--rate-limit-every', type=int, default=None)
+    parser.add_argument('--changed', type=float, default=0.1,
+                        help="Fraction of funds changed before regenerating")
+    args = parser.parse_args()
+
+    requests = fund_requests(args.funds)
+    changed = fund_requests(args.funds, changed=int(args.funds * args.changed))
+    print(f"{args.funds} funds, {args.latency}s simulated latency per request")
+
+    for concurrency in args.concurrency:
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = StubBackend(latency=args.latency, rate_limit_every=args.rate_limit_every)
+            generator = NarrativeGenerator(backend, NarrativeCache(tmp), max_concurrency=concurrency)
+            start = time.perf_counter()
+            generator.generate(requests)
+            cold = time.perf_counter() - start
+
+            generator = NarrativeGenerator(backend, NarrativeCache(tmp), max_concurrency=concurrency)
+            start = time.perf_counter()
+            generator.generate(changed)
+            warm = time.perf_counter() - start
+            print(f"  concurrency {concurrency:4d}: cold {cold:8.2f}s   "
+                  f"regenerate {warm:6.2f}s ({generator.stats['requested']} requested, "
+                  f"{generator.stats['cached']} cached, {backend.calls} backend calls)")
+
+
+if __name__ == "__main__":
+    main()
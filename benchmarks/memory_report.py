@@ -0,0 +1,102 @@
+"""
+Memory report: object-backed vs. typed standard schema
+
+Scales the sample Munis/Caselle exports up (10,000x by default), ingests
+each one twice and compares deep memory usage and fund/year groupby time:
+
+- object-backed: key columns read as Python objects, cleaned the original way
+- typed: BudgetDataIngester with parse-time dtype hints (categorical keys,
+  int16 fiscal year, float64 amounts)
+
+Usage:
+    python benchmarks/memory_report.py [--scale 10000]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from bench_clean_data import legacy_clean
+from data_ingestion import BudgetDataIngester
+
+SAMPLES = {
+    'munis': REPO_ROOT / 'sample_data_munis.csv',
+    'caselle': REPO_ROOT / 'sample_data_caselle.csv',
+}
+
+
+def scaled_copy(sample: Path, scale: int, target: Path) -> Path:
+    """Write sample repeated scale times to target"""
+    sample_df = pd.read_csv(sample, dtype=str)
+    pd.concat([sample_df] * scale, ignore_index=True).to_csv(target, index=False)
+    return target
+
+
+def object_backed(path: Path, system_type: str) -> pd.DataFrame:
+    """Ingest with every key column held as Python objects"""
+    ingester = BudgetDataIngester(system_type=system_type)
+    key_cols = [
+        vendor for vendor, std in ingester.column_map.items()
+        if std in ('fund_code', 'dept_code', 'account_code', 'description')
+    ]
+    raw = pd.read_csv(path, dtype={col: object for col in key_cols})
+    return legacy_clean(raw.rename(columns=ingester.column_map))
+
+
+def typed(path: Path, system_type: str) -> pd.DataFrame:
+    """Ingest through BudgetDataIngester with the standard schema"""
+    ingester = BudgetDataIngester(system_type=system_type)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingester.load_file(str(path))
+        ingester.standardize_columns()
+        return ingester.clean_data(inplace=True)
+
+
+def groupby_seconds(df: pd.DataFrame) -> float:
+    """Wall time of the fund summary aggregation"""
+    start = time.perf_counter()
+    df.groupby(['fund_code', 'fiscal_year'], observed=True)['budgeted_amount'].sum()
+    return time.perf_counter() - start
+
+
+def report(system_type: str, path: Path):
+    frames = {
+        'object-backed': object_backed(path, system_type),
+        'typed': typed(path, system_type),
+    }
+
+    print(f"\n{system_type.upper()} ({len(frames['typed']):,} rows)")
+    per_column = pd.DataFrame({
+        label: df.memory_usage(deep=True, index=False) / 1e6
+        for label, df in frames.items()
+    }).round(2)
+    per_column['dtype'] = frames['typed'].dtypes.astype(str)
+    print(per_column.to_string())
+
+    for label, df in frames.items():
+        total_mb = df.memory_usage(deep=True, index=False).sum() / 1e6
+        print(f"  {label:14s} total {total_mb:9.2f} MB   groupby {groupby_seconds(df) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scale', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for system_type, sample in SAMPLES.items():
+            scaled = scaled_copy(sample, args.scale, Path(tmp) / sample.name)
+            report(system_type, scaled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark suite: ingestion pipeline stages on synthetic exports
+
+For each vendor and row count, writes a synthetic export, runs
+process_file, get_fund_summary and exports with stage metrics enabled,
+and records the best time per stage over several repeats. Results are
+saved as JSON so runs from different versions can be compared; with
+--compare the suite exits non-zero when a stage regresses.
+
+Usage:
+    python benchmarks/run_suite.py [--rows 1000 100000 1000000] [--systems munis caselle]
+        [--repeat 3] [--output benchmarks/results/latest.json]
+        [--compare benchmarks/results/baseline.json] [--threshold 1.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from data_ingestion import INGESTER_VERSION, BudgetDataIngester
+from pipeline_metrics import PipelineMetrics
+from synthetic_exports import write_export
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / 'results' / 'latest.json'
+EXPORT_SUFFIXES = ['.parquet', '.csv.gz']
+
+# Stages shorter than this are too noisy to flag as regressions
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_once(export_path: Path, system_type: str, workdir: Path) -> List[Dict]:
+    """One pass over every measured stage, as PipelineMetrics records"""
+    metrics = PipelineMetrics(enabled=True)
+    ingester = BudgetDataIngester(system_type=system_type, metrics=metrics)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingester.process_file(str(export_path))
+        ingester.get_fund_summary()
+        stages = list(metrics.stages)
+        for suffix in EXPORT_SUFFIXES:
+            metrics.reset()
+            ingester.export_standardized(str(workdir / f"export{suffix}"), include_summary=False)
+            stages += [dict(stage, stage=f"export{suffix}") for stage in metrics.stages]
+
+        if export_path.suffix == '.csv':
+            ingester.stream_file(str(export_path))
+            stages += [
+                dict(stage, stage=stage['stage'] if stage['stage'] == 'stream' else f"stream_{stage['stage']}")
+                for stage in metrics.stages
+            ]
+    return stages
+
+
+def run_case(system_type: str, rows: int, repeat: int, options: Dict) -> Dict:
+    """Best-of-repeat timings for one vendor/size combination"""
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        export_path = write_export(workdir / f"{system_type}_{rows}.csv", rows,
+                                   system_type=system_type, **options)
+        best = {}
+        for _ in range(repeat):
+            for stage in run_once(export_path, system_type, workdir):
+                if stage['stage'] not in best or stage['seconds'] < best[stage['stage']]['seconds']:
+                    best[stage['stage']] = stage
+
+    return {
+        'system_type': system_type,
+        'rows': rows,
+        'stages': {
+            name: {'seconds': stage['seconds'], 'rows_per_sec': stage['rows_per_sec']}
+            for name, stage in best.items()
+        },
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Stages slower than threshold x baseline (matched by vendor, size and stage)"""
+    previous = {(case['system_type'], case['rows']): case for case in baseline['cases']}
+    regressions = []
+    for case in current['cases']:
+        before = previous.get((case['system_type'], case['rows']))
+        if before is None:
+            continue
+        for name, stage in case['stages'].items():
+            old = before['stages'].get(name)
+            if old is None or old['seconds'] < MIN_COMPARABLE_SECONDS:
+                continue
+            ratio = stage['seconds'] / old['seconds']
+            marker = '⚠' if ratio > threshold else ' '
+            print(f"{marker} {case['system_type']:8s} {case['rows']:>10,}  {name:22s} "
+                  f"{old['seconds']:8.3f}s -> {stage['seconds']:8.3f}s  ({ratio:4.2f}x)")
+            if ratio > threshold:
+                regressions.append(f"{case['system_type']}/{case['rows']}/{name}: {ratio:.2f}x")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--systems', nargs='+', choices=['munis', 'caselle'],
+                        default=['munis', 'caselle'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--funds', type=int, default=60)
+    parser.add_argument('--depts', type=int, default=25)
+    parser.add_argument('--accounts', type=int, default=400)
+    parser.add_argument('--noise', type=float, default=0.5)
+    parser.add_argument('--invalid-years', type=float, default=0.01)
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument('--compare', type=Path)
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args()
+
+    options = {'funds': args.funds, 'depts': args.depts, 'accounts': args.accounts,
+               'noise': args.noise, 'invalid_years': args.invalid_years}
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': _git_revision(),
+        'ingester_version': INGESTER_VERSION,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'generator': options,
+        'repeat': args.repeat,
+        'cases': [],
+    }
+
+    for system_type in args.systems:
+        for rows in args.rows:
+            case = run_case(system_type, rows, args.repeat, options)
+            results['cases'].append(case)
+            total = sum(stage['seconds'] for name, stage in case['stages'].items()
+                        if name in ('load', 'standardize', 'validate', 'clean'))
+            print(f"✓ {system_type:8s} {rows:>10,} rows  process_file {total:8.3f}s  "
+                  f"({rows / total:12,.0f} rows/s)")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"✓ Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"⚠ {len(regressions)} stage(s) slower than {args.threshold}x baseline")
+            sys.exit(1)
+        print("✓ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
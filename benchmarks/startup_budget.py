@@ -0,0 +1,127 @@
+"""
+Startup budget: import time of entry modules in fresh interpreters
+
+Each module is imported in a new Python process (best of several runs), the
+way a CLI run or a spawned pool worker would load it, and the time is held
+to a budget. Budgets of pandas-based modules are relative to importing
+pandas itself on the same machine, so the check holds across hardware.
+Importing a module must also not load optional heavy dependencies
+(prophet, openai, openpyxl, streamlit, ...); those load on first use.
+
+Usage:
+    python benchmarks/startup_budget.py [--repeat 5] [--slack 1.25] [--profile]
+        [--modules data_ingestion ingest_cli]
+
+Exits non-zero when a module is over budget or loads a deferred dependency.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Module -> (baseline, allowance in seconds on top of the baseline).
+# 'python' modules must import with the standard library alone.
+BUDGETS: Dict[str, Tuple[str, float]] = {
+    'ingest_cli': ('python', 0.05),
+    'data_sources': ('python', 0.05),
+    'data_ingestion': ('pandas', 0.10),
+    'job_runner': ('pandas', 0.10),
+    'ingest_cache': ('pandas', 0.10),
+    'batch_ingestion': ('pandas', 0.10),
+    'detail_query': ('pandas', 0.10),
+    'rollup_cube': ('pandas', 0.10),
+    'delta_ingestion': ('pandas', 0.10),
+    'forecasting': ('pandas', 0.10),
+    'narratives': ('pandas', 0.10),
+    'workspace_server': ('pandas', 0.10),
+    'budget_warehouse': ('pandas', 0.20),
+}
+
+# Optional dependencies that must only load when their feature is used
+DEFERRED_MODULES = ['prophet', 'cmdstanpy', 'openai', 'openpyxl', 'streamlit', 'matplotlib']
+
+# Heavy packages a 'python'-baseline module must not pull in either
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': sorted({{name.split('.')[0] for name in sys.modules}})}}))
+"""
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def measure(module: str, repeat: int) -> Tuple[float, List[str]]:
+    """Best import time of a module over fresh interpreters, and what it loaded"""
+    best, loaded = float('inf'), []
+    for _ in range(repeat):
+        probe = json.loads(_run(_PROBE.format(module=module)).stdout.strip().splitlines()[-1])
+        if probe['seconds'] < best:
+            best, loaded = probe['seconds'], probe['modules']
+    return best, loaded
+
+
+def profile(module: str, top: int = 10) -> List[Tuple[int, int, str]]:
+    """Slowest imports (self us, cumulative us, name) from -X importtime"""
+    rows = []
+    for line in _run(f"import {module}", '-X', 'importtime').stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return sorted(rows, key=lambda row: row[0], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--modules', nargs='+', default=list(BUDGETS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--slack', type=float, default=1.25,
+                        help="Multiplier on every budget, for noisy machines")
+    parser.add_argument('--profile', action='store_true',
+                        help="List the slowest imports of each module")
+    args = parser.parse_args()
+
+    baselines = {'python': 0.0, 'pandas': measure('pandas', args.repeat)[0]}
+    print(f"Baseline: import pandas {baselines['pandas']:.3f}s")
+
+    failures = []
+    for module in args.modules:
+        base, allowance = BUDGETS.get(module, ('pandas', 0.10))
+        seconds, loaded = measure(module, args.repeat)
+        budget = (baselines[base] + allowance) * args.slack
+        forbidden = [name for name in DEFERRED_MODULES + (HEAVY_MODULES if base == 'python' else [])
+                     if name in loaded]
+
+        ok = seconds <= budget and not forbidden
+        marker = "✓" if ok else "⚠"
+        note = f"  loads {', '.join(forbidden)}" if forbidden else ""
+        print(f"{marker} {module:18s} {seconds:7.3f}s  (budget {budget:6.3f}s){note}")
+        if not ok:
+            failures.append(module)
+
+        if args.profile:
+            for self_us, cumulative_us, name in profile(module):
+                print(f"      {self_us / 1000:8.1f}ms self {cumulative_us / 1000:8.1f}ms total  {name.strip()}")
+
+    if failures:
+        print(f"⚠ {len(failures)} module(s) over the startup budget: {', '.join(failures)}")
+        sys.exit(1)
+    print("✓ All modules within the startup budget")
+
+
+if __name__ == "__main__":
+    main()
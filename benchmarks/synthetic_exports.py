@@ -0,0 +1,171 @@
+"""
+Synthetic Munis/Caselle export generator
+
+Builds exports in either vendor's column layout with controllable size,
+fund/dept/account cardinality, currency formatting noise and invalid
+fiscal years. Large exports are generated and written in chunks, so
+10M-row files do not need 10M rows in memory.
+
+Usage:
+    python benchmarks/synthetic_exports.py out.csv [--system caselle] [--rows 1000000]
+        [--funds 60] [--depts 25] [--accounts 400] [--noise 0.5] [--invalid-years 0.01]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data_ingestion import BudgetDataIngester
+from export_writer import write_excel
+
+# Rows generated per chunk when writing files
+GENERATOR_CHUNK_ROWS = 500_000
+
+DESCRIPTIONS = np.array([
+    'Personnel Salaries', 'Salaries - Part Time', 'Employee Benefits', 'Contractual Services',
+    'Professional Services', 'Supplies and Materials', 'Capital Outlay', 'Utilities', 'Fuel',
+    'Travel and Training', 'Equipment Maintenance', 'Insurance', 'Debt Service',
+])
+
+INVALID_YEARS = np.array(['', 'N/A', '1899', '2099', 'FY24'], dtype=object)
+
+
+def _codes(system_type: str, funds: int, depts: int, accounts: int):
+    """Code vocabularies in the vendor's style"""
+    if system_type == 'munis':
+        fund_codes = np.array([str(100 + n) for n in range(funds)], dtype=object)
+        dept_codes = np.array([str(10 + n) for n in range(depts)], dtype=object)
+        account_codes = np.array([str(51010 + 10 * n) for n in range(accounts)], dtype=object)
+    else:
+        fund_codes = np.array([f"{'GF' if n % 3 else 'SF'}{n:03d}" for n in range(funds)], dtype=object)
+        dept_codes = np.array([f"DEPT{n:02d}" for n in range(depts)], dtype=object)
+        account_codes = np.array([f"{1000 + 100 * (n // 20)}-{100 + 5 * (n % 20)}" for n in range(accounts)],
+                                 dtype=object)
+    return fund_codes, dept_codes, account_codes
+
+
+def _amounts(rng: np.random.Generator, rows: int, noise: float) -> np.ndarray:
+    """Amount strings; a `noise` fraction carries $, separators and odd negatives"""
+    values = np.round(rng.gamma(2.0, 8000.0, rows), 2)
+    out = values.astype(str).astype(object)
+
+    noisy = np.flatnonzero(rng.random(rows) < noise)
+    if len(noisy):
+        style = rng.integers(0, 4, len(noisy))
+        formatted = [f"${v:,.2f}" for v in values[noisy]]
+        out[noisy] = [
+            text if s == 0 else f"({text})" if s == 1 else f"{text}-" if s == 2 else f"  {text} "
+            for text, s in zip(formatted, style)
+        ]
+    return out
+
+
+def _pad(rng: np.random.Generator, codes: np.ndarray, noise: float) -> np.ndarray:
+    """Surround a `noise` fraction of codes with stray whitespace"""
+    padded = rng.random(len(codes)) < noise / 4
+    if padded.any():
+        codes = codes.copy()
+        codes[padded] = [f" {code} " for code in codes[padded]]
+    return codes
+
+
+def generate_export(rows: int, system_type: str = 'munis', funds: int = 60,
+                    depts: int = 25, accounts: int = 400, years: int = 5,
+                    noise: float = 0.5, invalid_years: float = 0.01,
+                    seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic export with vendor column names
+
+    Args:
+        rows: Number of rows
+        system_type: 'munis' or 'caselle'
+        funds, depts, accounts: Distinct fund/dept/account codes
+        years: Distinct fiscal years (ending at 2025)
+        noise: Fraction of amounts with currency formatting noise
+        invalid_years: Fraction of rows with unparseable or out-of-range years
+        seed: Random seed
+
+    Returns:
+        DataFrame laid out like a raw vendor export
+    """
+    rng = np.random.default_rng(seed)
+    fund_codes, dept_codes, account_codes = _codes(system_type, funds, depts, accounts)
+
+    fiscal_year = rng.integers(2026 - years, 2026, rows).astype(str).astype(object)
+    bad = np.flatnonzero(rng.random(rows) < invalid_years)
+    fiscal_year[bad] = INVALID_YEARS[rng.integers(0, len(INVALID_YEARS), len(bad))]
+
+    standard = {
+        'fund_code': _pad(rng, fund_codes[rng.integers(0, funds, rows)], noise),
+        'dept_code': _pad(rng, dept_codes[rng.integers(0, depts, rows)], noise),
+        'account_code': _pad(rng, account_codes[rng.integers(0, accounts, rows)], noise),
+        'fiscal_year': fiscal_year,
+        'budgeted_amount': _amounts(rng, rows, noise),
+        'actual_amount': _amounts(rng, rows, noise),
+        'encumbered_amount': _amounts(rng, rows, noise),
+        'description': DESCRIPTIONS[rng.integers(0, len(DESCRIPTIONS), rows)].astype(object),
+    }
+    column_map = BudgetDataIngester(system_type).column_map
+    return pd.DataFrame({vendor: standard[std] for vendor, std in column_map.items()})
+
+
+def iter_export_chunks(rows: int, chunk_rows: int = GENERATOR_CHUNK_ROWS,
+                       seed: int = 0, **options) -> Iterator[pd.DataFrame]:
+    """Generate an export as consecutive chunks (see generate_export for options)"""
+    for n, start in enumerate(range(0, rows, chunk_rows)):
+        yield generate_export(min(chunk_rows, rows - start), seed=seed + n, **options)
+
+
+def write_export(path: Union[str, Path], rows: int, **options) -> Path:
+    """
+    Write a synthetic export to .csv or .xlsx
+
+    Args:
+        path: Output file; the suffix picks the format
+        rows: Number of rows
+        **options: Passed to generate_export (system_type, funds, noise, ...)
+
+    Returns:
+        Output path
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        for n, chunk in enumerate(iter_export_chunks(rows, **options)):
+            chunk.to_csv(path, mode='w' if n == 0 else 'a', header=n == 0, index=False)
+    elif suffix == '.xlsx':
+        # Write-only workbooks are built in one pass; keep Excel sizes modest
+        write_excel(generate_export(rows, **options), path)
+    else:
+        raise ValueError(f"Unsupported synthetic export format: {suffix}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('output')
+    parser.add_argument('--system', choices=['munis', 'caselle'], default='munis')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--funds', type=int, default=60)
+    parser.add_argument('--depts', type=int, default=25)
+    parser.add_argument('--accounts', type=int, default=400)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--noise', type=float, default=0.5)
+    parser.add_argument('--invalid-years', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    path = write_export(args.output, args.rows, system_type=args.system, funds=args.funds,
+                        depts=args.depts, accounts=args.accounts, years=args.years,
+                        noise=args.noise, invalid_years=args.invalid_years, seed=args.seed)
+    print(f"✓ Wrote {args.rows:,} {args.system} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+BudgetBuddy Budget Warehouse
+Columnar on-disk store of processed budget data across counties and years
+
+Key Functions:
+- Append cleaned ingests as Parquet partitioned by county and fiscal year
+- Filter on fund/dept/account/year with partition pruning and row-group
+  statistics (predicate pushdown)
+- Keep a pre-aggregated fund summary alongside the detail so multi-year,
+  multi-county summaries never scan detail rows
+"""
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data_cleaning import AMOUNT_COLUMNS, KEY_COLUMNS, add_calculated_fields
+
+DEFAULT_WAREHOUSE_DIR = Path.home() / '.budgetbuddy' / 'warehouse'
+
+# Rows per Parquet row group; smaller groups give finer-grained pushdown
+ROW_GROUP_SIZE = 64_000
+
+PARTITION_SCHEMA = pa.schema([
+    ('county', pa.string()),
+    ('fiscal_year', pa.int16()),
+])
+
+DETAIL_SCHEMA = pa.schema(
+    [(col, pa.dictionary(pa.int32(), pa.string())) for col in KEY_COLUMNS]
+    + [(col, pa.float64()) for col in AMOUNT_COLUMNS]
+)
+
+SUMMARY_SCHEMA = pa.schema(
+    [('fund_code', pa.string())]
+    + [(col, pa.float64()) for col in AMOUNT_COLUMNS]
+)
+
+# Filter values: codes may be given as numbers (fund_code=100 matches '100')
+FilterValue = Union[str, int, Iterable]
+
+# Fields stored as strings; filter values on them are compared as text
+STRING_FIELDS = ['county'] + KEY_COLUMNS
+
+
+def _field_filter(name: str, value: FilterValue) -> ds.Expression:
+    """Equality or membership filter on one field"""
+    field = ds.field(name)
+    values = [value] if isinstance(value, (str, int, np.integer)) else list(value)
+    if not values:
+        return ds.scalar(False)
+    if name in STRING_FIELDS:
+        values = [str(item) for item in values]
+    return field == values[0] if len(values) == 1 else field.isin(values)
+
+
+def _combine_filters(filters: Dict[str, Optional[FilterValue]]) -> Optional[ds.Expression]:
+    expression = None
+    for name, value in filters.items():
+        if value is None:
+            continue
+        term = _field_filter(name, value)
+        expression = term if expression is None else expression & term
+    return expression
+
+
+class BudgetWarehouse:
+    """Partitioned Parquet store of cleaned budget data"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        """
+        Open (or create) a warehouse
+
+        Args:
+            root: Warehouse directory. Defaults to BUDGETBUDDY_WAREHOUSE_DIR
+                or ~/.budgetbuddy/warehouse.
+        """
+        root = root or os.environ.get('BUDGETBUDDY_WAREHOUSE_DIR') or DEFAULT_WAREHOUSE_DIR
+        self.root = Path(root)
+        self.detail_dir = self.root / 'detail'
+        self.summary_dir = self.root / 'summary'
+        self.detail_dir.mkdir(parents=True, exist_ok=True)
+        self.summary_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _partition_path(base: Path, county: str, fiscal_year: int) -> Path:
+        return base / f"county={quote(str(county), safe='')}" / f"fiscal_year={int(fiscal_year)}"
+
+    def _dataset(self, base: Path, schema: pa.Schema) -> ds.Dataset:
+        return ds.dataset(
+            base,
+            format='parquet',
+            schema=pa.unify_schemas([schema, PARTITION_SCHEMA]),
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+        )
+
+    def append(self, df: pd.DataFrame, county: str, replace: bool = True) -> int:
+        """
+        Store cleaned detail data for a county
+
+        Args:
+            df: Cleaned standardized data (output of clean_data)
+            county: County the data belongs to
+            replace: Drop previously stored data for the same county and
+                fiscal years first, so a re-export supersedes the old one
+
+        Returns:
+            Number of rows stored
+        """
+        if 'fiscal_year' not in df.columns:
+            raise ValueError("Cannot store data without a fiscal_year column")
+
+        missing_year = df['fiscal_year'].isna()
+        if missing_year.any():
+            print(f"⚠ Skipping {int(missing_year.sum())} rows without a fiscal year")
+            df = df[~missing_year]
+
+        # Fixed column set so every file shares one schema
+        detail = pd.DataFrame(index=df.index)
+        for col in KEY_COLUMNS:
+            values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+            detail[col] = values.astype(str).where(values.notna(), None).astype('category')
+        for col in AMOUNT_COLUMNS:
+            detail[col] = df[col].astype('float64') if col in df.columns else 0.0
+        detail['fiscal_year'] = df['fiscal_year'].astype('int64')
+
+        stored = 0
+        for fiscal_year, year_rows in detail.groupby('fiscal_year', sort=True):
+            year_rows = year_rows.drop(columns='fiscal_year')
+            # Sorting on the filter keys keeps row-group min/max stats tight
+            year_rows = year_rows.sort_values(['fund_code', 'dept_code', 'account_code'])
+
+            detail_path = self._partition_path(self.detail_dir, county, fiscal_year)
+            summary_path = self._partition_path(self.summary_dir, county, fiscal_year)
+            if replace:
+                shutil.rmtree(detail_path, ignore_errors=True)
+                shutil.rmtree(summary_path, ignore_errors=True)
+            detail_path.mkdir(parents=True, exist_ok=True)
+            summary_path.mkdir(parents=True, exist_ok=True)
+
+            part = f"part-{uuid.uuid4().hex}.parquet"
+            table = pa.Table.from_pandas(year_rows, schema=DETAIL_SCHEMA, preserve_index=False)
+            pq.write_table(table, detail_path / part, row_group_size=ROW_GROUP_SIZE)
+
+            fund_sums = year_rows.groupby('fund_code', observed=True)[AMOUNT_COLUMNS].sum().reset_index()
+            fund_sums['fund_code'] = fund_sums['fund_code'].astype(str)
+            pq.write_table(
+                pa.Table.from_pandas(fund_sums, schema=SUMMARY_SCHEMA, preserve_index=False),
+                summary_path / part
+            )
+            stored += len(year_rows)
+
+        print(f"✓ Stored {stored} rows for {county} in {self.root}")
+        return stored
+
+    def query(self, county: Optional[FilterValue] = None,
+              fiscal_year: Optional[FilterValue] = None,
+              fund_code: Optional[FilterValue] = None,
+              dept_code: Optional[FilterValue] = None,
+              account_code: Optional[FilterValue] = None,
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read detail rows matching the filters
+
+        County and fiscal year filters prune partitions; fund, dept and
+        account filters are pushed down to Parquet row-group statistics.
+        Each filter takes a single value or a list of values; codes may be
+        given as numbers (fund_code=100 matches '100').
+
+        Args:
+            county, fiscal_year, fund_code, dept_code, account_code: Filters
+            columns: Columns to read (default: all, plus calculated fields)
+
+        Returns:
+            Matching rows with county and fiscal_year columns
+        """
+        expression = _combine_filters({
+            'county': county,
+            'fiscal_year': fiscal_year,
+            'fund_code': fund_code,
+            'dept_code': dept_code,
+            'account_code': account_code,
+        })
+        table = self._dataset(self.detail_dir, DETAIL_SCHEMA).to_table(
+            columns=columns, filter=expression
+        )
+        df = table.to_pandas()
+        if 'fiscal_year' in df.columns:
+            df['fiscal_year'] = df['fiscal_year'].astype('Int16')
+        if columns is None:
+            add_calculated_fields(df)
+        return df
+
+    def fund_summary(self, county: Optional[FilterValue] = None,
+                     fiscal_year: Optional[FilterValue] = None,
+                     fund_code: Optional[FilterValue] = None,
+                     by_county: bool = False) -> pd.DataFrame:
+        """
+        Fund-by-year summary from the pre-aggregated summary partitions
+
+        Args:
+            county, fiscal_year, fund_code: Filters (single value or list)
+            by_county: Keep counties separate instead of adding them up
+
+        Returns:
+            Summary with the same columns as BudgetDataIngester.get_fund_summary
+        """
+        expression = _combine_filters({
+            'county': county,
+            'fiscal_year': fiscal_year,
+            'fund_code': fund_code,
+        })
+        sums = self._dataset(self.summary_dir, SUMMARY_SCHEMA).to_table(filter=expression)
+        if sums.num_rows == 0:
+            return pd.DataFrame()
+
+        group_cols = (['county'] if by_county else []) + ['fund_code', 'fiscal_year']
+        summary = sums.group_by(group_cols).aggregate(
+            [(col, 'sum') for col in AMOUNT_COLUMNS]
+        ).rename_columns(group_cols + AMOUNT_COLUMNS).sort_by(
+            [(col, 'ascending') for col in group_cols]
+        ).to_pandas()
+
+        summary['fiscal_year'] = summary['fiscal_year'].astype('Int16')
+        summary['variance'] = summary['actual_amount'] - summary['budgeted_amount']
+        summary['variance_pct'] = np.where(
+            summary['budgeted_amount'] != 0,
+            (summary['variance'] / summary['budgeted_amount']) * 100,
+            0
+        )
+        return summary
+
+    def counties(self) -> List[str]:
+        """Counties with stored data"""
+        return sorted(
+            unquote(path.name.split('=', 1)[1])
+            for path in self.detail_dir.glob('county=*') if path.is_dir()
+        )
+
+    def fiscal_years(self, county: str) -> List[int]:
+        """Fiscal years stored for a county"""
+        county_dir = self.detail_dir / f"county={quote(str(county), safe='')}"
+        return sorted(int(path.name.split('=', 1)[1]) for path in county_dir.glob('fiscal_year=*'))
+
+    def drop(self, county: str, fiscal_year: Optional[int] = None):
+        """Remove a county's data, or a single fiscal year of it"""
+        for base in (self.detail_dir, self.summary_dir):
+            county_dir = base / f"county={quote(str(county), safe='')}"
+            target = county_dir / f"fiscal_year={int(fiscal_year)}" if fiscal_year is not None else county_dir
+            shutil.rmtree(target, ignore_errors=True)
@@ -0,0 +1,329 @@
+"""
+BudgetBuddy Data Cleaning Engine
+Vectorized cleanup of standardized budget data
+
+Key Functions:
+- Parse currency strings straight to float64 with NumPy array operations
+- Strip and convert string columns to categoricals in one pass
+- Apply calculated fields (variance, available balance)
+- Concatenate cleaned chunks without losing categorical dtypes
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+
+AMOUNT_COLUMNS = ['budgeted_amount', 'actual_amount', 'encumbered_amount']
+
+# Low-cardinality identifier columns, stored as categoricals with string categories
+KEY_COLUMNS = ['fund_code', 'dept_code', 'account_code', 'description']
+
+# Typed standard schema for cleaned budget data
+STANDARD_SCHEMA = {
+    'fund_code': 'category',
+    'dept_code': 'category',
+    'account_code': 'category',
+    'description': 'category',
+    'fiscal_year': 'Int16',
+    'budgeted_amount': 'float64',
+    'actual_amount': 'float64',
+    'encumbered_amount': 'float64',
+}
+
+# Rows parsed per block in parse_currency; bounds the size of the character matrix
+CURRENCY_BLOCK_SIZE = 65_536
+
+# Float64 holds integers exactly up to 2**53, i.e. 15 full decimal digits;
+# longer values go through pd.to_numeric instead
+_MAX_DIGITS = 15
+
+# Character classes for currency parsing: 0-9 digit value, then the codes below
+# (NUL pads the fixed-width strings, so it counts as trailing whitespace)
+_DOT, _COMMA, _SPACE, _SIGN, _MINUS, _OPEN, _CLOSE, _INVALID = range(10, 18)
+_CHAR_CLASS = np.full(256, _INVALID, dtype=np.uint8)
+_CHAR_CLASS[ord('0'):ord('9') + 1] = np.arange(10, dtype=np.uint8)
+_CHAR_CLASS[ord('.')] = _DOT
+_CHAR_CLASS[ord(',')] = _COMMA
+for _ch in ' \t\0':
+    _CHAR_CLASS[ord(_ch)] = _SPACE
+for _ch in '$+':
+    _CHAR_CLASS[ord(_ch)] = _SIGN
+_CHAR_CLASS[ord('-')] = _MINUS
+_CHAR_CLASS[ord('(')] = _OPEN
+_CHAR_CLASS[ord(')')] = _CLOSE
+
+
+def _parse_currency_block(values: np.ndarray) -> np.ndarray:
+    """
+    Parse one block of currency strings; unparseable entries become NaN
+
+    Accepted: optional whitespace, '$' and '+' before the number, digits
+    with thousands separators and one decimal point, and one negative
+    marker - a leading '-', a trailing '-' or parentheses around the whole
+    value. Anything else (a sign or parenthesis inside the number, spaces
+    between digits, exponents, more than _MAX_DIGITS digits, non-ASCII
+    text) is left to pd.to_numeric after dropping '$', separators and
+    surrounding whitespace, so malformed amounts come out NaN.
+    """
+    text = np.asarray(values, dtype='U')
+    n_rows = len(text)
+    width = text.dtype.itemsize // 4
+    if width == 0:
+        return np.full(n_rows, np.nan)
+
+    # One row of UCS-4 code points per value, transposed so each character
+    # position is a contiguous vector
+    code_points = text.view(np.uint32).reshape(n_rows, width)
+    non_ascii = (code_points > 255).any(axis=1)
+    char_class = np.ascontiguousarray(_CHAR_CLASS[code_points.astype(np.uint8)].T)
+
+    mantissa = np.zeros(n_rows, dtype=np.float64)
+    frac_digits = np.zeros(n_rows, dtype=np.int16)
+    n_digits = np.zeros(n_rows, dtype=np.int16)
+    seen_dot = np.zeros(n_rows, dtype=bool)
+    # Scan state: inside the number, past its end, past a closing parenthesis
+    started = np.zeros(n_rows, dtype=bool)
+    ended = np.zeros(n_rows, dtype=bool)
+    closed = np.zeros(n_rows, dtype=bool)
+    minus_count = np.zeros(n_rows, dtype=np.int16)
+    open_count = np.zeros(n_rows, dtype=np.int16)
+    invalid = non_ascii
+
+    for position in char_class:
+        is_digit = position < 10
+        is_dot = position == _DOT
+        in_number = is_digit | is_dot | (position == _COMMA)
+        is_minus = position == _MINUS
+        is_open = position == _OPEN
+        is_close = position == _CLOSE
+
+        np.multiply(mantissa, 10, out=mantissa, where=is_digit)
+        np.add(mantissa, position, out=mantissa, where=is_digit)
+        n_digits += is_digit
+        frac_digits += is_digit & seen_dot
+        invalid |= is_dot & seen_dot
+        seen_dot |= is_dot
+
+        # Number characters only in one unbroken run; separators only inside it
+        invalid |= in_number & ended
+        invalid |= (position == _COMMA) & ~started
+        started |= is_digit | is_dot
+        ended |= started & ~in_number
+        # '$', '+' and '(' only before the number, ')' only after it,
+        # nothing but whitespace after ')'
+        invalid |= (position == _SIGN) & started
+        invalid |= is_open & started
+        invalid |= is_close & ~started
+        invalid |= closed & (position != _SPACE)
+        closed |= is_close
+        minus_count += is_minus
+        open_count += is_open
+        invalid |= position == _INVALID
+
+    # One negative marker at most; parentheses must pair up
+    invalid |= (minus_count > 1) | (open_count > 1) | (open_count != closed)
+    invalid |= (minus_count > 0) & (open_count > 0)
+    negative = (minus_count > 0) | (open_count > 0)
+
+    # Integer mantissa divided by an exact power of ten is correctly rounded,
+    # matching float() on the cleaned string
+    result = mantissa / np.power(10.0, frac_digits)
+    np.negative(result, out=result, where=negative)
+    result[n_digits == 0] = np.nan
+    rejected = np.flatnonzero((invalid | (n_digits > _MAX_DIGITS)) & (n_digits > 0))
+    if len(rejected):
+        stripped = pd.Series(text[rejected], dtype=object).str.replace(r'[$,]', '', regex=True).str.strip()
+        result[rejected] = pd.to_numeric(stripped, errors='coerce').to_numpy(dtype=np.float64,
+                                                                            na_value=np.nan)
+    return result
+
+
+def parse_currency(values, block_size: int = CURRENCY_BLOCK_SIZE) -> np.ndarray:
+    """
+    Parse currency-formatted values to float64
+
+    Handles '$' signs, thousands separators, surrounding whitespace,
+    parenthesized negatives ('(1,200.00)') and trailing minus ('1200.00-').
+    Signs or parentheses inside a number ('12-34') and spaces between
+    digits ('1 2 3') are not amounts and come out NaN.
+
+    Args:
+        values: Series or array of strings and/or numbers
+        block_size: Rows converted per block
+
+    Returns:
+        float64 array; values that cannot be parsed are NaN
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+
+    array = np.asarray(values, dtype=object)
+    result = np.empty(len(array), dtype=np.float64)
+    for start in range(0, len(array), block_size):
+        block = array[start:start + block_size]
+        result[start:start + block_size] = _parse_currency_block(block)
+    return result
+
+
+def to_stripped_categorical(series: pd.Series) -> pd.Series:
+    """
+    Strip whitespace and convert a string column to a categorical
+
+    Values are factorized once; stripping runs on the unique values only.
+    Non-string values are converted to strings so categories are uniform.
+
+    Args:
+        series: Object, string, numeric or categorical Series
+
+    Returns:
+        Categorical Series with stripped categories
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+
+    if len(uniques) == 0:
+        return pd.Series(
+            pd.Categorical([np.nan] * len(series)), index=series.index, name=series.name
+        )
+
+    # Codes parsed as numbers (e.g. Munis fund 100) become their string form
+    stripped = [value.strip() if isinstance(value, str) else str(value) for value in uniques]
+    # Values that differ only by whitespace collapse onto one (sorted) category
+    category_codes, categories = pd.factorize(pd.Index(stripped), sort=True)
+    new_codes = np.where(codes >= 0, category_codes.take(np.maximum(codes, 0)), -1)
+
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+def to_fiscal_year(values: pd.Series) -> pd.Series:
+    """
+    Convert fiscal year values to nullable int16
+
+    Values that are non-numeric, fractional or outside the int16 range
+    become <NA> rather than raising.
+
+    Args:
+        values: Series of raw fiscal year values
+
+    Returns:
+        Int16 Series
+    """
+    years = pd.to_numeric(values, errors='coerce').astype('float64')
+    int16_range = np.iinfo(np.int16)
+    years = years.where(
+        (years == np.floor(years)) & (years >= int16_range.min) & (years <= int16_range.max)
+    )
+    return years.astype(STANDARD_SCHEMA['fiscal_year'])
+
+
+def clean_frame(df: pd.DataFrame, categorize: bool = True,
+                parsed: Optional[Dict[str, pd.Series]] = None) -> pd.DataFrame:
+    """
+    Apply type conversion, cleanup and calculated fields to a frame in place
+
+    Args:
+        df: DataFrame with standardized column names
+        categorize: Convert string columns to stripped categoricals. When False
+            string columns are stripped and left as strings.
+        parsed: Columns already converted by validate_frame, used as-is
+
+    Returns:
+        The same DataFrame, cleaned
+    """
+    parsed = parsed or {}
+
+    # Convert fiscal year to int16 where possible
+    if 'fiscal_year' in parsed:
+        df['fiscal_year'] = parsed['fiscal_year']
+    elif 'fiscal_year' in df.columns:
+        df['fiscal_year'] = to_fiscal_year(df['fiscal_year'])
+
+    # Parse amount columns directly to float64
+    for col in AMOUNT_COLUMNS:
+        if col in df.columns:
+            amounts = parse_currency(df[col])
+            amounts[np.isnan(amounts)] = 0
+            df[col] = amounts
+
+    # Strip whitespace from string columns; key columns always follow the schema
+    string_cols = [
+        col for col in df.columns
+        if col in KEY_COLUMNS
+        or pd.api.types.is_object_dtype(df[col].dtype)
+        or pd.api.types.is_string_dtype(df[col].dtype)
+        or isinstance(df[col].dtype, pd.CategoricalDtype)
+    ]
+    for col in string_cols:
+        if categorize or col in KEY_COLUMNS or isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = to_stripped_categorical(df[col])
+        else:
+            df[col] = df[col].str.strip()
+
+    return add_calculated_fields(df)
+
+
+def add_calculated_fields(df: pd.DataFrame) -> pd.DataFrame:
+    """Add variance, variance_pct and available_balance from amount columns in place"""
+    # Add calculated fields
+    if 'budgeted_amount' in df.columns and 'actual_amount' in df.columns:
+        df['variance'] = df['actual_amount'] - df['budgeted_amount']
+        df['variance_pct'] = np.where(
+            df['budgeted_amount'] != 0,
+            (df['variance'] / df['budgeted_amount']) * 100,
+            0
+        )
+
+    # Add available balance (if encumbrances exist)
+    if all(col in df.columns for col in AMOUNT_COLUMNS):
+        df['available_balance'] = df['budgeted_amount'] - df['actual_amount'] - df['encumbered_amount']
+
+    return df
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Concatenate cleaned frames, unioning categorical columns
+
+    pd.concat falls back to object dtype when categories differ between
+    frames; this keeps such columns categorical.
+
+    Args:
+        frames: Cleaned DataFrames with the same columns
+
+    Returns:
+        Combined DataFrame, or None if frames is empty
+    """
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+
+    categorical_cols = [
+        col for col in frames[0].columns
+        if all(
+            col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype)
+            for frame in frames
+        )
+    ]
+    combined = pd.concat(frames, ignore_index=True)
+    for col in categorical_cols:
+        combined[col] = pd.api.types.union_categoricals(
+            [frame[col] for frame in frames], sort_categories=True
+        )
+
+    return combined
+
+
+def decategorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert categorical columns of a small frame back to plain values"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
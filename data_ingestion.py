@@ -1,94 +1,207 @@
 """
 BudgetBuddy Data Ingestion Module
-Handles Munis and Caselle financial system exports
+Handles Munis, Caselle, Incode, Springbrook and user-defined exports
 
 Key Functions:
-- Parse CSV/Excel exports from Munis/Caselle
+- Parse CSV/Excel exports, detecting the vendor from the header row
 - Standardize data structure across systems
 - Validate and clean fund/account data
+- Refresh stored datasets from periodic exports, cleaning only changed rows
 - Prepare data for forecasting and narrative generation
 """
 
+import io
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_cleaning import (
+    AMOUNT_COLUMNS, KEY_COLUMNS, STANDARD_SCHEMA, clean_frame, concat_frames, decategorize,
+    to_fiscal_year
+)
+from data_sources import ExportSource, is_path, open_source, source_name, source_suffix
+from data_validation import rule_rows, validate_frame
+from delta_ingestion import (
+    CONTENT_HASH, KEY_HASH, content_hashes, diff_rows, key_hashes, line_hashes, match_rows,
+    read_csv_records
+)
+from excel_reader import iter_excel_chunks, read_excel_fast
+from export_writer import export_frame
+from pipeline_metrics import PipelineMetrics
+from rollup_cube import RollupCube
+from trend_series import TrendSeries
+from vendor_schemas import best_match, get_schema, read_headers
+
+# Bump whenever ingestion output changes; invalidates cached results
+INGESTER_VERSION = '1.3.0'
+
+# Rows per chunk for streaming ingestion; bounds peak memory on large exports
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Excel formats that can be streamed in openpyxl read-only mode
+EXCEL_STREAMING_SUFFIXES = ['.xlsx', '.xlsm']
+
+# Stages process_file reports to its progress callback, in order
+PROCESS_STAGES = ['cache_lookup', 'load', 'standardize', 'validate', 'clean', 'cache_store']
 
 
 class BudgetDataIngester:
     """Main class for ingesting and standardizing budget data"""
     
-    # Standard column mappings for different systems
-    MUNIS_COLUMN_MAP = {
-        'Fund': 'fund_code',
-        'Department': 'dept_code',
-        'Account': 'account_code',
-        'FY': 'fiscal_year',
-        'Budget': 'budgeted_amount',
-        'Actual': 'actual_amount',
-        'Encumbrance': 'encumbered_amount',
-        'Description': 'description'
-    }
-    
-    CASELLE_COLUMN_MAP = {
-        'Fund Code': 'fund_code',
-        'Dept Code': 'dept_code',
-        'GL Account': 'account_code',
-        'Fiscal Year': 'fiscal_year',
-        'Budgeted': 'budgeted_amount',
-        'Actuals': 'actual_amount',
-        'Encumbrances': 'encumbered_amount',
-        'Account Description': 'description'
-    }
-    
-    def __init__(self, system_type: str = 'munis'):
+    # Standard column mappings for different systems (see vendor_schemas)
+    MUNIS_COLUMN_MAP = get_schema('munis').column_map
+    
+    CASELLE_COLUMN_MAP = get_schema('caselle').column_map
+    
+    def __init__(self, system_type: str = 'munis', metrics: Optional[PipelineMetrics] = None):
         """
         Initialize ingester for specific financial system
         
         Args:
-            system_type: 'munis' or 'caselle'
+            system_type: A registered vendor schema ('munis', 'caselle',
+                'incode', 'springbrook', ...) or 'auto' to detect the
+                vendor from each export's header row
+            metrics: Stage timing collector; defaults to one that is
+                disabled unless BUDGETBUDDY_METRICS is set
         """
         self.system_type = system_type.lower()
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
         self.column_map = self._get_column_map()
+        self.detected_system = None if self.system_type == 'auto' else self.system_type
         self.raw_data = None
-        self.standardized_data = None
-        
+        self._fund_summary = None
+        self._rollup_cube = None
+        self._trend_series = None
+        self._standardized_data = None
+        self.validation_flags = None
+        self._parsed_columns = {}
+        self.delta_stats = None
+        
+    @property
+    def standardized_data(self) -> Optional[pd.DataFrame]:
+        """Standardized (and, after clean_data, cleaned) budget data"""
+        return self._standardized_data
+    
+    @standardized_data.setter
+    def standardized_data(self, df: Optional[pd.DataFrame]):
+        # Replacing the data drops the memoized fund summary, rollup cube and
+        # validation results. Mutating the frame in place does not; reassign
+        # it or call invalidate_summary() afterwards.
+        self._standardized_data = df
+        self._fund_summary = None
+        self._rollup_cube = None
+        self._trend_series = None
+        self.validation_flags = None
+        self._parsed_columns = {}
+    
+    def invalidate_summary(self):
+        """Drop the memoized fund summary and rollup cube so they are recomputed on next use"""
+        self._fund_summary = None
+        self._rollup_cube = None
+        self._trend_series = None
+    
     def _get_column_map(self) -> Dict:
         """Get appropriate column mapping for system type"""
-        if self.system_type == 'munis':
-            return self.MUNIS_COLUMN_MAP
-        elif self.system_type == 'caselle':
-            return self.CASELLE_COLUMN_MAP
+        if self.system_type == 'auto':
+            # Filled in from the export headers by _resolve_columns()
+            return {}
+        return dict(get_schema(self.system_type).column_map)
+    
+    def _resolve_columns(self, source: ExportSource, name: Optional[str] = None,
+                         memory_map: bool = False) -> Optional[List[str]]:
+        """
+        Fit the column map to an export's header row before parsing
+        
+        Only the header bytes are read. With system_type 'auto' the vendor
+        is detected; otherwise the chosen schema is matched against the
+        headers (case/whitespace-insensitively) and a likely wrong pick is
+        reported.
+        
+        Returns:
+            Header names to parse, or None to read every column (none of
+            the mapped columns were found)
+        """
+        header_lists = read_headers(source, name, memory_map)
+        if self.system_type == 'auto':
+            schema, resolved = best_match(header_lists)
+            print(f"✓ Detected {schema.label} export")
         else:
-            raise ValueError(f"Unsupported system type: {self.system_type}")
+            schema = get_schema(self.system_type)
+            resolved = max((schema.resolve(headers) for headers in header_lists), key=len, default={})
+            try:
+                likely, likely_map = best_match(header_lists)
+            except ValueError:
+                likely = None
+            if likely is not None and likely.name != schema.name and len(likely_map) > len(resolved):
+                print(f"⚠ Warning: headers look like a {likely.label} export, not {schema.label}")
+            if not resolved:
+                self.column_map = self._get_column_map()
+                return None
+        
+        self.column_map = resolved
+        self.detected_system = schema.name
+        return list(resolved)
     
-    def load_file(self, filepath: str) -> pd.DataFrame:
+    def _parse_dtypes(self) -> Dict[str, str]:
+        """
+        Parse-time dtype hints for vendor columns
+        
+        Key columns are read straight into categoricals. Fiscal years and
+        amounts are left to the parser because exports carry currency
+        formatting and bad years that a strict dtype would reject;
+        clean_data() narrows them to the standard schema.
+        """
+        return {
+            vendor_col: STANDARD_SCHEMA[std_col]
+            for vendor_col, std_col in self.column_map.items()
+            if std_col in KEY_COLUMNS
+        }
+    
+    def load_file(self, source: ExportSource, name: Optional[str] = None,
+                  memory_map: bool = False) -> pd.DataFrame:
         """
         Load export file (CSV or Excel)
         
         Args:
-            filepath: Path to export file
+            source: Path to export file, or the upload itself as bytes,
+                bytearray, memoryview or a binary file-like object. Buffers
+                are parsed in place, without a temp-file round trip.
+            name: Original file name of an in-memory upload (used for the
+                format; the content is sniffed when there is no name)
+            memory_map: Memory-map a path source instead of reading it
             
         Returns:
             Raw DataFrame
         """
-        file_path = Path(filepath)
+        if is_path(source) and not Path(source).exists():
+            raise FileNotFoundError(f"File not found: {source}")
         
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {filepath}")
+        suffix = source_suffix(source, name)
+        label = source_name(source, name)
+        if suffix not in ['.csv', '.xls'] + EXCEL_STREAMING_SUFFIXES:
+            raise ValueError(f"Unsupported file type: {suffix}")
         
         # Determine file type and load
-        if file_path.suffix.lower() in ['.xlsx', '.xls']:
-            self.raw_data = pd.read_excel(filepath)
-        elif file_path.suffix.lower() == '.csv':
-            self.raw_data = pd.read_csv(filepath)
-        else:
-            raise ValueError(f"Unsupported file type: {file_path.suffix}")
-        
-        print(f"✓ Loaded {len(self.raw_data)} rows from {file_path.name}")
+        with self.metrics.stage('load') as stage:
+            # Unmapped columns are never parsed
+            usecols = self._resolve_columns(source, name, memory_map)
+            with open_source(source, memory_map) as readable:
+                if suffix in EXCEL_STREAMING_SUFFIXES:
+                    # Only the mapped columns of the sheet holding them are read
+                    self.raw_data = read_excel_fast(
+                        readable, columns=usecols, dtype=self._parse_dtypes(),
+                        name=label
+                    )
+                elif suffix == '.xls':
+                    self.raw_data = pd.read_excel(readable, dtype=self._parse_dtypes(),
+                                                  usecols=usecols)
+                else:
+                    self.raw_data = pd.read_csv(readable, dtype=self._parse_dtypes(),
+                                                usecols=usecols)
+            stage.rows = len(self.raw_data)
+        
+        print(f"✓ Loaded {len(self.raw_data)} rows from {label}")
         return self.raw_data
     
     def standardize_columns(self) -> pd.DataFrame:
@@ -107,13 +220,14 @@ class BudgetDataIngester:
             if old in self.raw_data.columns
         }
         
-        if not available_mappings:
-            print("⚠ Warning: No standard columns found. Using original column names.")
-            self.standardized_data = self.raw_data.copy()
-        else:
-            # Rename columns and keep any extras
-            self.standardized_data = self.raw_data.rename(columns=available_mappings)
-            print(f"✓ Standardized {len(available_mappings)} columns")
+        with self.metrics.stage('standardize', rows=len(self.raw_data)):
+            if not available_mappings:
+                print("⚠ Warning: No standard columns found. Using original column names.")
+                self.standardized_data = self.raw_data.copy()
+            else:
+                # Rename columns and keep any extras
+                self.standardized_data = self.raw_data.rename(columns=available_mappings)
+                print(f"✓ Standardized {len(available_mappings)} columns")
         
         return self.standardized_data
     
@@ -121,44 +235,20 @@ class BudgetDataIngester:
         """
         Validate data quality and completeness
         
+        All rules are evaluated in one vectorized pass. Offending rows are
+        recorded per rule in validation_flags (see invalid_rows()), and the
+        parsed fiscal years are handed to clean_data() for reuse.
+        
         Returns:
             (is_valid, list of issues)
         """
         if self.standardized_data is None:
             raise ValueError("No standardized data. Call standardize_columns() first.")
         
-        issues = []
-        
-        # Required columns check
-        required = ['fund_code', 'account_code', 'fiscal_year']
-        missing = [col for col in required if col not in self.standardized_data.columns]
-        if missing:
-            issues.append(f"Missing required columns: {missing}")
-        
-        # Check for amount columns (at least one should exist)
-        amount_cols = ['budgeted_amount', 'actual_amount']
-        has_amounts = any(col in self.standardized_data.columns for col in amount_cols)
-        if not has_amounts:
-            issues.append("No budget or actual amount columns found")
-        
-        # Data quality checks
-        if 'fiscal_year' in self.standardized_data.columns:
-            # Convert to numeric for validation
-            fy_numeric = pd.to_numeric(self.standardized_data['fiscal_year'], errors='coerce')
-            invalid_years = self.standardized_data[
-                (fy_numeric < 1990) | 
-                (fy_numeric > 2050) |
-                (fy_numeric.isna())
-            ]
-            if len(invalid_years) > 0:
-                issues.append(f"Found {len(invalid_years)} rows with invalid fiscal years")
-        
-        # Check for nulls in key columns
-        for col in ['fund_code', 'account_code']:
-            if col in self.standardized_data.columns:
-                null_count = self.standardized_data[col].isna().sum()
-                if null_count > 0:
-                    issues.append(f"{col} has {null_count} null values")
+        with self.metrics.stage('validate', rows=len(self.standardized_data)):
+            issues, self.validation_flags, self._parsed_columns = validate_frame(
+                self.standardized_data
+            )
         
         is_valid = len(issues) == 0
         
@@ -171,85 +261,421 @@ class BudgetDataIngester:
         
         return is_valid, issues
     
-    def clean_data(self) -> pd.DataFrame:
+    def invalid_rows(self, rule: Optional[str] = None) -> np.ndarray:
+        """
+        Positions of rows in standardized_data that break a validation rule
+        
+        Args:
+            rule: Name from VALIDATION_RULES; None matches any rule
+            
+        Returns:
+            Sorted row positions (for standardized_data.iloc)
+        """
+        if self.standardized_data is None:
+            raise ValueError("No standardized data available")
+        if self.validation_flags is None:
+            # Cached, streamed or appended data; cleaned columns keep every
+            # rule's outcome, so the flags can be rebuilt from them
+            _, self.validation_flags, _ = validate_frame(self.standardized_data)
+        return rule_rows(self.validation_flags, rule)
+    
+    def clean_data(self, inplace: bool = False, categorize: bool = True) -> pd.DataFrame:
         """
         Clean and prepare data for analysis
         
+        Args:
+            inplace: Clean standardized_data without taking a defensive copy
+                first. Halves peak memory; raw_data may share the cleaned
+                columns afterwards.
+            categorize: Store string columns as stripped categoricals
+        
         Returns:
             Cleaned DataFrame
         """
         if self.standardized_data is None:
             raise ValueError("No standardized data available")
         
-        df = self.standardized_data.copy()
-        
-        # Convert fiscal year to int where possible
-        if 'fiscal_year' in df.columns:
-            df['fiscal_year'] = pd.to_numeric(df['fiscal_year'], errors='coerce').astype('Int64')
-        
-        # Clean and convert amount columns
-        amount_cols = ['budgeted_amount', 'actual_amount', 'encumbered_amount']
-        for col in amount_cols:
-            if col in df.columns:
-                # Remove currency symbols, commas
-                if df[col].dtype == 'object':
-                    df[col] = df[col].str.replace('[$,]', '', regex=True)
-                # Convert to float
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Trim whitespace from string columns
-        string_cols = df.select_dtypes(include=['object']).columns
-        for col in string_cols:
-            df[col] = df[col].str.strip() if df[col].dtype == 'object' else df[col]
-        
-        # Add calculated fields
-        if 'budgeted_amount' in df.columns and 'actual_amount' in df.columns:
-            df['variance'] = df['actual_amount'] - df['budgeted_amount']
-            df['variance_pct'] = np.where(
-                df['budgeted_amount'] != 0,
-                (df['variance'] / df['budgeted_amount']) * 100,
-                0
-            )
-        
-        # Add available balance (if encumbrances exist)
-        if all(col in df.columns for col in ['budgeted_amount', 'actual_amount', 'encumbered_amount']):
-            df['available_balance'] = df['budgeted_amount'] - df['actual_amount'] - df['encumbered_amount']
+        with self.metrics.stage('clean', rows=len(self.standardized_data)):
+            df = self.standardized_data if inplace else self.standardized_data.copy()
+            df = clean_frame(df, categorize=categorize, parsed=self._parsed_columns)
         
+        # Cleaning keeps every row, so validation flags stay aligned
+        flags = self.validation_flags
         self.standardized_data = df
+        self.validation_flags = flags
         print(f"✓ Data cleaned: {len(df)} rows, {len(df.columns)} columns")
         
         return df
     
-    def get_fund_summary(self) -> pd.DataFrame:
+    def process_file(self, source: ExportSource, cache=None,
+                     progress: Optional[Callable[[str], None]] = None,
+                     name: Optional[str] = None,
+                     memory_map: bool = False) -> Tuple[pd.DataFrame, bool, List[str]]:
         """
-        Generate fund-level summary for quick analysis
+        Run the full load/standardize/validate/clean pipeline
         
+        Args:
+            source: Path to export file, or an in-memory upload (see load_file)
+            cache: Optional IngestCache; results for an identical export
+                (same content, system type and ingester version) are
+                returned without reprocessing
+            progress: Optional callback invoked with each PROCESS_STAGES
+                name as that stage starts
+            name: Original file name of an in-memory upload
+            memory_map: Memory-map a path source instead of reading it
+            
         Returns:
-            Summary DataFrame grouped by fund and fiscal year
+            (cleaned DataFrame, is_valid, list of validation issues)
         """
-        if self.standardized_data is None:
-            raise ValueError("No data available")
+        progress = progress or (lambda stage: None)
+        label = source_name(source, name)
+        self.metrics.reset()
+        key = None
+        if cache is not None:
+            progress('cache_lookup')
+            with self.metrics.stage('cache_lookup'):
+                key = cache.make_key(source, self.system_type)
+                cached = cache.get(key)
+            if cached is not None:
+                detail, summary, metadata = cached
+                self.raw_data = None
+                self.standardized_data = detail
+                self._fund_summary = summary
+                self.detected_system = metadata.get('system_type', self.detected_system)
+                self.restore_column_map(metadata)
+                print(f"✓ Loaded {len(detail)} cleaned rows from cache")
+                self.metrics.write_log(source=label, system_type=self.system_type,
+                                       cached=True)
+                return detail, metadata['is_valid'], metadata['issues']
+        
+        progress('load')
+        self.load_file(source, name=name, memory_map=memory_map)
+        progress('standardize')
+        self.standardize_columns()
+        progress('validate')
+        is_valid, issues = self.validate_data()
+        progress('clean')
+        df = self.clean_data(inplace=True)
+        
+        if cache is not None:
+            progress('cache_store')
+            summary = self.get_fund_summary()
+            with self.metrics.stage('cache_store', rows=len(df)):
+                cache.put(key, df, summary, {
+                    'is_valid': is_valid,
+                    'issues': issues,
+                    'source': label,
+                    'system_type': self.detected_system,
+                    'column_map': self.column_map,
+                })
+        
+        self.metrics.write_log(source=label, system_type=self.system_type,
+                               cached=False)
+        return df, is_valid, issues
+    
+    def restore_column_map(self, metadata: Dict):
+        """
+        Restore the column map saved with a cached result
         
-        group_cols = ['fund_code', 'fiscal_year']
-        available_groups = [col for col in group_cols if col in self.standardized_data.columns]
+        Later appends and refreshes rename vendor columns with it, as if
+        the export had been parsed here. Entries stored without one fall
+        back to the detected system's schema.
         
-        if not available_groups:
-            print("⚠ Cannot create fund summary - missing grouping columns")
-            return pd.DataFrame()
+        Args:
+            metadata: Cache entry metadata (see process_file)
+        """
+        if metadata.get('column_map'):
+            self.column_map = dict(metadata['column_map'])
+        elif not self.column_map and self.detected_system:
+            self.column_map = dict(get_schema(self.detected_system).column_map)
+    
+    def process_delta(self, source: ExportSource, store, dataset: str,
+                      name: Optional[str] = None,
+                      memory_map: bool = False) -> Tuple[pd.DataFrame, bool, List[str]]:
+        """
+        Refresh a stored dataset from a new full export, processing only what changed
+        
+        Every export row is hashed (CSV rows as raw lines, before any
+        parsing) and matched against the stored row hashes. Only rows that
+        are not stored yet are parsed, validated and cleaned; they replace
+        stored rows with the same fund/dept/account/fiscal year key, and
+        stored rows of the export's fiscal years that the export no longer
+        has are removed. Only the fiscal years with changes are rewritten,
+        and the fund summary is regrouped for the affected funds of those
+        years only. Row counts per outcome are left in delta_stats.
+        
+        Raw-line and parsed-row hashes never match each other, so a dataset
+        stored from a CSV and refreshed from Excel (or the reverse) is
+        reprocessed in full; delta_stats then counts its rows as
+        'reprocessed' rather than added or changed.
+        
+        Args:
+            source: Path to export file, or an in-memory upload (see load_file)
+            store: DeltaStore holding the dataset
+            dataset: Dataset name (e.g. the county)
+            name: Original file name of an in-memory upload
+            memory_map: Memory-map a path source instead of reading it
+            
+        Returns:
+            (cleaned DataFrame of the whole dataset, is_valid, validation
+            issues of the processed rows)
+        """
+        if is_path(source) and not Path(source).exists():
+            raise FileNotFoundError(f"File not found: {source}")
+        label = source_name(source, name)
+        self.metrics.reset()
+        
+        records = read_csv_records(source, memory_map) if source_suffix(source, name) == '.csv' else None
+        row_hashes = 'parsed_values' if records is None else 'csv_lines'
+        
+        metadata = store.metadata(dataset)
+        reprocessing = False
+        if metadata is not None and metadata.get('ingester_version') != INGESTER_VERSION:
+            print(f"⚠ Stored {dataset} data is from ingester {metadata.get('ingester_version')}; "
+                  "reprocessing all rows")
+            metadata, reprocessing = None, True
+        elif metadata is not None and metadata.get('row_hashes') != row_hashes:
+            print(f"⚠ Stored {dataset} rows were hashed as {metadata.get('row_hashes')}, "
+                  f"this export as {row_hashes}; reprocessing all rows")
+            metadata, reprocessing = None, True
+        if metadata is None:
+            # Nothing usable stored (or a first load never finished): start over
+            store.clear(dataset)
+        stored = store.load_hashes(dataset) if metadata is not None else None
+        
+        if records is None:
+            # Excel, or a CSV with line breaks inside fields: parse, then hash parsed rows
+            self.load_file(source, name=name, memory_map=memory_map)
+            export = self._standardize_frame(self.raw_data)
+            with self.metrics.stage('diff', rows=len(export)):
+                content = content_hashes(export)
+                new, present = match_rows(content, stored)
+            # Plain values: the export's categoricals carry every row's categories
+            rows = decategorize(export.iloc[new].reset_index(drop=True))
+        else:
+            header, lines = records
+            with self.metrics.stage('diff', rows=len(lines)):
+                content = line_hashes(lines)
+                new, present = match_rows(content, stored)
+            with self.metrics.stage('load', rows=len(new)):
+                usecols = self._resolve_columns(source, name, memory_map)
+                self.raw_data = pd.read_csv(io.BytesIO(b'\n'.join([header, *lines[new]])),
+                                            dtype=self._parse_dtypes(), usecols=usecols)
+            rows = self._standardize_frame(self.raw_data)
+        
+        with self.metrics.stage('classify', rows=len(rows)):
+            hashes = pd.DataFrame({KEY_HASH: key_hashes(rows), CONTENT_HASH: content[new],
+                                   'fiscal_year': to_fiscal_year(rows['fiscal_year'])})
+            diff = diff_rows(hashes[KEY_HASH].to_numpy(), hashes['fiscal_year'], stored, present)
+        if reprocessing:
+            # Nothing stored could be compared; no row is known to be new or changed
+            self.delta_stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0,
+                                'reprocessed': len(rows)}
+        else:
+            self.delta_stats = {**diff.counts(), 'reprocessed': 0}
         
-        agg_dict = {}
-        if 'budgeted_amount' in self.standardized_data.columns:
-            agg_dict['budgeted_amount'] = 'sum'
-        if 'actual_amount' in self.standardized_data.columns:
-            agg_dict['actual_amount'] = 'sum'
-        if 'encumbered_amount' in self.standardized_data.columns:
-            agg_dict['encumbered_amount'] = 'sum'
+        issues = []
+        if diff.is_empty:
+            print(f"✓ No changes to {dataset}: {diff.unchanged} rows unchanged")
+        else:
+            with self.metrics.stage('validate', rows=len(rows)):
+                issues, _, parsed = validate_frame(rows)
+            with self.metrics.stage('clean', rows=len(rows)):
+                new_rows = clean_frame(rows, parsed=parsed)
+            
+            with self.metrics.stage('delta_store', rows=len(new_rows)):
+                dropped_rows = stored.iloc[diff.dropped] if stored is not None else hashes.iloc[:0]
+                years = pd.concat([new_rows['fiscal_year'], dropped_rows['fiscal_year']]).unique()
+                touched, dropped = store.upsert(dataset, new_rows, hashes,
+                                                dropped_rows[CONTENT_HASH].to_numpy(), years)
+            
+            with self.metrics.stage('fund_summary', rows=len(touched)):
+                summary = self._update_fund_summary(
+                    store.load_summary(dataset), touched, [new_rows, dropped], years
+                )
+                store.save_summary(dataset, summary, {
+                    'ingester_version': INGESTER_VERSION,
+                    'system_type': self.detected_system,
+                    'source': label,
+                    'row_hashes': row_hashes,
+                })
+            counts = self.delta_stats
+            if reprocessing:
+                print(f"✓ Reprocessed {dataset}: {counts['reprocessed']} rows")
+            else:
+                print(f"✓ Refreshed {dataset}: {counts['added']} added, {counts['changed']} changed, "
+                      f"{counts['removed']} removed, {counts['unchanged']} unchanged")
+        
+        with self.metrics.stage('delta_load'):
+            detail = store.load_detail(dataset)
+            self.standardized_data = detail
+            self._fund_summary = store.load_summary(dataset)
         
-        if not agg_dict:
-            print("⚠ No amount columns to summarize")
+        is_valid = len(issues) == 0
+        if not is_valid:
+            print(f"⚠ Data validation found {len(issues)} issues in the processed rows:")
+            for issue in issues:
+                print(f"  - {issue}")
+        
+        self.metrics.write_log(source=label, system_type=self.system_type,
+                               cached=False)
+        return detail, is_valid, issues
+    
+    def _update_fund_summary(self, summary: Optional[pd.DataFrame], touched: pd.DataFrame,
+                             changed: List[pd.DataFrame], fiscal_years) -> pd.DataFrame:
+        """
+        Fund summary with only the changed funds of the given years regrouped
+        
+        Args:
+            summary: Summary before the change (None: touched is everything)
+            touched: Cleaned detail of fiscal_years after the change
+            changed: Frames of added and removed detail rows
+            fiscal_years: Years the change touched
+            
+        Returns:
+            Summary frame of the whole dataset
+        """
+        group_cols = self._fund_group_columns(touched)
+        if summary is None or summary.empty or group_cols != ['fund_code', 'fiscal_year']:
+            return self._finalize_fund_summary(self._partial_fund_sums(touched))
+        
+        funds = pd.concat([frame['fund_code'].astype('object') for frame in changed]).unique()
+        new_sums = self._partial_fund_sums(touched[touched['fund_code'].isin(funds)])
+        replaced = summary['fund_code'].isin(funds) & summary['fiscal_year'].isin(fiscal_years)
+        amount_cols = [col for col in AMOUNT_COLUMNS if col in summary.columns]
+        parts = [summary[~replaced].set_index(group_cols)[amount_cols]]
+        if new_sums is not None:
+            parts.append(new_sums)
+        return self._finalize_fund_summary(pd.concat(parts))
+    
+    def _standardize_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rename vendor columns present in df to the standard schema"""
+        available_mappings = {
+            old: new for old, new in self.column_map.items()
+            if old in df.columns
+        }
+        return df.rename(columns=available_mappings)
+    
+    def stream_file(self, source: ExportSource, chunksize: int = DEFAULT_CHUNK_SIZE,
+                    keep_detail: bool = True, name: Optional[str] = None,
+                    memory_map: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Ingest a CSV or .xlsx export in bounded chunks
+        
+        Each chunk is standardized, cleaned and aggregated before the next one
+        is read, so the raw export is never held in memory. Peak memory is
+        governed by chunksize plus the cleaned detail (if kept).
+        
+        Args:
+            source: Path to CSV or .xlsx export file, or an in-memory
+                upload (see load_file)
+            chunksize: Number of rows parsed per chunk
+            keep_detail: Keep cleaned detail rows in standardized_data. When
+                False only the fund summary is retained.
+            name: Original file name of an in-memory upload
+            memory_map: Memory-map a path source instead of reading it
+            
+        Returns:
+            Cleaned DataFrame, or None when keep_detail is False
+        """
+        if is_path(source) and not Path(source).exists():
+            raise FileNotFoundError(f"File not found: {source}")
+        suffix = source_suffix(source, name)
+        if suffix not in ['.csv'] + EXCEL_STREAMING_SUFFIXES:
+            raise ValueError(f"Streaming ingestion supports CSV and .xlsx files only, got: {suffix}")
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer")
+        
+        chunks = []
+        partial_sums = []
+        total_rows = 0
+        
+        self.metrics.reset()
+        with self.metrics.stage('stream') as stage:
+            for chunk in self.iter_clean_chunks(source, chunksize=chunksize, name=name,
+                                                memory_map=memory_map):
+                total_rows += len(chunk)
+                sums = self._partial_fund_sums(chunk)
+                if sums is not None:
+                    partial_sums.append(sums)
+                if keep_detail:
+                    chunks.append(chunk)
+            stage.rows = total_rows
+        
+        with self.metrics.stage('combine', rows=total_rows):
+            self.raw_data = None
+            self.standardized_data = concat_frames(chunks)
+            self._fund_summary = self._finalize_fund_summary(
+                self._combine_fund_sums(partial_sums)
+            )
+        self.metrics.write_log(source=source_name(source, name),
+                               system_type=self.system_type, streamed=True)
+        
+        print(f"✓ Streamed {total_rows} rows from {source_name(source, name)} "
+              f"in chunks of {chunksize}")
+        return self.standardized_data
+    
+    def iter_clean_chunks(self, source: ExportSource, chunksize: int = DEFAULT_CHUNK_SIZE,
+                          name: Optional[str] = None, memory_map: bool = False):
+        """
+        Yield standardized, cleaned chunks of a CSV or .xlsx export
+        
+        Args:
+            source: Path to CSV or .xlsx export file, or an in-memory upload
+            chunksize: Number of rows parsed per chunk
+            name: Original file name of an in-memory upload
+            memory_map: Memory-map a path source instead of reading it
+            
+        Yields:
+            Cleaned DataFrame chunks with standard column names
+        """
+        suffix = source_suffix(source, name)
+        usecols = self._resolve_columns(source, name, memory_map)
+        with open_source(source, memory_map) as readable:
+            if suffix in EXCEL_STREAMING_SUFFIXES:
+                for chunk in iter_excel_chunks(readable, columns=usecols,
+                                               dtype=self._parse_dtypes(), chunksize=chunksize):
+                    yield clean_frame(self._standardize_frame(chunk))
+                return
+            
+            with pd.read_csv(readable, chunksize=chunksize, dtype=self._parse_dtypes(),
+                             usecols=usecols) as reader:
+                for chunk in reader:
+                    yield clean_frame(self._standardize_frame(chunk))
+    
+    @staticmethod
+    def _fund_group_columns(df: pd.DataFrame) -> List[str]:
+        """Grouping columns available for the fund summary"""
+        return [col for col in ['fund_code', 'fiscal_year'] if col in df.columns]
+    
+    @staticmethod
+    def _partial_fund_sums(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Fund/year amount sums for a frame, indexed by the grouping columns"""
+        group_cols = BudgetDataIngester._fund_group_columns(df)
+        amount_cols = [col for col in AMOUNT_COLUMNS if col in df.columns]
+        if not group_cols or not amount_cols:
+            return None
+        sums = df.groupby(group_cols, observed=True)[amount_cols].sum()
+        # Plain key values so partial sums from different chunks line up
+        return decategorize(sums.reset_index()).set_index(group_cols)
+    
+    @staticmethod
+    def _combine_fund_sums(partial_sums: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """Merge partial fund sums computed over disjoint sets of rows"""
+        if not partial_sums:
+            return None
+        if len(partial_sums) == 1:
+            return partial_sums[0]
+        combined = pd.concat(partial_sums)
+        return combined.groupby(level=list(range(combined.index.nlevels))).sum()
+    
+    @staticmethod
+    def _finalize_fund_summary(sums: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Turn fund/year sums into the summary frame with derived metrics"""
+        if sums is None:
             return pd.DataFrame()
         
-        summary = self.standardized_data.groupby(available_groups).agg(agg_dict).reset_index()
+        summary = sums.sort_index().reset_index()
         
         # Recalculate summary-level metrics
         if 'budgeted_amount' in summary.columns and 'actual_amount' in summary.columns:
@@ -262,10 +688,112 @@ class BudgetDataIngester:
         
         return summary
     
+    def get_fund_summary(self) -> pd.DataFrame:
+        """
+        Generate fund-level summary for quick analysis
+        
+        The summary is memoized until standardized_data is replaced, and kept
+        current by append_rows() without regrouping the full detail.
+        
+        Returns:
+            Summary DataFrame grouped by fund and fiscal year
+        """
+        if self._fund_summary is not None:
+            return self._fund_summary.copy()
+        if self.standardized_data is None:
+            raise ValueError("No data available")
+        
+        if not self._fund_group_columns(self.standardized_data):
+            print("⚠ Cannot create fund summary - missing grouping columns")
+            return pd.DataFrame()
+        
+        with self.metrics.stage('fund_summary', rows=len(self.standardized_data)):
+            sums = self._partial_fund_sums(self.standardized_data)
+            if sums is not None:
+                self._fund_summary = self._finalize_fund_summary(sums)
+        if sums is None:
+            print("⚠ No amount columns to summarize")
+            return pd.DataFrame()
+        
+        return self._fund_summary.copy()
+    
+    def get_rollup_cube(self) -> RollupCube:
+        """
+        Precomputed aggregates for drill-down and year-over-year queries
+        
+        Built once from the cleaned detail, memoized like the fund summary
+        and updated in place by append_rows().
+        
+        Returns:
+            RollupCube over standardized_data
+        """
+        if self._rollup_cube is None:
+            if self.standardized_data is None:
+                raise ValueError("No data available")
+            with self.metrics.stage('rollup_cube', rows=len(self.standardized_data)):
+                self._rollup_cube = RollupCube.from_frame(self.standardized_data)
+        return self._rollup_cube
+    
+    def get_trend_series(self) -> TrendSeries:
+        """
+        Per-year series for trend charts, derived from the rollup cube
+        
+        Memoized with the cube; rebuilt from it after append_rows().
+        
+        Returns:
+            TrendSeries over standardized_data
+        """
+        if self._trend_series is None:
+            self._trend_series = TrendSeries(self.get_rollup_cube())
+        return self._trend_series
+    
+    def append_rows(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Append new detail rows (e.g. a new month's actuals) to cleaned data
+        
+        Only the new rows are standardized and cleaned. A memoized fund
+        summary is updated by merging the new rows' fund/year sums into it
+        instead of regrouping the full history; a built rollup cube folds in
+        just the new rows.
+        
+        Args:
+            rows: New rows with vendor or standard column names
+            
+        Returns:
+            The combined cleaned DataFrame
+        """
+        if self.standardized_data is None:
+            raise ValueError("No cleaned data to append to. Call clean_data() first.")
+        
+        new_rows = clean_frame(self._standardize_frame(rows.copy()))
+        combined = concat_frames([self.standardized_data, new_rows])
+        
+        summary = self._fund_summary
+        cube = self._rollup_cube
+        self.standardized_data = combined
+        
+        if cube is not None:
+            cube.update(new_rows)
+            self._rollup_cube = cube
+        
+        new_sums = self._partial_fund_sums(new_rows)
+        if summary is not None and not summary.empty and new_sums is not None:
+            group_cols = list(new_sums.index.names)
+            previous_sums = summary.set_index(group_cols)[list(new_sums.columns)]
+            self._fund_summary = self._finalize_fund_summary(
+                self._combine_fund_sums([previous_sums, new_sums])
+            )
+        
+        print(f"✓ Appended {len(new_rows)} rows ({len(combined)} total)")
+        return combined
+    
     def export_standardized(self, output_path: str, include_summary: bool = True):
         """
         Export standardized data to file
         
+        Excel output is streamed through a write-only workbook; CSV may be
+        compressed by suffix (.csv.gz, .csv.zip, ...); .parquet is supported.
+        
         Args:
             output_path: Path for output file
             include_summary: Whether to include fund summary sheet (Excel only)
@@ -273,39 +801,46 @@ class BudgetDataIngester:
         if self.standardized_data is None:
             raise ValueError("No standardized data to export")
         
-        output_path = Path(output_path)
+        summary = self.get_fund_summary() if include_summary else None
+        with self.metrics.stage('export', rows=len(self.standardized_data)):
+            export_frame(self.standardized_data, output_path, summary=summary)
+        print(f"✓ Exported to {output_path}")
+
+    def save_to_warehouse(self, warehouse, county: str, replace: bool = True) -> int:
+        """
+        Append the cleaned data to a BudgetWarehouse
         
-        if output_path.suffix.lower() in ['.xlsx', '.xls']:
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                self.standardized_data.to_excel(writer, sheet_name='Detail', index=False)
-                
-                if include_summary:
-                    summary = self.get_fund_summary()
-                    if not summary.empty:
-                        summary.to_excel(writer, sheet_name='Fund Summary', index=False)
+        Args:
+            warehouse: BudgetWarehouse to store into
+            county: County the data belongs to
+            replace: Supersede previously stored fiscal years for the county
             
-            print(f"✓ Exported to {output_path}")
-        
-        elif output_path.suffix.lower() == '.csv':
-            self.standardized_data.to_csv(output_path, index=False)
-            print(f"✓ Exported to {output_path}")
+        Returns:
+            Number of rows stored
+        """
+        if self.standardized_data is None:
+            raise ValueError("No standardized data to store")
         
-        else:
-            raise ValueError(f"Unsupported export format: {output_path.suffix}")
+        return warehouse.append(self.standardized_data, county, replace=replace)
 
 
-def quick_ingest(filepath: str, system_type: str = 'munis') -> pd.DataFrame:
+def quick_ingest(filepath: str, system_type: str = 'munis',
+                 chunksize: Optional[int] = None) -> pd.DataFrame:
     """
     Convenience function for one-line data ingestion
     
     Args:
         filepath: Path to export file
-        system_type: 'munis' or 'caselle'
+        system_type: Vendor schema name ('munis', 'caselle', ...) or 'auto'
+        chunksize: If set, stream the CSV in chunks of this many rows
     
     Returns:
         Cleaned, standardized DataFrame
     """
     ingester = BudgetDataIngester(system_type=system_type)
+    if chunksize:
+        return ingester.stream_file(filepath, chunksize=chunksize)
+    
     ingester.load_file(filepath)
     ingester.standardize_columns()
     ingester.validate_data()
@@ -315,9 +850,5 @@ def quick_ingest(filepath: str, system_type: str = 'munis') -> pd.DataFrame:
 
 
 if __name__ == "__main__":
-    print("BudgetBuddy Data Ingestion Module")
-    print("=" * 50)
-    print("\nUsage:")
-    print("  from data_ingestion import BudgetDataIngester, quick_ingest")
-    print("\nQuick start:")
-    print("  df = quick_ingest('munis_export.csv', system_type='munis')")
+    from ingest_cli import main
+    raise SystemExit(main())
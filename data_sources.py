@@ -0,0 +1,164 @@
+"""
+BudgetBuddy Data Sources
+Read exports from paths, in-memory buffers or memory-mapped files
+
+Key Functions:
+- Accept bytes, bytearray, memoryview or file-like uploads without a
+  temp-file round trip
+- Wrap buffers in a seekable reader that never copies the whole upload
+- Memory-map large export files instead of reading them into memory
+- Detect the export format from the file name or the content itself
+"""
+
+import io
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+ExportSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+# Leading bytes of Excel workbooks: .xlsx/.xlsm are zip archives, .xls is OLE2
+ZIP_MAGIC = b'PK\x03\x04'
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0'
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable binary stream over a bytes-like object, without copying it"""
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]):
+        super().__init__()
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        end = min(self._pos + len(target), len(self._view))
+        count = end - self._pos
+        target[:count] = self._view[self._pos:end]
+        self._pos = end
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        self._pos = max(self._pos, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        # Release the view so an underlying mmap can be closed
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def is_path(source: ExportSource) -> bool:
+    return isinstance(source, (str, Path))
+
+
+def source_name(source: ExportSource, name: Optional[str] = None) -> str:
+    """Display name of an export: explicit name, file name or '<upload>'"""
+    if name:
+        return Path(name).name
+    if is_path(source):
+        return Path(source).name
+    filename = getattr(source, 'name', None)
+    return Path(filename).name if isinstance(filename, str) else '<upload>'
+
+
+def _head(source: ExportSource, size: int = 8) -> bytes:
+    """First bytes of an export, leaving file-like sources where they were"""
+    if is_path(source):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    if isinstance(source, BUFFER_TYPES):
+        return bytes(memoryview(source).cast('B')[:size])
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+
+def source_suffix(source: ExportSource, name: Optional[str] = None) -> str:
+    """
+    Export format as a lower-case file suffix
+
+    Uses the file name when there is one, otherwise sniffs the content:
+    zip archives are .xlsx, OLE2 documents .xls, anything else .csv.
+
+    Args:
+        source: Path, buffer or file-like export
+        name: Original file name, for in-memory uploads
+
+    Returns:
+        Suffix such as '.csv' or '.xlsx'
+    """
+    label = name or (str(source) if is_path(source) else getattr(source, 'name', None))
+    if isinstance(label, str) and Path(label).suffix:
+        return Path(label).suffix.lower()
+
+    head = _head(source)
+    if head.startswith(ZIP_MAGIC):
+        return '.xlsx'
+    if head.startswith(OLE2_MAGIC):
+        return '.xls'
+    return '.csv'
+
+
+@contextmanager
+def open_source(source: ExportSource, memory_map: bool = False) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Readable form of an export for pandas/zipfile/openpyxl
+
+    Paths are passed through unless memory_map is set, in which case the
+    file is mapped and exposed as a stream over the mapping. Buffers are
+    wrapped in a zero-copy stream; file-like objects are rewound.
+
+    Args:
+        source: Path, buffer or file-like export
+        memory_map: Map path sources into memory instead of reading them
+
+    Yields:
+        Path string or seekable binary stream
+    """
+    if is_path(source):
+        if not memory_map:
+            yield str(source)
+            return
+        with open(source, 'rb') as f:
+            if Path(source).stat().st_size == 0:
+                yield io.BytesIO(b'')
+                return
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        stream = io.BufferedReader(BufferReader(mapping))
+        try:
+            yield stream
+        finally:
+            stream.close()
+            mapping.close()
+    elif isinstance(source, BUFFER_TYPES):
+        stream = io.BufferedReader(BufferReader(source))
+        try:
+            yield stream
+        finally:
+            stream.close()
+    else:
+        if source.seekable():
+            source.seek(0)
+        yield source
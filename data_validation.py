@@ -0,0 +1,103 @@
+"""
+BudgetBuddy Data Validation
+Single-pass, row-indexed validation of standardized budget data
+
+Key Functions:
+- Evaluate every row-level rule once, vectorized, into a per-row bitmask
+- Hand parsed columns (fiscal year) on to cleaning so nothing is parsed twice
+- Look up offending row positions per rule without copying the data
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import to_fiscal_year
+
+REQUIRED_COLUMNS = ['fund_code', 'account_code', 'fiscal_year']
+AMOUNT_REQUIRED_ANY = ['budgeted_amount', 'actual_amount']
+NOT_NULL_COLUMNS = ['fund_code', 'account_code']
+
+# Plausible fiscal years; anything outside (or unparseable) is flagged
+FISCAL_YEAR_RANGE = (1990, 2050)
+
+# Bit set in the row flags when a row breaks the rule
+VALIDATION_RULES = {
+    'invalid_fiscal_year': 1,
+    'null_fund_code': 2,
+    'null_account_code': 4,
+}
+
+
+def validate_frame(df: pd.DataFrame) -> Tuple[List[str], np.ndarray, Dict[str, pd.Series]]:
+    """
+    Check a standardized frame against every validation rule
+
+    Args:
+        df: DataFrame with standardized column names
+
+    Returns:
+        (list of issues,
+         uint8 flags per row with a VALIDATION_RULES bit set for each broken rule,
+         parsed columns that clean_frame can reuse)
+    """
+    issues = []
+    flags = np.zeros(len(df), dtype=np.uint8)
+    parsed = {}
+
+    # Column-level checks
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        issues.append(f"Missing required columns: {missing}")
+
+    if not any(col in df.columns for col in AMOUNT_REQUIRED_ANY):
+        issues.append("No budget or actual amount columns found")
+
+    # Row-level checks, one vectorized pass per column
+    if 'fiscal_year' in df.columns:
+        years = to_fiscal_year(df['fiscal_year'])
+        parsed['fiscal_year'] = years
+        values = years.to_numpy(dtype='float64', na_value=np.nan)
+        # NaN compares False, so unparseable years land in the complement
+        invalid = ~((values >= FISCAL_YEAR_RANGE[0]) & (values <= FISCAL_YEAR_RANGE[1]))
+        flags[invalid] |= VALIDATION_RULES['invalid_fiscal_year']
+        count = int(np.count_nonzero(invalid))
+        if count:
+            issues.append(f"Found {count} rows with invalid fiscal years")
+
+    for col in NOT_NULL_COLUMNS:
+        if col in df.columns:
+            nulls = df[col].isna().to_numpy()
+            flags[nulls] |= VALIDATION_RULES[f'null_{col}']
+            count = int(np.count_nonzero(nulls))
+            if count:
+                issues.append(f"{col} has {count} null values")
+
+    return issues, flags, parsed
+
+
+def rule_rows(flags: np.ndarray, rule: Optional[str] = None) -> np.ndarray:
+    """
+    Row positions breaking a rule
+
+    Args:
+        flags: Row flags from validate_frame
+        rule: Name from VALIDATION_RULES; None matches any rule
+
+    Returns:
+        Sorted integer positions (use with DataFrame.iloc)
+    """
+    if rule is None:
+        return np.flatnonzero(flags)
+    if rule not in VALIDATION_RULES:
+        raise ValueError(f"Unknown validation rule: {rule}")
+    return np.flatnonzero(flags & VALIDATION_RULES[rule])
+
+
+def rule_counts(flags: np.ndarray) -> Dict[str, int]:
+    """Number of offending rows per rule"""
+    return {
+        rule: int(np.count_nonzero(flags & bit))
+        for rule, bit in VALIDATION_RULES.items()
+    }
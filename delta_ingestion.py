@@ -0,0 +1,387 @@
+"""
+BudgetBuddy Delta Ingestion
+Incremental refresh of stored budget data from periodic full-year exports
+
+Key Functions:
+- Hash every export row (raw CSV lines, or parsed rows for Excel) and
+  match the hashes against the stored ones, so unchanged rows are never
+  parsed or cleaned
+- Classify the rest by key (fund, dept, account, fiscal year): added,
+  changed, removed
+- Keep cleaned detail with its row hashes and the fund summary per dataset
+  on disk, one Parquet file per fiscal year, so a refresh reads and rewrites
+  only the years it touches
+
+An export is authoritative for the fiscal years it contains: stored rows of
+those years that it no longer has are removed; other years are left alone.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import AMOUNT_COLUMNS, concat_frames, parse_currency, to_fiscal_year
+from data_sources import ExportSource, is_path, open_source
+
+DEFAULT_DELTA_DIR = Path(tempfile.gettempdir()) / 'budgetbuddy_delta'
+
+# Columns identifying a ledger line across exports
+DELTA_KEY_COLUMNS = ['fund_code', 'dept_code', 'account_code', 'fiscal_year']
+
+# Hash columns stored next to the cleaned detail
+KEY_HASH = '_row_key'
+CONTENT_HASH = '_row_hash'
+HASH_COLUMNS = [KEY_HASH, CONTENT_HASH]
+
+SUMMARY_FILE = 'summary.parquet'
+METADATA_FILE = 'metadata.json'
+
+# Partition file name of rows without a valid fiscal year
+_NULL_YEAR = '__null__'
+
+
+def read_csv_records(source: ExportSource,
+                     memory_map: bool = False) -> Optional[Tuple[bytes, np.ndarray]]:
+    """
+    Header and data lines of a CSV export, without parsing fields
+
+    Args:
+        source: Path, buffer or file-like CSV export
+        memory_map: Memory-map a path source instead of reading it
+
+    Returns:
+        (header line, object array of record lines), or None when a quoted
+        field spans lines so lines are not records
+    """
+    with open_source(source, memory_map) as readable:
+        data = Path(readable).read_bytes() if is_path(readable) else readable.read()
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    quotes = np.flatnonzero(raw == ord('"'))
+    if len(quotes):
+        # An odd number of quotes before a line break means it is inside a field
+        if (np.searchsorted(quotes, np.flatnonzero(raw == ord('\n'))) % 2).any():
+            return None
+
+    lines = [line.rstrip(b'\r') for line in data.split(b'\n')]
+    lines = [line for line in lines if line]
+    if not lines:
+        return None
+    return lines[0], np.array(lines[1:], dtype=object)
+
+
+def _unique_hashes(hashes: np.ndarray) -> np.ndarray:
+    """Hashes with repeats told apart by their order of appearance"""
+    hashes = pd.Series(hashes)
+    if not hashes.duplicated().any():
+        return hashes.to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({
+        'hash': hashes, 'occurrence': hashes.groupby(hashes).cumcount()
+    }), index=False).to_numpy()
+
+
+def line_hashes(lines: np.ndarray) -> np.ndarray:
+    """Row identity hashes of raw CSV record lines"""
+    return _unique_hashes(pd.util.hash_array(lines, categorize=False))
+
+
+def _code_hashes(values: pd.Series) -> np.ndarray:
+    """Per-row hashes of a code column as cleaning normalizes it (stripped strings)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    # Stripping and hashing run on the distinct values only
+    stripped = pd.Series(pd.Index(uniques).astype('str').str.strip())
+    unique_hashes = pd.util.hash_pandas_object(stripped, index=False).to_numpy()
+    return np.where(codes >= 0, unique_hashes.take(np.maximum(codes, 0)), np.uint64(0))
+
+
+def _column_hashes(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Per-column hashes of normalized values (stripped codes, parsed years and amounts)"""
+    parts = pd.DataFrame(index=df.index)
+    for col in columns:
+        if col == 'fiscal_year':
+            parts[col] = pd.util.hash_pandas_object(to_fiscal_year(df[col]), index=False).to_numpy()
+        elif col in DELTA_KEY_COLUMNS or isinstance(df[col].dtype, pd.CategoricalDtype):
+            parts[col] = _code_hashes(df[col])
+        elif col in AMOUNT_COLUMNS:
+            # Parsed amounts hash far faster than currency strings
+            parts[col] = pd.util.hash_array(parse_currency(df[col]))
+        else:
+            parts[col] = pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+    return parts
+
+
+def key_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hashes of the DELTA_KEY_COLUMNS of standardized rows
+
+    Keys are normalized the way cleaning does, so '100 ' and '100' are the
+    same ledger line.
+    """
+    columns = [col for col in DELTA_KEY_COLUMNS if col in df.columns]
+    if not columns:
+        raise ValueError(f"Delta ingestion needs key columns: {DELTA_KEY_COLUMNS}")
+    return pd.util.hash_pandas_object(_column_hashes(df, columns), index=False).to_numpy()
+
+
+def content_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Row identity hashes of standardized (parsed, not yet cleaned) rows
+
+    Used where raw lines are not available (Excel). Values are normalized
+    like the keys, so only changes that alter the cleaned row count.
+    """
+    return _unique_hashes(
+        pd.util.hash_pandas_object(_column_hashes(df, list(df.columns)), index=False).to_numpy()
+    )
+
+
+def match_rows(content: np.ndarray, stored: Optional[pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Export rows missing from the store, and stored rows still exported
+
+    Args:
+        content: Row identity hashes of the export
+        stored: Stored hash frame (DeltaStore.load_hashes), or None
+
+    Returns:
+        (export positions to process, bool mask over stored rows found in
+        the export)
+    """
+    if stored is None or stored.empty:
+        return np.arange(len(content)), np.zeros(0, dtype=bool)
+    positions = pd.Index(stored[CONTENT_HASH]).get_indexer(content)
+    present = np.zeros(len(stored), dtype=bool)
+    present[positions[positions >= 0]] = True
+    return np.flatnonzero(positions < 0), present
+
+
+@dataclass
+class RowDiff:
+    """What a refresh does with export and stored rows"""
+
+    changed: np.ndarray    # per processed export row: replaces a stored row with its key
+    dropped: np.ndarray    # stored row positions to delete
+    removed: int           # dropped rows no export row replaces
+    unchanged: int
+
+    @property
+    def is_empty(self) -> bool:
+        return not (len(self.changed) or len(self.dropped))
+
+    def counts(self) -> Dict[str, int]:
+        changed = int(self.changed.sum())
+        return {'added': len(self.changed) - changed, 'changed': changed,
+                'removed': self.removed, 'unchanged': self.unchanged}
+
+
+def diff_rows(keys: np.ndarray, years: pd.Series, stored: Optional[pd.DataFrame],
+              present: np.ndarray) -> RowDiff:
+    """
+    Classify processed export rows and stored rows that left the export
+
+    Args:
+        keys: key_hashes() of the export rows to process
+        years: Their parsed fiscal years
+        stored: Stored hash frame, or None
+        present: match_rows() mask of stored rows found in the export
+
+    Returns:
+        RowDiff
+    """
+    if stored is None or stored.empty:
+        return RowDiff(np.zeros(len(keys), dtype=bool), np.array([], dtype=np.intp), 0, 0)
+
+    stored_years = stored['fiscal_year']
+    covered = pd.concat([years, stored_years[present]]).unique()
+    in_scope = stored_years.isin(covered).to_numpy()
+    if pd.isna(covered).any():
+        # Rows without a valid year are covered when the export has any
+        in_scope |= stored_years.isna().to_numpy()
+    dropped = np.flatnonzero(~present & in_scope)
+    dropped_keys = stored[KEY_HASH].to_numpy()[dropped]
+    return RowDiff(
+        changed=np.isin(keys, dropped_keys),
+        dropped=dropped,
+        removed=int((~np.isin(dropped_keys, keys)).sum()),
+        unchanged=int(present.sum()),
+    )
+
+
+class DeltaStore:
+    """On-disk datasets kept current by delta ingestion"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            root: Directory holding one folder per dataset. Defaults to
+                BUDGETBUDDY_DELTA_DIR or a folder in the temp dir.
+        """
+        root = root or os.environ.get('BUDGETBUDDY_DELTA_DIR') or DEFAULT_DELTA_DIR
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _dataset_dir(self, dataset: str) -> Path:
+        return self.root / quote(str(dataset), safe='')
+
+    def _partitions(self, dataset: str, fiscal_years: Optional[Iterable] = None) -> List[Path]:
+        folder = self._dataset_dir(dataset)
+        if fiscal_years is None:
+            return sorted(folder.glob('fiscal_year=*.parquet'))
+        paths = [folder / self._partition_name(year) for year in fiscal_years]
+        return [path for path in paths if path.exists()]
+
+    @staticmethod
+    def _partition_name(fiscal_year) -> str:
+        return f"fiscal_year={_NULL_YEAR if pd.isna(fiscal_year) else int(fiscal_year)}.parquet"
+
+    @staticmethod
+    def _fixed_schema(schema):
+        """
+        Schema with every dictionary column indexed by int32
+
+        pandas picks the smallest index type that fits a categorical's
+        categories, so partitions of different sizes would otherwise
+        disagree and could not be scanned as one dataset.
+        """
+        import pyarrow as pa
+
+        return pa.schema([
+            field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+            if pa.types.is_dictionary(field.type) else field
+            for field in schema
+        ], metadata=schema.metadata)
+
+    @classmethod
+    def _write(cls, frame: pd.DataFrame, path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        scratch = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        pq.write_table(table.cast(cls._fixed_schema(table.schema)), scratch)
+        os.replace(scratch, path)
+
+    @classmethod
+    def _read(cls, paths: List[Path], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Partitions as one frame; dictionaries are unified in a single Arrow scan"""
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        # Explicit schema: files are read as int32-indexed dictionaries
+        # whatever index width they were written with
+        schema = cls._fixed_schema(pq.read_schema(str(paths[0])))
+        return ds.dataset([str(path) for path in paths], schema=schema, format='parquet').to_table(
+            columns=columns
+        ).to_pandas()
+
+    def datasets(self) -> List[str]:
+        return sorted(unquote(path.name) for path in self.root.iterdir()
+                      if (path / METADATA_FILE).exists())
+
+    def metadata(self, dataset: str) -> Optional[Dict]:
+        """Metadata of a stored dataset, or None if it was never saved"""
+        try:
+            return json.loads((self._dataset_dir(dataset) / METADATA_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load_hashes(self, dataset: str) -> Optional[pd.DataFrame]:
+        """KEY_HASH, CONTENT_HASH and fiscal_year of every stored row"""
+        paths = self._partitions(dataset)
+        return self._read(paths, HASH_COLUMNS + ['fiscal_year']) if paths else None
+
+    def load_detail(self, dataset: str, fiscal_years: Optional[Iterable] = None,
+                    with_hashes: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Stored cleaned detail
+
+        Args:
+            dataset: Dataset name
+            fiscal_years: Only these years (None: all)
+            with_hashes: Keep the KEY_HASH and CONTENT_HASH columns
+
+        Returns:
+            Detail frame, or None if no matching partition exists
+        """
+        paths = self._partitions(dataset, fiscal_years)
+        if not paths:
+            return None
+        detail = self._read(paths)
+        return detail if with_hashes else detail.drop(columns=HASH_COLUMNS)
+
+    def load_summary(self, dataset: str) -> Optional[pd.DataFrame]:
+        path = self._dataset_dir(dataset) / SUMMARY_FILE
+        return pd.read_parquet(path) if path.exists() else None
+
+    def upsert(self, dataset: str, rows: pd.DataFrame, hashes: pd.DataFrame,
+               drop_hashes: np.ndarray, fiscal_years: Iterable) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Add and delete rows in the partitions of the given fiscal years
+
+        Args:
+            dataset: Dataset name
+            rows: Cleaned rows to store
+            hashes: KEY_HASH and CONTENT_HASH aligned with rows
+            drop_hashes: CONTENT_HASH values of stored rows to delete
+            fiscal_years: Years holding rows or drop_hashes
+
+        Returns:
+            (detail of those years after the change, stored rows deleted)
+        """
+        folder = self._dataset_dir(dataset)
+        folder.mkdir(parents=True, exist_ok=True)
+        rows = rows.assign(**{col: hashes[col].to_numpy() for col in HASH_COLUMNS})
+        years = rows['fiscal_year']
+
+        updated, dropped = [], []
+        for year in fiscal_years:
+            path = folder / self._partition_name(year)
+            parts = [rows[years.isna() if pd.isna(year) else years == year]]
+            if path.exists():
+                current = pd.read_parquet(path)
+                drop = current[CONTENT_HASH].isin(drop_hashes).to_numpy()
+                dropped.append(current[drop])
+                parts.insert(0, current[~drop])
+            partition = concat_frames([part for part in parts if not part.empty])
+            if partition is None:
+                path.unlink(missing_ok=True)
+                continue
+            # Each file keeps only its own dictionary entries
+            for col in partition.columns:
+                if isinstance(partition[col].dtype, pd.CategoricalDtype):
+                    partition[col] = partition[col].cat.remove_unused_categories()
+            self._write(partition, path)
+            updated.append(partition)
+
+        empty = rows.iloc[:0]
+        updated = concat_frames(updated) if updated else empty
+        dropped = concat_frames(dropped) if dropped else empty
+        return updated.drop(columns=HASH_COLUMNS), dropped.drop(columns=HASH_COLUMNS)
+
+    def save_summary(self, dataset: str, summary: pd.DataFrame, metadata: Dict):
+        """Store the fund summary and metadata (written last; marks the dataset complete)"""
+        folder = self._dataset_dir(dataset)
+        folder.mkdir(parents=True, exist_ok=True)
+        self._write(summary, folder / SUMMARY_FILE)
+        scratch = folder / f".{METADATA_FILE}.{os.getpid()}.tmp"
+        scratch.write_text(json.dumps(metadata, indent=2, sort_keys=True, default=str))
+        os.replace(scratch, folder / METADATA_FILE)
+
+    def clear(self, dataset: str) -> bool:
+        """Delete a stored dataset; False if there was none"""
+        folder = self._dataset_dir(dataset)
+        if not folder.exists():
+            return False
+        shutil.rmtree(folder)
+        return True
@@ -0,0 +1,162 @@
+"""
+BudgetBuddy Detail Query
+Indexed filtering, sorting and paging over cleaned detail data
+
+Key Functions:
+- Build inverted indexes on fund/dept/account/year the first time a column
+  is filtered
+- Intersect row positions for multi-column filters without scanning
+- Filter on validation rule flags alongside column values
+- Remember recent filter/sort results so page switches only slice
+- Materialize just the requested page of rows
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_validation import VALIDATION_RULES
+
+FILTER_COLUMNS = ['fund_code', 'dept_code', 'account_code', 'fiscal_year']
+
+# Pseudo-column filtering on broken validation rules (values: rule names)
+RULE_FILTER = 'validation_rule'
+DEFAULT_PAGE_SIZE = 100
+
+# Filter/sort results kept so paging through one view never re-sorts
+RESULT_CACHE_SIZE = 8
+
+
+class DetailQuery:
+    """Query layer over a cleaned detail DataFrame"""
+
+    def __init__(self, df: pd.DataFrame, validation_flags: Optional[np.ndarray] = None):
+        """
+        Wrap a detail frame (not copied; do not mutate it while querying)
+
+        Args:
+            df: Cleaned standardized data
+            validation_flags: Row flags from validate_frame, enabling the
+                RULE_FILTER filter
+        """
+        self.df = df
+        self.validation_flags = validation_flags
+        self._indexes: Dict[str, Tuple[pd.Index, np.ndarray, np.ndarray]] = {}
+        self._results: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        # Instances are shared between sessions; guards the result LRU
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _index(self, column: str) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+        """(values, row positions grouped by value, group boundaries) for a column"""
+        if column not in self._indexes:
+            series = self.df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                values = series.cat.categories
+            else:
+                codes, values = pd.factorize(series, sort=True)
+            # Stable sort keeps positions ascending within each value
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            self._indexes[column] = (pd.Index(values), order, bounds)
+        return self._indexes[column]
+
+    def options(self, column: str) -> List:
+        """Distinct values present in a column, sorted, for filter widgets"""
+        if column not in self.df.columns:
+            return []
+        values, _, bounds = self._index(column)
+        return values[np.diff(bounds) > 0].tolist()
+
+    def rule_counts(self) -> Dict[str, int]:
+        """Rows breaking each validation rule (empty without validation flags)"""
+        if self.validation_flags is None:
+            return {}
+        return {rule: int(np.count_nonzero(self.validation_flags & bit))
+                for rule, bit in VALIDATION_RULES.items()}
+
+    def _positions(self, column: str, wanted: Sequence) -> np.ndarray:
+        """Sorted row positions where column takes one of the wanted values"""
+        if column == RULE_FILTER:
+            if self.validation_flags is None:
+                raise ValueError("No validation flags to filter on")
+            mask = np.bitwise_or.reduce([VALIDATION_RULES[rule] for rule in wanted])
+            return np.flatnonzero(self.validation_flags & mask)
+
+        values, order, bounds = self._index(column)
+        locations = values.get_indexer(list(wanted))
+        groups = [order[bounds[loc]:bounds[loc + 1]] for loc in locations if loc >= 0]
+        if not groups:
+            return np.empty(0, dtype=np.intp)
+        return groups[0] if len(groups) == 1 else np.sort(np.concatenate(groups))
+
+    def select(self, filters: Optional[Dict[str, Sequence]] = None,
+               sort_by: Optional[str] = None, ascending: bool = True) -> np.ndarray:
+        """
+        Row positions matching filters, in display order
+
+        Args:
+            filters: Column -> allowed values; empty or None entries are ignored
+            sort_by: Column to order by (default: original row order)
+            ascending: Sort direction
+
+        Returns:
+            Integer positions into df
+        """
+        filters = {col: list(values) for col, values in (filters or {}).items() if values}
+        key = (tuple(sorted((col, tuple(values)) for col, values in filters.items())),
+               sort_by, ascending)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        positions = None
+        # Smallest candidate sets first keeps the intersections cheap
+        for column_positions in sorted(
+            (self._positions(col, values) for col, values in filters.items()), key=len
+        ):
+            positions = column_positions if positions is None else np.intersect1d(
+                positions, column_positions, assume_unique=True
+            )
+        if positions is None:
+            positions = np.arange(len(self.df))
+
+        if sort_by is not None and len(positions):
+            # Missing values go last in either direction
+            order = self.df[sort_by].iloc[positions].reset_index(drop=True).sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            ).index.to_numpy()
+            positions = positions[order]
+
+        with self._lock:
+            self._results[key] = positions
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return positions
+
+    def page(self, page: int = 0, page_size: int = DEFAULT_PAGE_SIZE,
+             filters: Optional[Dict[str, Sequence]] = None,
+             sort_by: Optional[str] = None,
+             ascending: bool = True) -> Tuple[pd.DataFrame, int]:
+        """
+        One page of matching rows
+
+        Args:
+            page: Zero-based page number (clamped to the last page)
+            page_size: Rows per page
+            filters, sort_by, ascending: See select()
+
+        Returns:
+            (page rows, total matching rows)
+        """
+        positions = self.select(filters, sort_by, ascending)
+        last_page = max((len(positions) - 1) // page_size, 0)
+        start = min(max(page, 0), last_page) * page_size
+        return self.df.iloc[positions[start:start + page_size]], len(positions)
@@ -0,0 +1,123 @@
+"""
+BudgetBuddy Export Writer
+Constant-memory export of standardized budget data
+
+Key Functions:
+- Stream detail rows into a write-only Excel workbook in bounded chunks,
+  continuing on further sheets past Excel's row limit
+- Write compressed CSV (.csv.gz, .csv.bz2, .csv.zip, .csv.xz) or Parquet
+- Dispatch on the output file suffix
+"""
+
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import pandas as pd
+
+# Rows converted to Python values at a time while writing Excel
+EXPORT_CHUNK_ROWS = 10_000
+
+# Rows per Excel worksheet, header included (Excel's hard limit)
+EXCEL_MAX_ROWS = 1_048_576
+
+CSV_SUFFIXES = ['.csv', '.gz', '.bz2', '.zip', '.xz']
+EXCEL_SUFFIXES = ['.xlsx', '.xls']
+PARQUET_SUFFIXES = ['.parquet', '.pq']
+
+
+def _append_frame(worksheet, df: pd.DataFrame, chunk_rows: int):
+    """Append a frame to a write-only worksheet chunk by chunk"""
+    worksheet.append([str(col) for col in df.columns])
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            worksheet.append(row)
+
+
+def _append_sheets(workbook, title: str, df: pd.DataFrame, chunk_rows: int, sheet_rows: int):
+    """Write a frame to one sheet, or to 'Title', 'Title (2)', ... when it exceeds sheet_rows"""
+    per_sheet = sheet_rows - 1  # each sheet repeats the header
+    for number, start in enumerate(range(0, max(len(df), 1), per_sheet), start=1):
+        name = title if number == 1 else f"{title} ({number})"
+        _append_frame(workbook.create_sheet(name), df.iloc[start:start + per_sheet], chunk_rows)
+
+
+def write_excel(detail: pd.DataFrame, target: Union[str, Path, BinaryIO],
+                summary: Optional[pd.DataFrame] = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS,
+                sheet_rows: int = EXCEL_MAX_ROWS):
+    """
+    Write detail (and optional fund summary) sheets with a streaming workbook
+
+    openpyxl's write-only mode serializes rows as they are appended, so
+    memory stays flat regardless of row count. Excel opens at most
+    EXCEL_MAX_ROWS rows per sheet, so longer detail continues on
+    'Detail (2)', 'Detail (3)', ... each with its own header row.
+
+    Args:
+        detail: Standardized detail data
+        target: Output path or binary file object
+        summary: Fund summary written to a second sheet when not empty
+        chunk_rows: Rows converted to Python values at a time
+        sheet_rows: Rows per sheet including the header (at most EXCEL_MAX_ROWS)
+    """
+    from openpyxl import Workbook
+
+    if not 1 < sheet_rows <= EXCEL_MAX_ROWS:
+        raise ValueError(f"sheet_rows must be 2-{EXCEL_MAX_ROWS:,}")
+    workbook = Workbook(write_only=True)
+    _append_sheets(workbook, 'Detail', detail, chunk_rows, sheet_rows)
+    if summary is not None and not summary.empty:
+        _append_sheets(workbook, 'Fund Summary', summary, chunk_rows, sheet_rows)
+    workbook.save(target)
+
+
+def excel_bytes(detail: pd.DataFrame, summary: Optional[pd.DataFrame] = None) -> bytes:
+    """Excel report as bytes, for in-memory downloads"""
+    output = BytesIO()
+    write_excel(detail, output, summary=summary)
+    return output.getvalue()
+
+
+def write_csv(df: pd.DataFrame, target: Union[str, Path, BinaryIO],
+              compression: Union[str, dict, None] = 'infer'):
+    """
+    Write CSV in chunks, compressed according to the file suffix by default
+
+    Args:
+        df: Data to write
+        target: Output path or binary file object
+        compression: pandas compression spec ('infer' uses the suffix)
+    """
+    df.to_csv(target, index=False, compression=compression, chunksize=EXPORT_CHUNK_ROWS)
+
+
+def write_parquet(df: pd.DataFrame, target: Union[str, Path, BinaryIO]):
+    """Write Parquet (zstd-compressed, categoricals preserved)"""
+    df.to_parquet(target, index=False, compression='zstd')
+
+
+def export_frame(detail: pd.DataFrame, output_path: Union[str, Path],
+                 summary: Optional[pd.DataFrame] = None):
+    """
+    Export data to a file, picking the writer from the suffix
+
+    Args:
+        detail: Standardized detail data
+        output_path: .xlsx, .csv[.gz|.bz2|.zip|.xz] or .parquet path
+        summary: Fund summary (Excel only; written as a second sheet)
+    """
+    output_path = Path(output_path)
+    suffixes = [part.lower() for part in output_path.suffixes]
+    suffix = suffixes[-1] if suffixes else ''
+
+    if suffix in EXCEL_SUFFIXES:
+        write_excel(detail, output_path, summary=summary)
+    elif suffix in PARQUET_SUFFIXES:
+        write_parquet(detail, output_path)
+    elif suffix == '.csv' or (suffix in CSV_SUFFIXES and suffixes[-2:-1] == ['.csv']):
+        write_csv(detail, output_path)
+    else:
+        raise ValueError(f"Unsupported export format: {''.join(output_path.suffixes)}")
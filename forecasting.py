@@ -0,0 +1,358 @@
+"""
+BudgetBuddy Forecasting
+Multi-year fund projections from fund summaries
+
+Key Functions:
+- Project every fund (or fund/dept, county/fund, ...) series at once
+- Vectorized NumPy linear trend and Holt exponential smoothing across all
+  series for short histories
+- Prophet fits for longer histories, batched across a process pool
+- Cache Prophet fits on disk by a hash of the series they were fitted on
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import AMOUNT_COLUMNS
+from data_validation import FISCAL_YEAR_RANGE
+
+DEFAULT_HORIZON = 5
+
+# Series with at least this many fiscal years are fitted with Prophet
+MIN_PROPHET_YEARS = 6
+
+# Series with fewer years than this use a straight-line trend, not Holt
+MIN_HOLT_YEARS = 4
+
+# Width of the forecast interval (Prophet's default)
+INTERVAL_WIDTH = 0.8
+_Z_80 = 1.2816
+
+# Holt smoothing parameters for level and trend
+HOLT_ALPHA = 0.8
+HOLT_BETA = 0.2
+
+FORECAST_METHODS = ['auto', 'linear', 'holt', 'prophet']
+DEFAULT_FORECAST_CACHE_DIR = Path(tempfile.gettempdir()) / 'budgetbuddy_forecasts'
+
+
+def prophet_available() -> bool:
+    return importlib.util.find_spec('prophet') is not None
+
+
+def _series_matrix(summary: pd.DataFrame, group_columns: List[str],
+                   value_column: str) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    (group keys, consecutive fiscal years, groups x years values with NaN gaps)
+
+    Out-of-range fiscal years (kept by cleaning, flagged by validation)
+    are left out; missing years inside the range become NaN columns so
+    every column is one year apart.
+    """
+    years = summary['fiscal_year']
+    data = summary[years.notna() & years.between(*FISCAL_YEAR_RANGE)]
+    if data.empty:
+        return pd.DataFrame(columns=group_columns), np.empty(0), np.empty((0, 0))
+    table = data.pivot_table(index=group_columns, columns='fiscal_year', values=value_column,
+                             aggfunc='sum', observed=True)
+    table = table.reindex(columns=range(int(table.columns.min()), int(table.columns.max()) + 1))
+    keys = table.index.to_frame(index=False)
+    years = table.columns.to_numpy(dtype='float64')
+    return keys, years, table.to_numpy(dtype='float64')
+
+
+def linear_forecast(years: np.ndarray, values: np.ndarray,
+                    horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Least-squares trend line per series, all series at once
+
+    Args:
+        years: Fiscal years (length Y)
+        values: Series x Y matrix; NaN marks missing years
+        horizon: Years to project past the last fiscal year
+
+    Returns:
+        (forecast, lower, upper), each series x horizon
+    """
+    mask = ~np.isnan(values)
+    n = mask.sum(axis=1).astype('float64')
+    x = np.where(mask, years - years.mean(), 0.0)
+    y = np.where(mask, values, 0.0)
+
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = n * sxx - sx ** 2
+        slope = np.where(denom > 0, (n * sxy - sx * sy) / np.where(denom > 0, denom, 1), 0.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / np.maximum(n, 1), np.nan)
+
+        fitted = intercept[:, None] + slope[:, None] * x
+        residuals = np.where(mask, y - fitted, 0.0)
+        sigma = np.where(n > 2, np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(n - 2, 1)), np.nan)
+
+        future = (years[-1] + np.arange(1, horizon + 1)) - years.mean()
+        forecast = intercept[:, None] + slope[:, None] * future
+        x_mean = sx / np.maximum(n, 1)
+        spread = np.maximum(sxx - n * x_mean ** 2, 1e-12)
+        half_width = _Z_80 * sigma[:, None] * np.sqrt(
+            1 + 1 / np.maximum(n, 1)[:, None] + (future - x_mean[:, None]) ** 2 / spread[:, None]
+        )
+    return forecast, forecast - half_width, forecast + half_width
+
+
+def holt_forecast(years: np.ndarray, values: np.ndarray, horizon: int,
+                  alpha: float = HOLT_ALPHA,
+                  beta: float = HOLT_BETA) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Holt linear exponential smoothing per series, all series at once
+
+    Years must be consecutive. Each series starts from its first two
+    observations: level at the second, trend the slope between them, so
+    an exactly linear history is projected exactly. Smoothing (and the
+    error estimate) starts with the third observation. A missing year
+    advances the level by the trend without updating either, so gaps
+    count as the years they span.
+
+    Args:
+        years: Fiscal years (length Y)
+        values: Series x Y matrix; NaN marks missing years
+        horizon: Years to project past the last fiscal year
+        alpha, beta: Level and trend smoothing factors
+
+    Returns:
+        (forecast, lower, upper), each series x horizon
+    """
+    count = values.shape[0]
+    level = np.full(count, np.nan)
+    trend = np.zeros(count)
+    errors = np.zeros(count)
+    error_count = np.zeros(count)
+    seen = np.zeros(count, dtype=np.int64)
+    first_value = np.full(count, np.nan)
+    first_column = np.zeros(count)
+
+    for column in range(values.shape[1]):
+        observed = values[:, column]
+        present = ~np.isnan(observed)
+        first = present & (seen == 0)
+        second = present & (seen == 1)
+        update = present & (seen >= 2)
+
+        predicted = level + trend
+        errors[update] += (observed[update] - predicted[update]) ** 2
+        error_count[update] += 1
+
+        new_level = alpha * observed + (1 - alpha) * predicted
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        level = np.where(update, new_level, level)
+        trend = np.where(update, new_trend, trend)
+        # Second observation: slope from the first, across any gap between them
+        trend = np.where(second, (observed - first_value) / (column - first_column), trend)
+        level = np.where(first | second, observed, level)
+        first_value = np.where(first, observed, first_value)
+        first_column = np.where(first, column, first_column)
+        # Started series without a value this year carry on along their trend
+        level = np.where(~present, predicted, level)
+        seen += present
+
+    steps = np.arange(1, horizon + 1)
+    forecast = level[:, None] + trend[:, None] * steps
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.where(error_count > 1, np.sqrt(errors / np.maximum(error_count, 1)), np.nan)
+    half_width = _Z_80 * sigma[:, None] * np.sqrt(steps)
+    return forecast, forecast - half_width, forecast + half_width
+
+
+def _prophet_task(task: Tuple[np.ndarray, np.ndarray, int, float]) -> Tuple[List, List, List]:
+    """Fit Prophet to one yearly series (runs in a worker process)"""
+    years, values, horizon, interval_width = task
+    from prophet import Prophet
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    history = pd.DataFrame({
+        'ds': pd.to_datetime([f"{int(year)}-01-01" for year in years]),
+        'y': values,
+    })
+    model = Prophet(yearly_seasonality=False, weekly_seasonality=False,
+                    daily_seasonality=False, interval_width=interval_width)
+    model.fit(history)
+    future = model.make_future_dataframe(periods=horizon, freq='YS', include_history=False)
+    prediction = model.predict(future)
+    return (prediction['yhat'].tolist(), prediction['yhat_lower'].tolist(),
+            prediction['yhat_upper'].tolist())
+
+
+class ForecastCache:
+    """On-disk store of Prophet fits keyed by series content"""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            cache_dir: Directory for cached fits. Defaults to
+                BUDGETBUDDY_FORECAST_CACHE_DIR or a folder in the temp dir.
+        """
+        cache_dir = cache_dir or os.environ.get('BUDGETBUDDY_FORECAST_CACHE_DIR') or DEFAULT_FORECAST_CACHE_DIR
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(years: np.ndarray, values: np.ndarray, horizon: int, method: str) -> str:
+        digest = hashlib.sha256(f"{method}|{horizon}|{INTERVAL_WIDTH}|".encode())
+        digest.update(np.ascontiguousarray(years, dtype='float64').tobytes())
+        digest.update(np.ascontiguousarray(values, dtype='float64').tobytes())
+        return digest.hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[Tuple[List, List, List]]:
+        try:
+            stored = json.loads((self.cache_dir / f"{key}.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        return stored['forecast'], stored['lower'], stored['upper']
+
+    def put(self, key: str, result: Tuple[List, List, List]):
+        forecast, lower, upper = result
+        scratch = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        scratch.write_text(json.dumps({'forecast': forecast, 'lower': lower, 'upper': upper}))
+        os.replace(scratch, self.cache_dir / f"{key}.json")
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.cache_dir.glob('*.json'):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+def _prophet_forecast(years: np.ndarray, values: np.ndarray, rows: np.ndarray, horizon: int,
+                      cache: Optional[ForecastCache],
+                      max_workers: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Prophet results for the given series rows, reusing cached fits"""
+    results: Dict[int, Tuple[List, List, List]] = {}
+    tasks, task_rows, task_keys = [], [], []
+    for row in rows:
+        present = ~np.isnan(values[row])
+        series_years, series_values = years[present], values[row, present]
+        key = ForecastCache.make_key(series_years, series_values, horizon, 'prophet')
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[row] = cached
+            continue
+        # Project from the series' own last year up to the shared horizon end
+        extra = int(years[-1] - series_years[-1])
+        tasks.append((series_years, series_values, horizon + extra, INTERVAL_WIDTH))
+        task_rows.append(row)
+        task_keys.append(key)
+
+    if tasks:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if max_workers == 1:
+            fitted = [_prophet_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                fitted = list(pool.map(_prophet_task, tasks, chunksize=max(len(tasks) // (4 * max_workers), 1)))
+        for row, key, result in zip(task_rows, task_keys, fitted):
+            result = tuple(part[-horizon:] for part in result)
+            results[row] = result
+            if cache is not None:
+                cache.put(key, result)
+
+    stacked = [np.array([results[row][part] for row in rows]) for part in range(3)]
+    return stacked[0], stacked[1], stacked[2]
+
+
+def forecast_summary(summary: pd.DataFrame, horizon: int = DEFAULT_HORIZON,
+                     value_column: str = 'actual_amount',
+                     group_columns: Sequence[str] = ('fund_code',),
+                     method: str = 'auto',
+                     cache: Optional[ForecastCache] = None,
+                     max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Project each series in a fund summary past its last fiscal year
+
+    Args:
+        summary: get_fund_summary() output, or any frame with fiscal_year,
+            the group columns and the value column
+        horizon: Years to project
+        value_column: Amount to forecast
+        group_columns: Columns identifying a series (e.g. fund_code, or
+            county + fund_code, or fund_code + dept_code)
+        method: 'linear', 'holt', 'prophet', or 'auto' (Prophet for long
+            histories when installed, Holt or linear for short ones)
+        cache: ForecastCache for Prophet fits
+        max_workers: Processes for Prophet fits (default: CPU count)
+
+    Returns:
+        One row per series and future fiscal year with forecast, lower,
+        upper (80% interval) and the method used
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method: {method}")
+    group_columns = list(group_columns)
+    missing = [col for col in group_columns + ['fiscal_year', value_column] if col not in summary.columns]
+    if missing:
+        raise ValueError(f"Cannot forecast without columns: {missing}")
+
+    keys, years, values = _series_matrix(summary, group_columns, value_column)
+    if values.size == 0:
+        return pd.DataFrame(columns=group_columns + ['fiscal_year', 'forecast', 'lower', 'upper', 'method'])
+
+    history = (~np.isnan(values)).sum(axis=1)
+    if method == 'auto':
+        use_prophet = prophet_available()
+        methods = np.where(history >= MIN_HOLT_YEARS, 'holt', 'linear').astype(object)
+        if use_prophet:
+            methods[history >= MIN_PROPHET_YEARS] = 'prophet'
+    else:
+        methods = np.full(len(values), method, dtype=object)
+
+    forecast = np.full((len(values), horizon), np.nan)
+    lower, upper = forecast.copy(), forecast.copy()
+    for name, forecaster in [('linear', linear_forecast), ('holt', holt_forecast)]:
+        rows = np.flatnonzero(methods == name)
+        if len(rows):
+            forecast[rows], lower[rows], upper[rows] = forecaster(years, values[rows], horizon)
+    rows = np.flatnonzero(methods == 'prophet')
+    if len(rows):
+        forecast[rows], lower[rows], upper[rows] = _prophet_forecast(
+            years, values, rows, horizon, cache, max_workers
+        )
+
+    future_years = (years[-1] + np.arange(1, horizon + 1)).astype('int64')
+    result = keys.loc[keys.index.repeat(horizon)].reset_index(drop=True)
+    result['fiscal_year'] = pd.array(np.tile(future_years, len(values)), dtype='Int16')
+    result['forecast'] = forecast.ravel()
+    result['lower'] = lower.ravel()
+    result['upper'] = upper.ravel()
+    result['method'] = np.repeat(methods, horizon)
+    return result
+
+
+def forecast_detail(df: pd.DataFrame, by: Sequence[str] = ('fund_code', 'dept_code'),
+                    **options) -> pd.DataFrame:
+    """
+    Forecast cleaned detail data at a finer grain than the fund summary
+
+    Args:
+        df: Cleaned standardized data
+        by: Series columns, e.g. fund_code + dept_code
+        **options: Passed to forecast_summary (horizon, method, ...)
+
+    Returns:
+        Forecast frame as from forecast_summary
+    """
+    by = list(by)
+    amount_cols = [col for col in AMOUNT_COLUMNS if col in df.columns]
+    sums = df.groupby(by + ['fiscal_year'], observed=True)[amount_cols].sum().reset_index()
+    return forecast_summary(sums, group_columns=by, **options)
@@ -0,0 +1,211 @@
+"""
+BudgetBuddy Ingest Cache
+Persistent Parquet cache of processed exports
+
+Key Functions:
+- Key processed results on export content hash, system type and ingester version
+- Store cleaned detail and fund summary as Parquet
+- Evict least recently used entries beyond a size limit
+- Invalidate single entries or the whole cache
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from data_ingestion import INGESTER_VERSION
+from data_sources import BUFFER_TYPES, ExportSource, is_path
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / 'budgetbuddy_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Bytes read per block when hashing export files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+DETAIL_FILE = 'detail.parquet'
+SUMMARY_FILE = 'summary.parquet'
+METADATA_FILE = 'metadata.json'
+
+
+def content_hash(source: ExportSource) -> str:
+    """
+    SHA-256 of an export's content
+
+    Args:
+        source: Path to the export file, its raw bytes, or a seekable
+            binary file-like object (left at its original position)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, BUFFER_TYPES):
+        digest.update(source)
+    elif not is_path(source):
+        position = source.tell()
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+        source.seek(position)
+    else:
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestCache:
+    """On-disk cache of cleaned budget data keyed by export content"""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding cache entries. Defaults to
+                BUDGETBUDDY_CACHE_DIR or a folder in the system temp dir.
+            max_bytes: Total size above which least recently used entries
+                are evicted
+        """
+        cache_dir = cache_dir or os.environ.get('BUDGETBUDDY_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(source: ExportSource, system_type: str,
+                 version: str = INGESTER_VERSION) -> str:
+        """
+        Cache key for an export
+
+        Args:
+            source: Path to the export file, its raw bytes or a file-like object
+            system_type: Financial system the export came from
+            version: Ingester version that produced the results
+
+        Returns:
+            Key string
+        """
+        parts = f"{content_hash(source)}|{system_type.lower()}|{version}"
+        return hashlib.sha256(parts.encode()).hexdigest()[:32]
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def contains(self, key: str) -> bool:
+        """Whether an entry is stored for key (without reading or touching it)"""
+        return (self._entry_dir(key) / METADATA_FILE).exists()
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame, Dict]]:
+        """
+        Look up processed results
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            (detail, fund summary, metadata) or None on a miss
+        """
+        entry = self._entry_dir(key)
+        try:
+            metadata = json.loads((entry / METADATA_FILE).read_text())
+            detail = pd.read_parquet(entry / DETAIL_FILE)
+            summary = pd.read_parquet(entry / SUMMARY_FILE)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except Exception as e:
+            print(f"⚠ Discarding unreadable cache entry {key}: {e}")
+            self.invalidate(key)
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        now = time.time()
+        os.utime(entry, (now, now))
+        return detail, summary, metadata
+
+    def put(self, key: str, detail: pd.DataFrame, summary: pd.DataFrame,
+            metadata: Optional[Dict] = None):
+        """
+        Store processed results, then evict old entries if over the size limit
+
+        Args:
+            key: Key from make_key()
+            detail: Cleaned standardized data
+            summary: Fund summary
+            metadata: JSON-serializable extras (validation results, source name)
+        """
+        # Write to a scratch directory and rename into place so readers
+        # never see a partial entry
+        scratch = Path(tempfile.mkdtemp(prefix=f'.{key}-', dir=self.cache_dir))
+        try:
+            detail.to_parquet(scratch / DETAIL_FILE, index=False)
+            summary.to_parquet(scratch / SUMMARY_FILE, index=False)
+            (scratch / METADATA_FILE).write_text(json.dumps({
+                **(metadata or {}),
+                'rows': len(detail),
+                'ingester_version': INGESTER_VERSION,
+                'created': time.time(),
+            }))
+            entry = self._entry_dir(key)
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(scratch, entry)
+        finally:
+            if scratch.exists():
+                shutil.rmtree(scratch, ignore_errors=True)
+
+        self._evict(keep=key)
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Remove cache entries
+
+        Args:
+            key: Entry to remove; None clears the whole cache
+
+        Returns:
+            Number of entries removed
+        """
+        targets = [self._entry_dir(key)] if key else self._entries()
+        removed = 0
+        for entry in targets:
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _entries(self) -> List[Path]:
+        return [
+            path for path in self.cache_dir.iterdir()
+            if path.is_dir() and not path.name.startswith('.')
+        ]
+
+    @staticmethod
+    def _entry_size(entry: Path) -> int:
+        return sum(path.stat().st_size for path in entry.iterdir() if path.is_file())
+
+    def size_bytes(self) -> int:
+        """Total size of all cache entries"""
+        return sum(self._entry_size(entry) for entry in self._entries())
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop least recently used entries until under max_bytes"""
+        entries = sorted(self._entries(), key=lambda path: path.stat().st_mtime)
+        sizes = {entry: self._entry_size(entry) for entry in entries}
+        total = sum(sizes.values())
+
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= sizes[entry]
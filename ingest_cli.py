@@ -0,0 +1,264 @@
+"""
+BudgetBuddy Ingest CLI
+Headless batch processing of county exports
+
+Key Functions:
+- Ingest files, directories and glob patterns in parallel worker processes
+- Write standardized Parquet, CSV (optionally compressed) or Excel outputs
+- Skip inputs whose content hash is unchanged since the last run
+  (tracked in a manifest next to the outputs)
+- Print per-file rows, timing and throughput; exit non-zero on failures
+- Import only the standard library up front; pandas and the pipeline load
+  when there is work to do, openpyxl only for Excel files
+
+Usage:
+    python ingest_cli.py exports/*.csv county_dir/ --output-dir out [--format parquet]
+        [--system auto] [--workers 4] [--force] [--manifest out/manifest.json]
+    python data_ingestion.py ...   (same options)
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+INPUT_SUFFIXES = ['.csv', '.xlsx', '.xlsm', '.xls']
+
+# Output format choice -> file suffix
+OUTPUT_FORMATS = {
+    'parquet': '.parquet',
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'xlsx': '.xlsx',
+}
+
+MANIFEST_NAME = '.budgetbuddy_manifest.json'
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """
+    Export files named by paths, directories or glob patterns
+
+    Directories contribute their supported files (not recursively; use a
+    ** pattern for that). Duplicates are dropped, order is kept.
+    """
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(child for child in path.iterdir() if child.is_file())
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+            if not matches:
+                print(f"⚠ No files match {pattern}")
+        for match in matches:
+            if match.is_file() and match.suffix.lower() in INPUT_SUFFIXES:
+                found[match.resolve()] = None
+    return list(found)
+
+
+def output_paths(inputs: List[Path], output_dir: Path, suffix: str) -> Dict[Path, Path]:
+    """
+    Output file per input, every one distinct
+
+    Inputs sharing a stem are told apart by their folder name, then by
+    their own suffix (county.csv -> county_csv), then by a counter.
+    """
+    stems: Dict[str, int] = {}
+    for path in inputs:
+        stems[path.stem] = stems.get(path.stem, 0) + 1
+
+    outputs: Dict[Path, Path] = {}
+    taken = set()
+    for path in inputs:
+        if stems[path.stem] == 1:
+            candidates = [path.stem]
+        else:
+            extension = path.suffix.lstrip('.').lower()
+            candidates = [f"{path.parent.name}_{path.stem}",
+                          f"{path.parent.name}_{path.stem}_{extension}"]
+        name = next((name for name in candidates if name.lower() not in taken), None)
+        counter = 2
+        while name is None or name.lower() in taken:
+            name, counter = f"{candidates[-1]}_{counter}", counter + 1
+        taken.add(name.lower())
+        outputs[path] = output_dir / f"{name}{suffix}"
+    return outputs
+
+
+def load_manifest(path: Path) -> Dict[str, Dict]:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(path: Path, manifest: Dict[str, Dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    scratch.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(scratch, path)
+
+
+def process_input(path: str, output: str, system_type: str,
+                  previous: Optional[Dict] = None) -> Dict:
+    """
+    Hash one export and ingest it unless the previous run already did
+
+    Runs in a worker process; errors are captured in the result.
+
+    Args:
+        path: Export file
+        output: Output file (format from its suffix)
+        system_type: Vendor schema name or 'auto'
+        previous: Manifest entry from the last run, if any
+
+    Returns:
+        Result record (also the new manifest entry when processed)
+    """
+    import contextlib
+    import io
+
+    from data_ingestion import INGESTER_VERSION, BudgetDataIngester
+    from ingest_cache import content_hash
+
+    start = time.perf_counter()
+    result = {'path': path, 'output': output, 'bytes': os.path.getsize(path), 'skipped': False,
+              'error': None, 'rows': 0}
+    try:
+        digest = content_hash(path)
+        result.update(hash=digest, ingester_version=INGESTER_VERSION)
+        if previous and previous.get('hash') == digest \
+                and previous.get('ingester_version') == INGESTER_VERSION \
+                and previous.get('requested_system') == system_type \
+                and previous.get('output') == output and Path(output).exists():
+            return {**previous, 'skipped': True, 'error': None,
+                    'seconds': time.perf_counter() - start}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingester = BudgetDataIngester(system_type=system_type)
+            df, is_valid, issues = ingester.process_file(path)
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            ingester.export_standardized(output)
+        result.update(rows=len(df), is_valid=is_valid, issues=issues,
+                      requested_system=system_type, system_type=ingester.detected_system,
+                      processed_at=time.time())
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _report(result: Dict):
+    """One console line per finished file"""
+    name = Path(result['path']).name
+    if result['error']:
+        print(f"⚠ {name}: {result['error']}")
+        return
+    if result['skipped']:
+        print(f"✓ {name}: unchanged, skipped ({result['rows']:,} rows in {Path(result['output']).name})")
+        return
+    seconds = result['seconds']
+    rate = result['rows'] / seconds if seconds > 0 else float('inf')
+    mb_rate = result['bytes'] / 1024 ** 2 / seconds if seconds > 0 else float('inf')
+    flag = "" if result.get('is_valid', True) else f"  ({len(result['issues'])} validation issues)"
+    print(f"✓ {name}: {result['rows']:,} rows [{result['system_type']}] in {seconds:.2f}s "
+          f"({rate:,.0f} rows/s, {mb_rate:.1f} MB/s) -> {Path(result['output']).name}{flag}")
+
+
+def run(inputs: List[Path], output_dir: Path, output_format: str = 'parquet',
+        system_type: str = 'auto', workers: Optional[int] = None, force: bool = False,
+        manifest_path: Optional[Path] = None) -> List[Dict]:
+    """
+    Ingest exports into output_dir, skipping ones processed unchanged before
+
+    Args:
+        inputs: Export files
+        output_dir: Folder for standardized outputs
+        output_format: Key of OUTPUT_FORMATS
+        system_type: Vendor schema name or 'auto'
+        workers: Worker processes (default: CPU count, at most one per file)
+        force: Reprocess even when the manifest says an input is unchanged
+        manifest_path: Manifest file (default: output_dir/MANIFEST_NAME)
+
+    Returns:
+        Result record per input
+    """
+    manifest_path = manifest_path or output_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    outputs = output_paths(inputs, output_dir, OUTPUT_FORMATS[output_format])
+    tasks = [
+        (str(path), str(outputs[path].resolve()), system_type,
+         None if force else manifest.get(str(path)))
+        for path in inputs
+    ]
+    workers = max(min(workers or os.cpu_count() or 1, len(tasks)), 1)
+
+    start = time.perf_counter()
+    results = []
+    try:
+        if workers == 1:
+            for task in tasks:
+                results.append(process_input(*task))
+                _report(results[-1])
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+
+            # Load the pipeline once here so forked workers inherit it
+            import data_ingestion  # noqa: F401
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(process_input, *task) for task in tasks]
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    _report(results[-1])
+    finally:
+        # Keep what finished even if the run is interrupted
+        for result in results:
+            if not result['error'] and not result['skipped']:
+                manifest[result['path']] = {
+                    key: value for key, value in result.items() if key not in ('skipped', 'error', 'seconds')
+                }
+        if results:
+            save_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - start
+    processed = [result for result in results if not result['error'] and not result['skipped']]
+    skipped = sum(result['skipped'] for result in results)
+    failed = sum(result['error'] is not None for result in results)
+    rows = sum(result['rows'] for result in processed)
+    print(f"✓ {len(processed)} processed, {skipped} unchanged, {failed} failed: "
+          f"{rows:,} rows in {elapsed:.2f}s with {workers} workers")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('inputs', nargs='+', help="Export files, directories or glob patterns")
+    parser.add_argument('--output-dir', '-o', default='standardized')
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='parquet')
+    parser.add_argument('--system', default='auto',
+                        help="Vendor schema (munis, caselle, incode, springbrook, ...) or auto")
+    parser.add_argument('--workers', '-j', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="Reprocess unchanged inputs")
+    parser.add_argument('--manifest', default=None,
+                        help=f"Manifest path (default: OUTPUT_DIR/{MANIFEST_NAME})")
+    args = parser.parse_args(argv)
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print("⚠ No export files to process")
+        return 1
+    results = run(inputs, Path(args.output_dir), output_format=args.format,
+                  system_type=args.system.lower(), workers=args.workers, force=args.force,
+                  manifest_path=Path(args.manifest) if args.manifest else None)
+    return 1 if any(result['error'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
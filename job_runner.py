@@ -0,0 +1,215 @@
+"""
+BudgetBuddy Job Runner
+Background processing of uploads off the request path
+
+Key Functions:
+- Run ingestion jobs on a shared worker pool
+- Track jobs in a registry with status, current stage and progress
+- Let callers poll for completion and collect results
+- Expire finished jobs after a retention period
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data_ingestion import PROCESS_STAGES, BudgetDataIngester
+from data_sources import ExportSource
+
+DEFAULT_MAX_WORKERS = 4
+
+# Finished jobs are dropped from the registry after this many seconds
+JOB_RETENTION_SECONDS = 3600
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+
+class Job:
+    """One submitted unit of work and its progress"""
+
+    def __init__(self, job_id: str, label: str, owner: Optional[str]):
+        self.job_id = job_id
+        self.label = label
+        self.owner = owner
+        self.status = JOB_QUEUED
+        self.stage = None
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.traceback = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+    def snapshot(self) -> Dict:
+        """Status fields as a plain dict (safe to hand to the UI)"""
+        end = self.finished or time.time()
+        return {
+            'job_id': self.job_id,
+            'label': self.label,
+            'owner': self.owner,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'error': self.error,
+            'queued_seconds': (self.started or end) - self.submitted,
+            'run_seconds': end - self.started if self.started else 0.0,
+        }
+
+
+class JobRunner:
+    """Thread pool plus a registry of submitted jobs"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 retention_seconds: float = JOB_RETENTION_SECONDS):
+        """
+        Initialize runner
+
+        Args:
+            max_workers: Jobs processed concurrently; further jobs queue
+            retention_seconds: How long finished jobs stay in the registry
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='budgetbuddy-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.retention_seconds = retention_seconds
+
+    def submit(self, func: Callable, *args, label: str = '', owner: Optional[str] = None,
+               **kwargs) -> str:
+        """
+        Queue a job
+
+        Args:
+            func: Callable run on a worker thread. It receives a `progress`
+                keyword argument: a callback taking the current stage name.
+            *args, **kwargs: Passed through to func
+            label: Display name (e.g. the upload's file name)
+            owner: Session or user the job belongs to
+
+        Returns:
+            Job id
+        """
+        self._expire()
+        job = Job(uuid.uuid4().hex, label, owner)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        job.future = self._pool.submit(self._run, job, func, args, kwargs)
+        return job.job_id
+
+    def _run(self, job: Job, func: Callable, args, kwargs):
+        if job.status == JOB_CANCELLED:
+            return
+        job.status = JOB_RUNNING
+        job.started = time.time()
+
+        def progress(stage: str):
+            job.stage = stage
+            if stage in PROCESS_STAGES:
+                job.progress = PROCESS_STAGES.index(stage) / len(PROCESS_STAGES)
+
+        try:
+            job.result = func(*args, progress=progress, **kwargs)
+            job.status = JOB_DONE
+            job.progress = 1.0
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.traceback = traceback.format_exc()
+            job.status = JOB_FAILED
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by id, or None if unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Status snapshot of a job, or None if unknown or expired"""
+        job = self.get(job_id)
+        return job.snapshot() if job else None
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for a job and return its result
+
+        Args:
+            job_id: Job id from submit()
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            Whatever the job function returned
+
+        Raises:
+            KeyError: Unknown job
+            RuntimeError: The job failed or was cancelled
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        if job.status != JOB_CANCELLED:
+            job.future.result(timeout=timeout)
+        if job.status != JOB_DONE:
+            raise RuntimeError(f"Job {job_id} {job.status}: {job.error or ''}".rstrip(': '))
+        return job.result
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet"""
+        job = self.get(job_id)
+        if job is None or job.status != JOB_QUEUED:
+            return False
+        job.status = JOB_CANCELLED
+        job.future.cancel()
+        job.finished = time.time()
+        return True
+
+    def jobs(self, owner: Optional[str] = None) -> List[Dict]:
+        """Snapshots of registered jobs, newest first"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if owner is None or job.owner == owner]
+        return [job.snapshot() for job in sorted(jobs, key=lambda job: job.submitted, reverse=True)]
+
+    def _expire(self):
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.finished and job.finished < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and (optionally) wait for running ones"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def ingest_job(source: ExportSource, system_type: str, cache=None, metrics=None,
+               name: Optional[str] = None,
+               progress: Optional[Callable[[str], None]] = None
+               ) -> Tuple[BudgetDataIngester, bool, List[str]]:
+    """
+    Job function running the full ingestion pipeline for one export
+
+    Args:
+        source: Path to export file, or the uploaded bytes/file object
+        system_type: Vendor schema name ('munis', 'caselle', ...) or 'auto'
+        cache: Optional IngestCache
+        metrics: Optional PipelineMetrics for the ingester
+        name: Original file name of an in-memory upload
+        progress: Stage callback supplied by JobRunner
+
+    Returns:
+        (ingester holding the cleaned data, is_valid, list of validation issues)
+    """
+    ingester = BudgetDataIngester(system_type=system_type, metrics=metrics)
+    _, is_valid, issues = ingester.process_file(source, cache=cache, progress=progress, name=name)
+    return ingester, is_valid, issues
@@ -0,0 +1,133 @@
+"""
+BudgetBuddy Memory Cache
+Size-bounded in-process LRU for processed data and derived artifacts
+
+Key Functions:
+- Keep recently used results (ingesters, export bytes) in memory
+- Estimate entry sizes from DataFrame buffers and byte strings
+- Evict least recently used entries beyond a byte budget
+- Safe to share between sessions/threads
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a value
+
+    DataFrames and Series count their buffers (shallow), bytes-like values
+    their length; tuples, lists and dicts are summed; objects exposing
+    standardized_data (ingesters) count that frame.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    frame = getattr(value, 'standardized_data', None)
+    if isinstance(frame, pd.DataFrame):
+        return estimate_size(frame)
+    return sys.getsizeof(value)
+
+
+class MemoryLRU:
+    """Thread-safe LRU mapping bounded by estimated bytes"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize cache
+
+        Args:
+            max_bytes: Budget above which least recently used entries go
+        """
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value (marked most recently used) or default"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None):
+        """
+        Store a value, evicting older entries if over budget
+
+        Args:
+            key: Cache key
+            value: Value to keep
+            size: Bytes to charge (estimated when omitted). Values larger
+                than the whole budget are not stored.
+        """
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            self._pop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total += size
+            while self._total > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Cached value, or factory() stored under key on a miss"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def _pop(self, key: Hashable):
+        self._entries.pop(key, None)
+        self._total -= self._sizes.pop(key, 0)
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop entries
+
+        Args:
+            predicate: Called with each key; matching entries are dropped.
+                None clears everything.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                self._pop(key)
+        return len(keys)
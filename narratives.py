@@ -0,0 +1,401 @@
+"""
+BudgetBuddy Narratives
+Budget book narrative generation from fund and department summaries
+
+Key Functions:
+- Build deterministic per-fund prompts from get_fund_summary() output,
+  optionally with department detail
+- Dispatch prompts concurrently on asyncio with a concurrency cap and a
+  requests-per-minute limiter that backs off on rate-limit responses
+- Cache responses on disk by prompt hash so regenerating a budget book only
+  re-requests funds whose figures changed
+- Pluggable backends: OpenAI for production, a local stub for offline
+  testing and benchmarking
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+DEFAULT_NARRATIVE_CACHE_DIR = Path(tempfile.gettempdir()) / 'budgetbuddy_narratives'
+DEFAULT_MODEL = 'gpt-4o-mini'
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 5
+
+# Departments listed per fund prompt (largest budgets first)
+MAX_PROMPT_DEPTS = 10
+
+SYSTEM_PROMPT = (
+    "You are a public finance analyst writing narrative sections of a local "
+    "government budget book that follows GFOA Distinguished Budget Presentation "
+    "criteria. Write a concise, factual narrative (two to three short paragraphs) "
+    "for the fund described. Explain what the fund pays for, compare budgeted and "
+    "actual amounts, call out significant variances and year-over-year changes, "
+    "and use only the figures provided."
+)
+
+
+class RateLimited(Exception):
+    """Backend refused a request for rate reasons; retry after a pause"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(f"Rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class NarrativeRequest:
+    """One narrative to generate: a key (e.g. fund code) and its prompt"""
+
+    key: Hashable
+    prompt: str
+    system: str = SYSTEM_PROMPT
+
+
+def _money(value: float) -> str:
+    return f"-${-value:,.0f}" if value < 0 else f"${value:,.0f}"
+
+
+def build_fund_prompts(summary: pd.DataFrame, dept_summary: Optional[pd.DataFrame] = None,
+                       entity: Optional[str] = None,
+                       fiscal_year: Optional[int] = None) -> List[NarrativeRequest]:
+    """
+    One prompt per fund describing its latest fiscal year
+
+    Prompts depend only on the figures, so unchanged funds produce identical
+    prompts (and cache hits) on regeneration.
+
+    Args:
+        summary: get_fund_summary() output
+        dept_summary: Optional fund/dept/fiscal_year sums of budgeted and
+            actual amounts, listed under each fund
+        entity: County or city name for the prompt
+        fiscal_year: Year to describe (default: latest in summary)
+
+    Returns:
+        NarrativeRequest per fund, keyed by fund code
+    """
+    data = summary.dropna(subset=['fiscal_year'])
+    if data.empty:
+        return []
+    fiscal_year = int(fiscal_year if fiscal_year is not None else data['fiscal_year'].max())
+
+    current = data[data['fiscal_year'] == fiscal_year].set_index('fund_code')
+    prior = data[data['fiscal_year'] == fiscal_year - 1].set_index('fund_code')
+    depts = None
+    if dept_summary is not None and not dept_summary.empty:
+        depts = dept_summary[dept_summary['fiscal_year'] == fiscal_year]
+
+    requests = []
+    for fund_code, row in current.sort_index().iterrows():
+        lines = [
+            f"Entity: {entity}" if entity else None,
+            f"Fund: {fund_code}",
+            f"Fiscal year: {fiscal_year}",
+            f"Budgeted: {_money(row['budgeted_amount'])}",
+            f"Actual: {_money(row['actual_amount'])}",
+            f"Variance: {_money(row['variance'])} ({row['variance_pct']:.1f}%)",
+        ]
+        if fund_code in prior.index:
+            before = prior.loc[fund_code]
+            lines.append(f"Prior year ({fiscal_year - 1}) budgeted: {_money(before['budgeted_amount'])}, "
+                         f"actual: {_money(before['actual_amount'])}")
+        if depts is not None:
+            fund_depts = depts[depts['fund_code'] == fund_code].nlargest(MAX_PROMPT_DEPTS, 'budgeted_amount')
+            if not fund_depts.empty:
+                lines.append("Departments (budgeted / actual):")
+                lines += [
+                    f"- {dept['dept_code']}: {_money(dept['budgeted_amount'])} / {_money(dept['actual_amount'])}"
+                    for _, dept in fund_depts.iterrows()
+                ]
+        requests.append(NarrativeRequest(key=fund_code, prompt="\n".join(line for line in lines if line)))
+    return requests
+
+
+def dept_sums(df: pd.DataFrame) -> pd.DataFrame:
+    """Fund/dept/fiscal_year budgeted and actual sums for build_fund_prompts"""
+    return df.groupby(['fund_code', 'dept_code', 'fiscal_year'], observed=True)[
+        ['budgeted_amount', 'actual_amount']
+    ].sum().reset_index()
+
+
+class StubBackend:
+    """Offline backend returning a canned narrative after a simulated latency"""
+
+    def __init__(self, latency: float = 0.0, rate_limit_every: Optional[int] = None,
+                 retry_after: float = 0.01):
+        """
+        Args:
+            latency: Seconds each request takes
+            rate_limit_every: Refuse every Nth request with RateLimited, to
+                exercise the scheduler's backoff
+            retry_after: Pause suggested with each refusal
+        """
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.model = 'stub'
+        self.calls = 0
+
+    @property
+    def cache_tag(self) -> str:
+        return self.model
+
+    async def complete(self, system: str, prompt: str) -> str:
+        self.calls += 1
+        if self.rate_limit_every and self.calls % self.rate_limit_every == 0:
+            raise RateLimited(self.retry_after)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        heading = prompt.splitlines()[0] if prompt else ''
+        return f"[stub narrative] {heading} ({len(prompt)} prompt characters)"
+
+
+class OpenAIBackend:
+    """Chat completions through the openai package (imported on first use)"""
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None,
+                 max_tokens: int = 500, temperature: float = 0.3):
+        """
+        Args:
+            model: Model name (default: BUDGETBUDDY_NARRATIVE_MODEL or DEFAULT_MODEL)
+            api_key: API key (default: OPENAI_API_KEY)
+            max_tokens: Response length cap
+            temperature: Sampling temperature
+        """
+        from openai import AsyncOpenAI
+
+        self.model = model or os.environ.get('BUDGETBUDDY_NARRATIVE_MODEL') or DEFAULT_MODEL
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        # Retries are handled by NarrativeGenerator so backoff is shared
+        self._client = AsyncOpenAI(api_key=api_key, max_retries=0)
+
+    @property
+    def cache_tag(self) -> str:
+        return f"{self.model}|{self.max_tokens}|{self.temperature}"
+
+    async def complete(self, system: str, prompt: str) -> str:
+        import openai
+
+        try:
+            response = await self._client.chat.completions.create(
+                model=self.model,
+                messages=[{'role': 'system', 'content': system},
+                          {'role': 'user', 'content': prompt}],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+            )
+        except openai.RateLimitError as exc:
+            retry_after = exc.response.headers.get('retry-after') if exc.response is not None else None
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            raise RateLimited(retry_after) from exc
+        return (response.choices[0].message.content or '').strip()
+
+
+class NarrativeCache:
+    """On-disk narrative store keyed by backend, system prompt and prompt"""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            cache_dir: Directory for cached responses. Defaults to
+                BUDGETBUDDY_NARRATIVE_CACHE_DIR or a folder in the temp dir.
+        """
+        cache_dir = cache_dir or os.environ.get('BUDGETBUDDY_NARRATIVE_CACHE_DIR') or DEFAULT_NARRATIVE_CACHE_DIR
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(cache_tag: str, system: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (cache_tag, system, prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return json.loads((self.cache_dir / f"{key}.json").read_text())['text']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, text: str):
+        scratch = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        scratch.write_text(json.dumps({'text': text, 'created': time.time()}))
+        os.replace(scratch, self.cache_dir / f"{key}.json")
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.cache_dir.glob('*.json'):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+class RateLimiter:
+    """Async requests-per-minute limiter with a shared cool-down"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for the next request slot"""
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot, self._resume_at)
+            self._next_slot = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for seconds (after a rate-limit response)"""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+class NarrativeGenerator:
+    """Generates narratives concurrently through a backend, with caching"""
+
+    def __init__(self, backend=None, cache: Optional[NarrativeCache] = None,
+                 max_concurrency: int = DEFAULT_CONCURRENCY,
+                 requests_per_minute: Optional[float] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        """
+        Args:
+            backend: Object with async complete(system, prompt) and a
+                cache_tag (default: StubBackend)
+            cache: NarrativeCache for responses (None disables caching)
+            max_concurrency: Requests in flight at once
+            requests_per_minute: Dispatch rate cap (None for unlimited)
+            max_retries: Attempts per request after rate-limit refusals
+        """
+        self.backend = backend or StubBackend()
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.stats = {'cached': 0, 'requested': 0, 'rate_limited': 0, 'failed': 0}
+
+    async def _complete(self, request: NarrativeRequest, limiter: RateLimiter,
+                        semaphore: asyncio.Semaphore) -> str:
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            async with semaphore:
+                try:
+                    return await self.backend.complete(request.system, request.prompt)
+                except RateLimited as exc:
+                    self.stats['rate_limited'] += 1
+                    if attempt == self.max_retries:
+                        raise
+                    pause = exc.retry_after if exc.retry_after is not None else delay
+                    limiter.pause(pause)
+                    delay = min(delay * 2, 60.0)
+
+    async def agenerate(self, requests: Sequence[NarrativeRequest],
+                        progress: Optional[Callable[[int, int], None]] = None) -> Dict[Hashable, str]:
+        """
+        Narrative text per request key
+
+        Cached responses are returned without calling the backend; the rest
+        are dispatched concurrently. A request that still fails after
+        retries maps to an empty string and is counted in stats['failed'].
+
+        Args:
+            requests: Prompts to generate
+            progress: Called with (completed, total) as narratives finish
+
+        Returns:
+            Dict of request key -> narrative
+        """
+        results: Dict[Hashable, str] = {}
+        pending = []
+        for request in requests:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = NarrativeCache.make_key(self.backend.cache_tag, request.system, request.prompt)
+                text = self.cache.get(cache_key)
+                if text is not None:
+                    results[request.key] = text
+                    self.stats['cached'] += 1
+                    continue
+            pending.append((request, cache_key))
+
+        total, done = len(requests), len(results)
+        if progress:
+            progress(done, total)
+        if not pending:
+            return results
+
+        limiter = RateLimiter(self.requests_per_minute)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(request: NarrativeRequest, cache_key: Optional[str]):
+            try:
+                text = await self._complete(request, limiter, semaphore)
+            except Exception as exc:
+                self.stats['failed'] += 1
+                print(f"⚠ Narrative for {request.key} failed: {exc}")
+                return request.key, ''
+            self.stats['requested'] += 1
+            if cache_key is not None:
+                self.cache.put(cache_key, text)
+            return request.key, text
+
+        for finished in asyncio.as_completed([run(request, key) for request, key in pending]):
+            key, text = await finished
+            results[key] = text
+            done += 1
+            if progress:
+                progress(done, total)
+        return results
+
+    def generate(self, requests: Sequence[NarrativeRequest],
+                 progress: Optional[Callable[[int, int], None]] = None) -> Dict[Hashable, str]:
+        """Blocking wrapper around agenerate() for scripts and worker threads"""
+        return asyncio.run(self.agenerate(requests, progress))
+
+
+def generate_fund_narratives(summary: pd.DataFrame, detail: Optional[pd.DataFrame] = None,
+                             entity: Optional[str] = None,
+                             generator: Optional[NarrativeGenerator] = None,
+                             dept_summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Narrative per fund for the latest fiscal year
+
+    Args:
+        summary: get_fund_summary() output
+        detail: Cleaned detail data; adds department figures to prompts
+        entity: County or city name
+        generator: Configured NarrativeGenerator (default: stub backend
+            with the default on-disk cache)
+        dept_summary: Department sums to use instead of grouping detail
+            (see build_fund_prompts), e.g. from a rollup cube
+
+    Returns:
+        DataFrame with fund_code and narrative columns
+    """
+    generator = generator or NarrativeGenerator(cache=NarrativeCache())
+    if dept_summary is None and detail is not None and 'dept_code' in detail.columns:
+        dept_summary = dept_sums(detail)
+    requests = build_fund_prompts(summary, dept_summary, entity=entity)
+    narratives = generator.generate(requests)
+    print(f"✓ Narratives: {generator.stats['requested']} generated, {generator.stats['cached']} from cache")
+    return pd.DataFrame({
+        'fund_code': [request.key for request in requests],
+        'narrative': [narratives.get(request.key, '') for request in requests],
+    })
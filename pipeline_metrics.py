@@ -0,0 +1,179 @@
+"""
+BudgetBuddy Pipeline Metrics
+Per-stage timing and memory instrumentation for ingestion
+
+Key Functions:
+- Record wall time, rows/sec and peak traced memory for each pipeline stage
+- Expose results as a structured object / DataFrame for diagnostics
+- Append runs to a JSON-lines log
+- Cost nothing beyond a method call when disabled
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+
+class _NullStage:
+    """Stand-in stage handle used while metrics are disabled"""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        # Shared singleton; ignore row counts set by callers
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+# tracemalloc is process-wide; stages on concurrent threads share one trace
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        else:
+            tracemalloc.reset_peak()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        # Leave tracing alone if someone else turned it on
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class _Stage:
+    """Context manager timing one pipeline stage"""
+
+    def __init__(self, metrics: 'PipelineMetrics', name: str, rows: Optional[int]):
+        self.metrics = metrics
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        if self.metrics.track_memory:
+            _start_tracing()
+            self._base_memory = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        peak_bytes = None
+        if self.metrics.track_memory:
+            peak_bytes = max(tracemalloc.get_traced_memory()[1] - self._base_memory, 0)
+            _stop_tracing()
+
+        self.metrics.stages.append({
+            'stage': self.name,
+            'seconds': seconds,
+            'rows': self.rows,
+            'rows_per_sec': self.rows / seconds if self.rows and seconds > 0 else None,
+            'peak_memory_mb': peak_bytes / 1024 ** 2 if peak_bytes is not None else None,
+            'failed': exc_type is not None,
+        })
+        return False
+
+
+class PipelineMetrics:
+    """Collects per-stage measurements for one ingester"""
+
+    def __init__(self, enabled: Optional[bool] = None, track_memory: bool = False,
+                 log_path: Optional[Union[str, Path]] = None):
+        """
+        Initialize metrics collection
+
+        Args:
+            enabled: Record stages. Defaults to the BUDGETBUDDY_METRICS
+                environment variable (off unless set to 1/true).
+            track_memory: Also record peak allocations with tracemalloc.
+                Noticeably slows the pipeline, so off by default. The trace
+                is process-wide, so peaks of concurrent jobs overlap.
+            log_path: JSON-lines file each finished run is appended to.
+                Defaults to BUDGETBUDDY_METRICS_LOG when set.
+        """
+        if enabled is None:
+            enabled = os.environ.get('BUDGETBUDDY_METRICS', '').lower() in ('1', 'true', 'yes')
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        log_path = log_path or os.environ.get('BUDGETBUDDY_METRICS_LOG')
+        self.log_path = Path(log_path) if log_path else None
+        self.stages: List[Dict] = []
+
+    def stage(self, name: str, rows: Optional[int] = None):
+        """
+        Context manager measuring one stage
+
+        Set .rows on the returned handle when the row count is only known
+        at the end of the stage.
+
+        Args:
+            name: Stage name (load, standardize, validate, clean, ...)
+            rows: Rows processed, if known up front
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def reset(self):
+        """Forget recorded stages"""
+        self.stages = []
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stage['seconds'] for stage in self.stages)
+
+    def to_dict(self) -> Dict:
+        """Recorded stages plus totals as plain Python values"""
+        return {
+            'stages': list(self.stages),
+            'total_seconds': self.total_seconds,
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """Recorded stages as a DataFrame (one row per stage)"""
+        return pd.DataFrame(
+            self.stages,
+            columns=['stage', 'seconds', 'rows', 'rows_per_sec', 'peak_memory_mb', 'failed']
+        )
+
+    def write_log(self, **context) -> Optional[Path]:
+        """
+        Append the recorded run to the JSON-lines log, if one is configured
+
+        Args:
+            **context: Extra fields stored with the run (source file, system)
+
+        Returns:
+            Log path written, or None
+        """
+        if not self.enabled or self.log_path is None or not self.stages:
+            return None
+        record = {'timestamp': time.time(), **context, **self.to_dict()}
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+        return self.log_path
@@ -0,0 +1,253 @@
+"""
+BudgetBuddy Rollup Cube
+Precomputed budget-vs-actual aggregates over the fund/dept/account hierarchy
+
+Key Functions:
+- Aggregate cleaned detail once into a base cuboid (fund x dept x account x
+  fiscal year) plus smaller cuboids for the common cuts
+- Answer any drill-down (by fund, dept, account prefix, account, year, with
+  filters) from the smallest cuboid that covers it, never the detail rows
+- Year-over-year changes per group
+- Update incrementally when rows are appended (or removed)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import AMOUNT_COLUMNS, add_calculated_fields, decategorize
+
+# Leading account code characters forming the account_prefix dimension
+# ('51010' -> '51', '1000-100' -> '10')
+DEFAULT_PREFIX_LENGTH = 2
+
+CUBE_DIMENSIONS = ['fund_code', 'dept_code', 'account_prefix', 'account_code', 'fiscal_year']
+
+# Materialized cuboids besides the base grain (fiscal_year is always included)
+DEFAULT_CUBOIDS = [
+    (),
+    ('fund_code',),
+    ('dept_code',),
+    ('account_prefix',),
+    ('fund_code', 'dept_code'),
+    ('fund_code', 'account_prefix'),
+    ('dept_code', 'account_prefix'),
+    ('fund_code', 'dept_code', 'account_prefix'),
+]
+
+FilterValues = Dict[str, Sequence]
+
+
+class RollupCube:
+    """Multi-level amount sums over the budget hierarchy"""
+
+    def __init__(self, prefix_length: int = DEFAULT_PREFIX_LENGTH,
+                 cuboids: Sequence[Tuple[str, ...]] = DEFAULT_CUBOIDS):
+        """
+        Create an empty cube; fill it with update() or use from_frame()
+
+        Args:
+            prefix_length: Characters of account_code kept in account_prefix
+            cuboids: Dimension sets to materialize besides the base grain
+        """
+        self.prefix_length = prefix_length
+        self.requested_cuboids = [tuple(dims) for dims in cuboids]
+        self.dimensions: List[str] = []
+        self.amount_columns: List[str] = []
+        self.cuboids: Dict[Tuple[str, ...], pd.DataFrame] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **options) -> 'RollupCube':
+        """Cube over a cleaned detail frame"""
+        cube = cls(**options)
+        cube.update(df)
+        return cube
+
+    def __len__(self) -> int:
+        """Groups at the base grain"""
+        return len(self.cuboids.get(tuple(self.dimensions), ()))
+
+    def _base_sums(self, df: pd.DataFrame, sign: int = 1) -> pd.DataFrame:
+        """Base-grain sums and row counts of detail rows"""
+        base_dims = [dim for dim in CUBE_DIMENSIONS if dim != 'account_prefix' and dim in df.columns]
+        grouped = df.groupby(base_dims, observed=True, dropna=False)
+        sums = grouped[self.amount_columns].sum()
+        sums['row_count'] = grouped.size()
+        # Keys stay categorical: decoding them to strings would cost more
+        # than the aggregation itself
+        sums = sums.reset_index()
+
+        if 'account_code' in sums.columns:
+            sums.insert(sums.columns.get_loc('account_code'), 'account_prefix',
+                        self._account_prefix(sums['account_code']))
+        if sign < 0:
+            sums[self.amount_columns + ['row_count']] *= -1
+        return sums.set_index(self.dimensions)
+
+    def _account_prefix(self, accounts: pd.Series) -> pd.Categorical:
+        """Leading characters of account codes, computed once per distinct code"""
+        accounts = accounts.astype('category')
+        prefixes = accounts.cat.categories.astype('str').str[:self.prefix_length]
+        prefix_codes, unique_prefixes = pd.factorize(prefixes)
+        codes = accounts.cat.codes.to_numpy()
+        mapped = np.where(codes >= 0, prefix_codes[codes], -1)
+        return pd.Categorical.from_codes(mapped, categories=unique_prefixes)
+
+    def _cuboid_dims(self) -> List[Tuple[str, ...]]:
+        """Dimension sets to keep, limited to the dimensions in the data"""
+        keep = [tuple(self.dimensions)]
+        for dims in self.requested_cuboids:
+            dims = tuple(dim for dim in dims if dim in self.dimensions)
+            if 'fiscal_year' in self.dimensions:
+                dims += ('fiscal_year',)
+            if dims and dims not in keep:
+                keep.append(dims)
+        return keep
+
+    @staticmethod
+    def _merge(current: Optional[pd.DataFrame], delta: pd.DataFrame) -> pd.DataFrame:
+        """Add delta sums into a cuboid, dropping groups left without rows"""
+        if current is None or current.empty:
+            merged = delta
+        else:
+            # Add into existing groups by position; only new groups are appended
+            positions = current.index.get_indexer(delta.index)
+            found = positions >= 0
+            values = current.to_numpy(copy=True)
+            np.add.at(values, positions[found], delta.to_numpy()[found])
+            merged = pd.DataFrame(values, index=current.index, columns=current.columns)
+            merged['row_count'] = merged['row_count'].astype('int64')
+            if not found.all():
+                merged = pd.concat([merged, delta[~found]])
+        return merged[merged['row_count'] != 0]
+
+    def update(self, added: Optional[pd.DataFrame] = None,
+               removed: Optional[pd.DataFrame] = None):
+        """
+        Fold appended (and/or removed) detail rows into every cuboid
+
+        Only the given rows are aggregated; the cube never rescans detail.
+
+        Args:
+            added: Cleaned rows new to the data
+            removed: Cleaned rows dropped from the data (e.g. a replaced load)
+        """
+        deltas = []
+        for frame, sign in ((added, 1), (removed, -1)):
+            if frame is None or frame.empty:
+                continue
+            if not self.dimensions:
+                self.dimensions = [dim for dim in CUBE_DIMENSIONS
+                                   if dim in frame.columns or (dim == 'account_prefix' and 'account_code' in frame.columns)]
+                self.amount_columns = [col for col in AMOUNT_COLUMNS if col in frame.columns]
+                if not self.dimensions or not self.amount_columns:
+                    raise ValueError("Rollup cube needs key and amount columns")
+            deltas.append(self._base_sums(frame, sign))
+        if not deltas:
+            return
+
+        base_dims = tuple(self.dimensions)
+        base_delta = deltas[0] if len(deltas) == 1 else pd.concat(deltas).groupby(
+            level=list(range(len(base_dims))), dropna=False
+        ).sum()
+        delta_sums = {base_dims: base_delta}
+        # Finest cuboids first, each rolled up from the smallest finer one
+        for dims in sorted(self._cuboid_dims(), key=len, reverse=True):
+            if dims != base_dims:
+                source = min((frame for have, frame in delta_sums.items() if set(dims) <= set(have)), key=len)
+                delta_sums[dims] = source.groupby(level=list(dims), dropna=False).sum()
+            self.cuboids[dims] = self._merge(self.cuboids.get(dims), delta_sums[dims])
+
+    @staticmethod
+    def _normalize_filters(filters: Optional[FilterValues]) -> Dict[str, list]:
+        normalized = {}
+        for col, values in (filters or {}).items():
+            if values is None:
+                continue
+            if isinstance(values, (str, int)) or not hasattr(values, '__iter__'):
+                values = [values]
+            normalized[col] = list(values)
+        return normalized
+
+    def _cuboid_for(self, needed: set) -> pd.DataFrame:
+        """Smallest materialized cuboid holding every needed dimension"""
+        unknown = needed - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions: {sorted(unknown)}")
+        candidates = [frame for dims, frame in self.cuboids.items() if needed <= set(dims)]
+        return min(candidates, key=len)
+
+    def query(self, by: Sequence[str] = ('fiscal_year',),
+              filters: Optional[FilterValues] = None) -> pd.DataFrame:
+        """
+        Amount sums and variance metrics for any cut of the data
+
+        Args:
+            by: Dimensions to group by (any of CUBE_DIMENSIONS present)
+            filters: Dimension -> allowed value(s)
+
+        Returns:
+            One row per group with amount sums, row_count, variance,
+            variance_pct and available_balance
+        """
+        if not self.cuboids:
+            return pd.DataFrame(columns=list(by))
+        by = list(by)
+        filters = self._normalize_filters(filters)
+        frame = self._cuboid_for(set(by) | set(filters))
+
+        for col, values in filters.items():
+            frame = frame[frame.index.get_level_values(col).isin(values)]
+
+        if by:
+            result = decategorize(frame.groupby(level=by, dropna=False).sum().sort_index().reset_index())
+        else:
+            result = frame.sum().to_frame().T
+            result['row_count'] = result['row_count'].astype('int64')
+        return add_calculated_fields(result)
+
+    def drill_down(self, path: Optional[Dict[str, object]] = None,
+                   level: str = 'dept_code', by_year: bool = True) -> pd.DataFrame:
+        """
+        Children of one node of the hierarchy
+
+        Args:
+            path: Fixed dimension values, e.g. {'fund_code': '100'}
+            level: Dimension to break the node down by
+            by_year: Keep fiscal years separate
+
+        Returns:
+            query() result grouped by level (and fiscal_year)
+        """
+        by = [level] + (['fiscal_year'] if by_year and 'fiscal_year' in self.dimensions else [])
+        return self.query(by, filters=path)
+
+    def year_over_year(self, by: Sequence[str] = ('fund_code',),
+                       filters: Optional[FilterValues] = None) -> pd.DataFrame:
+        """
+        Amounts per group and fiscal year next to the prior year's
+
+        Args:
+            by: Group dimensions (fiscal_year is added)
+            filters: Dimension -> allowed value(s)
+
+        Returns:
+            query() columns plus <amount>_prior, <amount>_change and
+            <amount>_change_pct for budgeted and actual amounts
+        """
+        if 'fiscal_year' not in self.dimensions:
+            raise ValueError("Year-over-year needs fiscal_year in the data")
+        by = [dim for dim in by if dim != 'fiscal_year']
+        current = self.query(by + ['fiscal_year'], filters)
+        compared = [col for col in ['budgeted_amount', 'actual_amount'] if col in current.columns]
+
+        prior = current[by + ['fiscal_year'] + compared].copy()
+        prior['fiscal_year'] = prior['fiscal_year'] + 1
+        result = current.merge(prior, on=by + ['fiscal_year'], how='left', suffixes=('', '_prior'))
+        for col in compared:
+            result[f'{col}_change'] = result[col] - result[f'{col}_prior']
+            result[f'{col}_change_pct'] = (
+                result[f'{col}_change'] / result[f'{col}_prior'].where(result[f'{col}_prior'] != 0)
+            ) * 100
+        return result
@@ -0,0 +1,204 @@
+"""
+BudgetBuddy Trend Series
+Precomputed per-year series and compact chart payloads for trend charts
+
+Key Functions:
+- Pivot rollup cube sums into a fiscal year x member matrix once per
+  dataset, dimension, amount and drill-down path
+- Rank members by total or latest-year amount
+- Keep the top N series and sum the rest into one "Other" series, so chart
+  size stays fixed however many funds or departments there are
+- Drill down from funds to departments or account prefixes of one fund
+- Deliver chart-ready frames or JSON-ready payloads
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rollup_cube import FilterValues, RollupCube
+
+# Series shown by default; everything else is summed into OTHER_LABEL
+DEFAULT_TOP_N = 10
+OTHER_LABEL = 'Other'
+
+# Member label for rows with a blank code
+BLANK_LABEL = '(blank)'
+
+# Member ranking: sum over all years, or the latest year's amount
+RANK_METHODS = ['total', 'latest']
+
+# Pivoted matrices kept per dataset (one per dimension/amount/drill-down path)
+MATRIX_CACHE_SIZE = 32
+
+
+class TrendMatrix:
+    """Amounts of one dimension's members per fiscal year, members ranked"""
+
+    def __init__(self, years: np.ndarray, members: List[str], values: np.ndarray):
+        """
+        Args:
+            years: Fiscal years, ascending
+            members: Member labels in ranked order
+            values: years x members amounts; NaN where a member has no rows
+        """
+        self.years = years
+        self.members = members
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def select(self, top_n: Optional[int] = DEFAULT_TOP_N,
+               members: Optional[Sequence[str]] = None,
+               other: bool = True) -> Tuple[List[str], np.ndarray]:
+        """
+        Series to draw
+
+        Args:
+            top_n: Highest ranked members kept (None keeps all)
+            members: Explicit members to keep instead of the top N
+            other: Add one series summing every member left out
+
+        Returns:
+            (series names, years x series values)
+        """
+        if members is not None:
+            wanted = set(members)
+            keep = np.array([member in wanted for member in self.members], dtype=bool)
+        elif top_n is None or top_n >= len(self.members):
+            keep = np.ones(len(self.members), dtype=bool)
+        else:
+            keep = np.arange(len(self.members)) < top_n
+
+        names = [member for member, kept in zip(self.members, keep) if kept]
+        values = self.values[:, keep]
+        if other and not keep.all():
+            rest = self.values[:, ~keep]
+            summed = np.where(np.isnan(rest).all(axis=1), np.nan, np.nansum(rest, axis=1))
+            names.append(OTHER_LABEL)
+            values = np.column_stack([values, summed])
+        return names, values
+
+
+class TrendSeries:
+    """Trend chart data derived from a RollupCube, built once per dataset"""
+
+    def __init__(self, cube: RollupCube):
+        """
+        Wrap a cube (not copied; build a new TrendSeries after updating it)
+
+        Args:
+            cube: Rollup cube of the dataset
+        """
+        self.cube = cube
+        self._matrices: 'OrderedDict[tuple, TrendMatrix]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _filter_key(filters: Optional[FilterValues]) -> tuple:
+        normalized = RollupCube._normalize_filters(filters)
+        return tuple(sorted((col, tuple(sorted(map(str, values)))) for col, values in normalized.items()))
+
+    def matrix(self, by: str = 'fund_code', value_column: str = 'budgeted_amount',
+               filters: Optional[FilterValues] = None, rank_by: str = 'total') -> TrendMatrix:
+        """
+        Pivoted series of every member of a dimension (memoized)
+
+        Args:
+            by: Dimension whose members become series ('fund_code',
+                'dept_code', 'account_prefix', 'account_code')
+            value_column: Amount or calculated column to plot
+            filters: Drill-down path, e.g. {'fund_code': '100'}
+            rank_by: One of RANK_METHODS
+
+        Returns:
+            TrendMatrix with members in ranked order
+        """
+        if rank_by not in RANK_METHODS:
+            raise ValueError(f"rank_by must be one of {RANK_METHODS}")
+        key = (by, value_column, self._filter_key(filters), rank_by)
+        with self._lock:
+            if key in self._matrices:
+                self._matrices.move_to_end(key)
+                return self._matrices[key]
+
+        matrix = self._build(by, value_column, filters, rank_by)
+        with self._lock:
+            self._matrices[key] = matrix
+            if len(self._matrices) > MATRIX_CACHE_SIZE:
+                self._matrices.popitem(last=False)
+        return matrix
+
+    def _build(self, by: str, value_column: str, filters: Optional[FilterValues],
+               rank_by: str) -> TrendMatrix:
+        if 'fiscal_year' not in self.cube.dimensions:
+            raise ValueError("Trend series need fiscal_year in the data")
+        sums = self.cube.query([by, 'fiscal_year'], filters)
+        if value_column not in sums.columns:
+            raise ValueError(f"No {value_column} column to plot")
+        sums = sums[sums['fiscal_year'].notna()]
+
+        year_codes, years = pd.factorize(sums['fiscal_year'].astype('int64'), sort=True)
+        member_codes, members = pd.factorize(sums[by].astype(str).where(sums[by].notna(), BLANK_LABEL))
+        values = np.full((len(years), len(members)), np.nan)
+        values[year_codes, member_codes] = sums[value_column].to_numpy(dtype='float64')
+
+        if rank_by == 'latest':
+            score = values[-1] if len(years) else np.zeros(len(members))
+        else:
+            score = np.nansum(values, axis=0)
+        # Largest magnitude first; members without a score last, ties by name
+        score = np.nan_to_num(np.abs(score), nan=-1.0)
+        labels = np.asarray(members, dtype=object)
+        order = np.lexsort((labels, -score))
+        return TrendMatrix(np.asarray(years), labels[order].tolist(), values[:, order])
+
+    def chart_frame(self, by: str = 'fund_code', value_column: str = 'budgeted_amount',
+                    top_n: Optional[int] = DEFAULT_TOP_N,
+                    filters: Optional[FilterValues] = None,
+                    members: Optional[Sequence[str]] = None,
+                    other: bool = True, rank_by: str = 'total') -> pd.DataFrame:
+        """
+        Chart-ready frame: fiscal years as index, one column per series
+
+        Args:
+            by, value_column, filters, rank_by: See matrix()
+            top_n, members, other: See TrendMatrix.select()
+
+        Returns:
+            At most top_n + 1 columns however many members there are
+        """
+        matrix = self.matrix(by, value_column, filters, rank_by)
+        names, values = matrix.select(top_n, members, other)
+        return pd.DataFrame(values, index=pd.Index(matrix.years, name='fiscal_year'),
+                            columns=pd.Index(names, name=by))
+
+    def payload(self, by: str = 'fund_code', value_column: str = 'budgeted_amount',
+                top_n: Optional[int] = DEFAULT_TOP_N,
+                filters: Optional[FilterValues] = None,
+                members: Optional[Sequence[str]] = None,
+                other: bool = True, rank_by: str = 'total') -> Dict:
+        """
+        JSON-ready chart data (same arguments as chart_frame)
+
+        Returns:
+            {'by', 'value_column', 'years', 'series': [{'name', 'values'}],
+            'members': member count, 'shown': members drawn as their own
+            series}, missing values as None
+        """
+        matrix = self.matrix(by, value_column, filters, rank_by)
+        names, values = matrix.select(top_n, members, other)
+        rounded = np.round(values, 2).astype(object)
+        rounded[np.isnan(values)] = None
+        return {
+            'by': by,
+            'value_column': value_column,
+            'years': [int(year) for year in matrix.years],
+            'series': [{'name': name, 'values': rounded[:, i].tolist()} for i, name in enumerate(names)],
+            'members': len(matrix),
+            'shown': len(names) - (names[-1:] == [OTHER_LABEL]),
+        }
@@ -0,0 +1,275 @@
+"""
+BudgetBuddy Vendor Schemas
+Registry of financial system export layouts with header-based detection
+
+Key Functions:
+- Register vendor column maps declaratively (built-in Munis, Caselle,
+  Tyler Incode and Springbrook, plus user-defined maps from JSON)
+- Read only the header of a CSV/Excel export
+- Detect the vendor from those headers and resolve the map against the
+  export's actual header spelling
+- Give the parser the exact columns to load, so unused columns are never read
+"""
+
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from data_cleaning import STANDARD_SCHEMA
+from data_sources import ExportSource, open_source, source_suffix
+from excel_reader import read_excel_headers
+
+# Bytes read from a CSV export to find its header line
+HEADER_SNIFF_BYTES = 64 * 1024
+
+# Share of a schema's columns an export must carry to be detected as it
+MIN_DETECTION_SCORE = 0.5
+
+# Standard columns an export must map to be usable at all
+REQUIRED_COLUMNS = ['fund_code', 'fiscal_year']
+
+
+def _normalize(header: str) -> str:
+    return ' '.join(str(header).split()).casefold()
+
+
+@dataclass(frozen=True)
+class VendorSchema:
+    """Export layout of one financial system"""
+
+    name: str
+    label: str
+    column_map: Dict[str, str]
+
+    def resolve(self, headers: List[str]) -> Dict[str, str]:
+        """
+        Map of the export's own header names to standard columns
+
+        Headers match case- and whitespace-insensitively, so 'FUND CODE'
+        finds 'Fund Code'.
+        """
+        wanted = {_normalize(vendor_col): std_col for vendor_col, std_col in self.column_map.items()}
+        resolved = {}
+        for header in headers:
+            std_col = wanted.get(_normalize(header))
+            if std_col is not None and std_col not in resolved.values():
+                resolved[header] = std_col
+        return resolved
+
+    def score(self, headers: List[str]) -> float:
+        """Share of this schema's columns present in headers"""
+        return len(self.resolve(headers)) / len(self.column_map) if self.column_map else 0.0
+
+
+_SCHEMAS: Dict[str, VendorSchema] = {}
+
+
+def register_schema(name: str, column_map: Dict[str, str], label: Optional[str] = None,
+                    replace: bool = False) -> VendorSchema:
+    """
+    Add a vendor layout to the registry
+
+    Args:
+        name: System type key (e.g. 'munis'), case-insensitive
+        column_map: Vendor header -> standard column name
+        label: Display name (default: name)
+        replace: Overwrite an existing schema of the same name
+
+    Returns:
+        The registered VendorSchema
+    """
+    name = name.lower()
+    if name == 'auto':
+        raise ValueError("'auto' is reserved for vendor detection")
+    if name in _SCHEMAS and not replace:
+        raise ValueError(f"Vendor schema already registered: {name}")
+    unknown = sorted(set(column_map.values()) - set(STANDARD_SCHEMA))
+    if unknown:
+        raise ValueError(f"Unknown standard columns in {name} schema: {unknown}")
+    missing = [col for col in REQUIRED_COLUMNS if col not in column_map.values()]
+    if missing:
+        raise ValueError(f"{name} schema does not map required columns: {missing}")
+
+    schema = VendorSchema(name=name, label=label or name, column_map=dict(column_map))
+    _SCHEMAS[name] = schema
+    return schema
+
+
+def get_schema(name: str) -> VendorSchema:
+    """Registered schema by system type; ValueError if unknown"""
+    try:
+        return _SCHEMAS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported system type: {name}") from None
+
+
+def schema_names() -> List[str]:
+    return list(_SCHEMAS)
+
+
+def load_schema_file(path: Union[str, Path], replace: bool = True) -> List[VendorSchema]:
+    """
+    Register user-defined schemas from a JSON file
+
+    The file holds one schema object or a list of them:
+    {"name": "mysystem", "label": "My System", "columns": {"Fund No": "fund_code", ...}}
+
+    Args:
+        path: JSON file
+        replace: Let file entries override registered schemas
+
+    Returns:
+        Schemas registered
+    """
+    entries = json.loads(Path(path).read_text())
+    if isinstance(entries, dict):
+        entries = [entries]
+    return [
+        register_schema(entry['name'], entry['columns'], label=entry.get('label'), replace=replace)
+        for entry in entries
+    ]
+
+
+def _csv_header(readable) -> List[str]:
+    """Header fields of a CSV from its first bytes"""
+    if isinstance(readable, str):
+        with open(readable, 'rb') as f:
+            head = f.read(HEADER_SNIFF_BYTES)
+    else:
+        position = readable.tell()
+        head = readable.read(HEADER_SNIFF_BYTES)
+        readable.seek(position)
+    text = head.decode('utf-8-sig', errors='replace')
+    first_line = next(csv.reader(io.StringIO(text)), [])
+    return first_line
+
+
+def read_headers(source: ExportSource, name: Optional[str] = None,
+                 memory_map: bool = False) -> List[List[str]]:
+    """
+    Column headers of an export, reading only its first bytes/rows
+
+    Args:
+        source: Path, buffer or file-like export
+        name: Original file name of an in-memory upload
+        memory_map: Memory-map a path source instead of reading it
+
+    Returns:
+        One header list per worksheet (a single list for CSV)
+    """
+    suffix = source_suffix(source, name)
+    with open_source(source, memory_map) as readable:
+        if suffix == '.csv':
+            return [_csv_header(readable)]
+        if suffix in ('.xlsx', '.xlsm'):
+            return list(read_excel_headers(readable).values())
+        if suffix == '.xls':
+            return [[str(col) for col in pd.read_excel(readable, nrows=0).columns]]
+    raise ValueError(f"Unsupported file type: {suffix}")
+
+
+def match_schema(headers: List[str]) -> Optional[Tuple[VendorSchema, Dict[str, str], float]]:
+    """
+    Best registered schema for a header row
+
+    Returns:
+        (schema, resolved column map, score), or None when no schema
+        reaches MIN_DETECTION_SCORE with the required columns
+    """
+    best = None
+    for schema in _SCHEMAS.values():
+        resolved = schema.resolve(headers)
+        if not all(col in resolved.values() for col in REQUIRED_COLUMNS):
+            continue
+        score = schema.score(headers)
+        # Ties go to the schema explaining more columns
+        if score >= MIN_DETECTION_SCORE and (
+            best is None or (score, len(resolved)) > (best[2], len(best[1]))
+        ):
+            best = (schema, resolved, score)
+    return best
+
+
+def best_match(header_lists: List[List[str]]) -> Tuple[VendorSchema, Dict[str, str]]:
+    """
+    Vendor of an export from its header rows (one per worksheet)
+
+    Returns:
+        (schema, column map resolved against the export's headers)
+    """
+    matches = [match for match in map(match_schema, header_lists) if match]
+    if not matches:
+        raise ValueError("Could not detect the financial system from the export headers; "
+                         f"choose one of: {', '.join(schema_names())}")
+    schema, resolved, _ = max(matches, key=lambda match: (match[2], len(match[1])))
+    return schema, resolved
+
+
+def detect_schema(source: ExportSource, name: Optional[str] = None,
+                  memory_map: bool = False) -> Tuple[VendorSchema, Dict[str, str]]:
+    """
+    Vendor of an export, from its headers alone
+
+    Args:
+        source: Path, buffer or file-like export
+        name: Original file name of an in-memory upload
+        memory_map: Memory-map a path source instead of reading it
+
+    Returns:
+        (schema, column map resolved against the export's headers)
+    """
+    return best_match(read_headers(source, name, memory_map))
+
+
+register_schema('munis', {
+    'Fund': 'fund_code',
+    'Department': 'dept_code',
+    'Account': 'account_code',
+    'FY': 'fiscal_year',
+    'Budget': 'budgeted_amount',
+    'Actual': 'actual_amount',
+    'Encumbrance': 'encumbered_amount',
+    'Description': 'description'
+}, label='Munis (Tyler Technologies)')
+
+register_schema('caselle', {
+    'Fund Code': 'fund_code',
+    'Dept Code': 'dept_code',
+    'GL Account': 'account_code',
+    'Fiscal Year': 'fiscal_year',
+    'Budgeted': 'budgeted_amount',
+    'Actuals': 'actual_amount',
+    'Encumbrances': 'encumbered_amount',
+    'Account Description': 'description'
+}, label='Caselle (Harris Computer)')
+
+register_schema('incode', {
+    'Fund Number': 'fund_code',
+    'Department Number': 'dept_code',
+    'Account Number': 'account_code',
+    'Budget Year': 'fiscal_year',
+    'Current Budget': 'budgeted_amount',
+    'YTD Actual': 'actual_amount',
+    'Encumbered': 'encumbered_amount',
+    'Account Name': 'description'
+}, label='Incode (Tyler Technologies)')
+
+register_schema('springbrook', {
+    'Fund #': 'fund_code',
+    'Dept #': 'dept_code',
+    'Account #': 'account_code',
+    'Year': 'fiscal_year',
+    'Amended Budget': 'budgeted_amount',
+    'Actual Amount': 'actual_amount',
+    'Encumbrance Amount': 'encumbered_amount',
+    'Account Title': 'description'
+}, label='Springbrook')
+
+if os.environ.get('BUDGETBUDDY_SCHEMA_FILE'):
+    load_schema_file(os.environ['BUDGETBUDDY_SCHEMA_FILE'])
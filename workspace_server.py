@@ -0,0 +1,927 @@
+"""
+BudgetBuddy Workspace Server
+Multi-tenant HTTP/JSON backend shared by all users of a deployment
+
+Key Functions:
+- Group processed datasets into one workspace per county
+- Keep processed datasets in one memory cache shared by every client, keyed
+  by county and export content, so memory grows with distinct datasets
+  rather than with sessions
+- Process uploads on a bounded worker pool; identical uploads share one job
+- Serve dataset listings, fund summaries, filtered detail pages, rollup
+  sums, compact trend chart series and Parquet downloads over a local JSON API
+- WorkspaceClient: standard-library client used by the Streamlit front end;
+  RemoteDataset reads one dataset through those endpoints, never holding
+  its full detail
+
+Usage:
+    python workspace_server.py [--host 127.0.0.1] [--port 8502] [--workers 4]
+        [--memory-mb 2048]
+
+API:
+    GET    /stats
+    GET    /counties
+    POST   /counties/<county>/uploads?system=auto&name=<file name>  (body: export bytes)
+    GET    /jobs/<job_id>
+    GET    /counties/<county>/datasets
+    GET    /counties/<county>/datasets/<dataset>
+    DELETE /counties/<county>/datasets/<dataset>
+    GET    /counties/<county>/datasets/<dataset>/summary
+    GET    /counties/<county>/datasets/<dataset>/detail?page=0&page_size=100
+        &sort_by=<column>&ascending=1&<filter column>=<value>...
+    GET    /counties/<county>/datasets/<dataset>/trend?by=fund_code&value=budgeted_amount&top=10
+        &rank_by=total&other=1&member=<member>...&<cube dimension>=<value>...
+    GET    /counties/<county>/datasets/<dataset>/rollup?by=<dimension>...&yoy=0
+        &<cube dimension>=<value>...
+    GET    /counties/<county>/datasets/<dataset>/detail.parquet
+    GET    /counties/<county>/datasets/<dataset>/summary.parquet
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from data_ingestion import BudgetDataIngester
+from detail_query import DEFAULT_PAGE_SIZE, FILTER_COLUMNS, RULE_FILTER, DetailQuery
+from ingest_cache import IngestCache
+from job_runner import DEFAULT_MAX_WORKERS, JobRunner, ingest_job
+from memory_cache import MemoryLRU
+from rollup_cube import FilterValues, RollupCube
+from trend_series import DEFAULT_TOP_N
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+DEFAULT_WORKSPACE_DIR = Path(tempfile.gettempdir()) / 'budgetbuddy_workspaces'
+
+# Memory budget for processed datasets and their query indexes, all counties together
+DEFAULT_MEMORY_BYTES = 2 * 1024 ** 3
+
+# Largest export accepted in one upload
+MAX_UPLOAD_BYTES = 512 * 1024 ** 2
+
+# Rows one detail request may return
+MAX_PAGE_SIZE = 5000
+
+# County ids are used in URLs and file names
+COUNTY_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+DATASET_PROCESSING = 'processing'
+DATASET_READY = 'ready'
+DATASET_FAILED = 'failed'
+
+
+class WorkspaceError(Exception):
+    """Request the server cannot serve; carries the HTTP status to answer with"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def county_id(name: str) -> str:
+    """
+    Normalized county id ('Box Elder' -> 'box-elder')
+
+    Raises:
+        WorkspaceError: Name has no usable characters or is too long
+    """
+    county = re.sub(r'[^a-z0-9_-]+', '-', name.strip().lower()).strip('-')
+    if not COUNTY_PATTERN.match(county):
+        raise WorkspaceError(HTTPStatus.BAD_REQUEST, f"Invalid county name: {name!r}")
+    return county
+
+
+def frame_payload(frame: pd.DataFrame) -> Dict:
+    """JSON-ready columns and rows of a (small) frame; missing values become null"""
+    payload = json.loads(frame.to_json(orient='split', index=False))
+    return {'columns': payload['columns'], 'rows': payload['data']}
+
+
+def parquet_bytes(frame: pd.DataFrame) -> bytes:
+    output = BytesIO()
+    frame.to_parquet(output, index=False)
+    return output.getvalue()
+
+
+class CountyWorkspace:
+    """
+    Datasets uploaded for one county
+
+    Holds only dataset records (name, status, row count, validation
+    issues); the processed data itself lives in the server's shared memory
+    cache and the on-disk IngestCache. Records are saved to a JSON index so
+    a restarted server still lists them.
+    """
+
+    def __init__(self, county: str, index_path: Path):
+        self.county = county
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        try:
+            self.datasets: Dict[str, Dict] = json.loads(index_path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.datasets = {}
+        # Jobs interrupted by a restart will never finish
+        for record in self.datasets.values():
+            if record['status'] == DATASET_PROCESSING:
+                record.update(status=DATASET_FAILED, error="server restarted while processing",
+                              job_id=None)
+
+    def save(self):
+        """Write the dataset index (call with lock held)"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        scratch = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        scratch.write_text(json.dumps(self.datasets, indent=2, sort_keys=True))
+        os.replace(scratch, self.index_path)
+
+    def record(self, dataset: str) -> Dict:
+        """
+        Dataset record (a copy)
+
+        Raises:
+            WorkspaceError: Unknown dataset
+        """
+        with self.lock:
+            if dataset not in self.datasets:
+                raise WorkspaceError(HTTPStatus.NOT_FOUND,
+                                     f"No dataset {dataset} in county {self.county}")
+            return dict(self.datasets[dataset])
+
+    def listing(self) -> List[Dict]:
+        """Dataset records, most recently uploaded first"""
+        with self.lock:
+            records = [dict(record) for record in self.datasets.values()]
+        return sorted(records, key=lambda record: record['uploaded'], reverse=True)
+
+
+class WorkspaceRegistry:
+    """County workspaces plus the worker pool and caches they share"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 cache: Optional[IngestCache] = None):
+        """
+        Initialize registry
+
+        Args:
+            root: Folder for workspace indexes. Defaults to
+                BUDGETBUDDY_WORKSPACE_DIR or a folder in the system temp dir.
+            max_workers: Uploads processed concurrently; further uploads queue
+            memory_bytes: Budget of the shared in-memory dataset cache
+            cache: On-disk cache of processed exports (default IngestCache())
+        """
+        root = root or os.environ.get('BUDGETBUDDY_WORKSPACE_DIR') or DEFAULT_WORKSPACE_DIR
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache = cache if cache is not None else IngestCache()
+        self.runner = JobRunner(max_workers=max_workers)
+        self.memory = MemoryLRU(max_bytes=memory_bytes)
+        self._workspaces: Dict[str, CountyWorkspace] = {}
+        self._lock = threading.Lock()
+        # One lock per loaded dataset: reloads happen once, queries do not interleave
+        self._dataset_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def workspace(self, county: str, create: bool = False) -> CountyWorkspace:
+        """
+        Workspace of a county, loaded from its index on first use
+
+        Raises:
+            WorkspaceError: Invalid county, or unknown county when not creating
+        """
+        county = county_id(county)
+        with self._lock:
+            if county not in self._workspaces:
+                index_path = self.root / f"{county}.json"
+                if not create and not index_path.exists():
+                    raise WorkspaceError(HTTPStatus.NOT_FOUND, f"Unknown county: {county}")
+                self._workspaces[county] = CountyWorkspace(county, index_path)
+            return self._workspaces[county]
+
+    def counties(self) -> List[Dict]:
+        """Known counties with their dataset counts"""
+        names = {path.stem for path in self.root.glob('*.json')} | set(self._workspaces)
+        return [
+            {'county': county, 'datasets': len(self.workspace(county).datasets)}
+            for county in sorted(names) if COUNTY_PATTERN.match(county)
+        ]
+
+    def upload(self, county: str, data: bytes, system_type: str = 'auto',
+               name: Optional[str] = None) -> Dict:
+        """
+        Register an export with a county and process it unless already known
+
+        The dataset id derives from the export's content, system type and
+        ingester version, so every client uploading the same export shares
+        one dataset and, while it is processing, one job.
+
+        Args:
+            county: County name or id
+            data: Raw export bytes (CSV or Excel)
+            system_type: Vendor schema name or 'auto'
+            name: Original file name
+
+        Returns:
+            Dataset record (status 'processing' with a job_id, or 'ready')
+        """
+        workspace = self.workspace(county, create=True)
+        system_type = system_type.lower()
+        dataset = self.cache.make_key(data, system_type)
+        with workspace.lock:
+            record = workspace.datasets.get(dataset)
+            if record is not None and record['status'] != DATASET_FAILED:
+                if record['status'] == DATASET_PROCESSING or self._is_available(workspace, dataset):
+                    return dict(record)
+            record = {
+                'dataset': dataset,
+                'county': workspace.county,
+                'name': name or f"upload-{dataset[:8]}",
+                'requested_system': system_type,
+                'system_type': None,
+                'bytes': len(data),
+                'uploaded': time.time(),
+                'status': DATASET_PROCESSING,
+                'rows': None,
+                'is_valid': None,
+                'issues': [],
+                'error': None,
+            }
+            record['job_id'] = self.runner.submit(
+                self._ingest, workspace, dataset, data, system_type, name,
+                label=record['name'], owner=workspace.county
+            )
+            workspace.datasets[dataset] = record
+            workspace.save()
+            return dict(record)
+
+    def _is_available(self, workspace: CountyWorkspace, dataset: str) -> bool:
+        """Processed data is in memory or still in the on-disk cache"""
+        return (workspace.county, dataset) in self.memory or self.cache.contains(dataset)
+
+    def _ingest(self, workspace: CountyWorkspace, dataset: str, data: bytes, system_type: str,
+                name: Optional[str], progress=None):
+        """Job function: process an upload and publish it to the workspace"""
+        try:
+            result = ingest_job(data, system_type, cache=self.cache, name=name, progress=progress)
+        except Exception as e:
+            with workspace.lock:
+                # Forgotten while the job ran: nothing left to mark failed
+                if dataset in workspace.datasets:
+                    workspace.datasets[dataset].update(status=DATASET_FAILED, job_id=None,
+                                                       error=f"{type(e).__name__}: {e}")
+                    workspace.save()
+            raise
+        ingester, is_valid, issues = result
+        with workspace.lock:
+            # Forgotten while the job ran: don't resurrect it in memory
+            if dataset not in workspace.datasets:
+                return dataset
+            self.memory.put((workspace.county, dataset), result)
+            workspace.datasets[dataset].update(
+                status=DATASET_READY, job_id=None, rows=len(ingester.standardized_data),
+                system_type=ingester.detected_system, is_valid=is_valid, issues=issues
+            )
+            workspace.save()
+        return dataset
+
+    def job(self, job_id: str) -> Dict:
+        """
+        Status of an upload job
+
+        Raises:
+            WorkspaceError: Unknown or expired job
+        """
+        status = self.runner.status(job_id)
+        if status is None:
+            raise WorkspaceError(HTTPStatus.NOT_FOUND, f"Unknown job: {job_id}")
+        return status
+
+    def _dataset_lock(self, county: str, dataset: str) -> threading.Lock:
+        with self._lock:
+            return self._dataset_locks.setdefault((county, dataset), threading.Lock())
+
+    def load(self, county: str, dataset: str) -> Tuple[BudgetDataIngester, bool, List[str]]:
+        """
+        Processed dataset from memory, reloaded from the on-disk cache if evicted
+
+        Returns:
+            (ingester holding the cleaned data, is_valid, validation issues)
+
+        Raises:
+            WorkspaceError: Unknown dataset, not processed (yet), or no
+                longer cached (upload it again)
+        """
+        workspace = self.workspace(county)
+        record = workspace.record(dataset)
+        if record['status'] != DATASET_READY:
+            raise WorkspaceError(HTTPStatus.CONFLICT,
+                                 f"Dataset {dataset} is {record['status']}: {record['error'] or ''}"
+                                 .rstrip(': '))
+        key = (workspace.county, dataset)
+        result = self.memory.get(key)
+        if result is not None:
+            return result
+        with self._dataset_lock(*key):
+            result = self.memory.get(key)
+            if result is None:
+                cached = self.cache.get(dataset)
+                if cached is None:
+                    raise WorkspaceError(HTTPStatus.GONE,
+                                         f"Dataset {dataset} is no longer cached; upload it again")
+                detail, summary, metadata = cached
+                ingester = BudgetDataIngester(system_type=record['requested_system'])
+                ingester.standardized_data = detail
+                ingester._fund_summary = summary
+                ingester.detected_system = metadata.get('system_type', ingester.detected_system)
+                ingester.restore_column_map(metadata)
+                result = (ingester, metadata['is_valid'], metadata['issues'])
+                self.memory.put(key, result)
+        return result
+
+    def query(self, county: str, dataset: str) -> Tuple[DetailQuery, threading.Lock]:
+        """Indexed query layer over a dataset (shared by all clients) and its lock"""
+        ingester, is_valid, _ = self.load(county, dataset)
+        key = (county_id(county), dataset)
+        lock = self._dataset_lock(*key)
+        with lock:
+            query = self.memory.get(('query',) + key)
+            if query is None:
+                if not is_valid:
+                    ingester.invalid_rows()  # make sure row flags exist
+                query = DetailQuery(ingester.standardized_data, ingester.validation_flags)
+                # Indexes hold one position per row for each filter column
+                self.memory.put(('query',) + key, query, size=len(query) * 8 * len(FILTER_COLUMNS))
+        return query, lock
+
+    def detail_page(self, county: str, dataset: str, page: int = 0,
+                    page_size: int = DEFAULT_PAGE_SIZE,
+                    filters: Optional[Dict[str, List[str]]] = None,
+                    sort_by: Optional[str] = None, ascending: bool = True) -> Dict:
+        """
+        One page of detail rows
+
+        Args:
+            county, dataset: Dataset to query
+            page: Zero-based page number
+            page_size: Rows per page (at most MAX_PAGE_SIZE)
+            filters: Column (or RULE_FILTER) -> allowed values as strings
+            sort_by: Column to order by (default: file order)
+            ascending: Sort direction
+
+        Returns:
+            Page payload: columns, rows, total matching rows, filter options,
+            rows breaking each validation rule
+        """
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, f"page_size must be 1-{MAX_PAGE_SIZE}")
+        query, lock = self.query(county, dataset)
+        columns = list(query.df.columns)
+        if sort_by is not None and sort_by not in columns:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, f"Unknown sort column: {sort_by}")
+        with lock:
+            # Query strings carry text; match it against each column's own values
+            typed = {}
+            for col, values in (filters or {}).items():
+                if col == RULE_FILTER:
+                    typed[col] = values
+                elif col in FILTER_COLUMNS and col in columns:
+                    options = {str(option): option for option in query.options(col)}
+                    typed[col] = [options[value] for value in values if value in options] or [None]
+                else:
+                    raise WorkspaceError(HTTPStatus.BAD_REQUEST, f"Cannot filter on {col}")
+            try:
+                rows, total = query.page(page, page_size, typed, sort_by, ascending)
+            except (KeyError, ValueError) as e:
+                raise WorkspaceError(HTTPStatus.BAD_REQUEST, str(e))
+            options = {col: [str(option) for option in query.options(col)]
+                       for col in FILTER_COLUMNS if col in columns}
+            rule_counts = query.rule_counts()
+        return {**frame_payload(rows), 'total': total, 'rows_total': len(query),
+                'page': min(max(page, 0), max((total - 1) // page_size, 0)),
+                'page_size': page_size, 'options': options, 'rule_counts': rule_counts}
+
+    def rollup(self, county: str, dataset: str, by: Optional[List[str]] = None,
+               filters: Optional[Dict[str, List[str]]] = None, yoy: bool = False) -> Dict:
+        """
+        Amount sums for one cut of a dataset, from its rollup cube
+
+        Args:
+            county, dataset: Dataset to query
+            by: Dimensions to group by (none: grand totals)
+            filters: Dimension -> allowed values as strings
+            yoy: Add prior-year comparisons (see RollupCube.year_over_year)
+
+        Returns:
+            {'dimensions': cube dimensions, 'columns', 'rows'}
+        """
+        ingester, _, _ = self.load(county, dataset)
+        cube = ingester.get_rollup_cube()
+        filters = {col: values for col, values in (filters or {}).items() if values}
+        try:
+            if 'fiscal_year' in filters:
+                filters['fiscal_year'] = [int(year) for year in filters['fiscal_year']]
+            if yoy:
+                sums = cube.year_over_year(by or [], filters)
+            else:
+                sums = cube.query(by or [], filters)
+        except ValueError as e:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, str(e))
+        return {'dimensions': list(cube.dimensions), **frame_payload(sums)}
+
+    def forget(self, county: str, dataset: str) -> Dict:
+        """Remove a dataset from a county's workspace (the on-disk cache keeps it)"""
+        workspace = self.workspace(county)
+        with workspace.lock:
+            record = workspace.datasets.pop(dataset, None)
+            if record is None:
+                raise WorkspaceError(HTTPStatus.NOT_FOUND,
+                                     f"No dataset {dataset} in county {workspace.county}")
+            if record['job_id']:
+                self.runner.cancel(record['job_id'])
+            workspace.save()
+        self.memory.invalidate(lambda key: key[-2:] == (workspace.county, dataset))
+        with self._lock:
+            self._dataset_locks.pop((workspace.county, dataset), None)
+        return record
+
+    def stats(self) -> Dict:
+        """Shared cache and worker pool figures"""
+        jobs = self.runner.jobs()
+        return {
+            'counties': len(self.counties()),
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory.size_bytes,
+            'memory_max_bytes': self.memory.max_bytes,
+            'memory_hits': self.memory.hits,
+            'memory_misses': self.memory.misses,
+            'disk_cache_bytes': self.cache.size_bytes(),
+            'jobs_active': sum(job['status'] in ('queued', 'running') for job in jobs),
+            'jobs_total': len(jobs),
+        }
+
+    def shutdown(self):
+        self.runner.shutdown(wait=False)
+
+
+# Route pattern -> handler method name, per HTTP method
+_COUNTY = r'/counties/(?P<county>[^/]+)'
+_DATASET = _COUNTY + r'/datasets/(?P<dataset>[0-9a-f]+)'
+ROUTES = {
+    'GET': [
+        (r'/stats', 'get_stats'),
+        (r'/counties', 'get_counties'),
+        (r'/jobs/(?P<job_id>[0-9a-f]+)', 'get_job'),
+        (_COUNTY + r'/datasets', 'get_datasets'),
+        (_DATASET, 'get_dataset'),
+        (_DATASET + r'/summary', 'get_summary'),
+        (_DATASET + r'/detail', 'get_detail'),
+        (_DATASET + r'/trend', 'get_trend'),
+        (_DATASET + r'/rollup', 'get_rollup'),
+        (_DATASET + r'/detail\.parquet', 'get_detail_parquet'),
+        (_DATASET + r'/summary\.parquet', 'get_summary_parquet'),
+    ],
+    'POST': [
+        (_COUNTY + r'/uploads', 'post_upload'),
+    ],
+    'DELETE': [
+        (_DATASET, 'delete_dataset'),
+    ],
+}
+
+
+class WorkspaceHandler(BaseHTTPRequestHandler):
+    """JSON API over the server's WorkspaceRegistry"""
+
+    server_version = 'BudgetBuddyWorkspace/1.0'
+
+    @property
+    def registry(self) -> WorkspaceRegistry:
+        return self.server.registry
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str):
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        try:
+            for pattern, handler in ROUTES[method]:
+                match = re.fullmatch(pattern, url.path.rstrip('/') or '/')
+                if match:
+                    args = {key: urllib.parse.unquote(value) for key, value in match.groupdict().items()}
+                    getattr(self, handler)(params, **args)
+                    return
+            raise WorkspaceError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+        except WorkspaceError as e:
+            self._send_json({'error': str(e)}, e.status)
+        except Exception as e:
+            self._send_json({'error': f"{type(e).__name__}: {e}"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def _send(self, body: bytes, content_type: str, status: int = HTTPStatus.OK):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status: int = HTTPStatus.OK):
+        self._send(json.dumps(payload).encode(), 'application/json', status)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @staticmethod
+    def _param(params: Dict[str, List[str]], name: str, default=None):
+        return params[name][-1] if name in params else default
+
+    def get_stats(self, params):
+        self._send_json(self.registry.stats())
+
+    def get_counties(self, params):
+        self._send_json(self.registry.counties())
+
+    def get_job(self, params, job_id):
+        self._send_json(self.registry.job(job_id))
+
+    def get_datasets(self, params, county):
+        self._send_json(self.registry.workspace(county).listing())
+
+    def get_dataset(self, params, county, dataset):
+        self._send_json(self.registry.workspace(county).record(dataset))
+
+    def delete_dataset(self, params, county, dataset):
+        self._send_json(self.registry.forget(county, dataset))
+
+    def get_summary(self, params, county, dataset):
+        ingester, _, _ = self.registry.load(county, dataset)
+        self._send_json(frame_payload(ingester.get_fund_summary()))
+
+    def get_detail(self, params, county, dataset):
+        try:
+            page = int(self._param(params, 'page', 0))
+            page_size = int(self._param(params, 'page_size', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, "page and page_size must be integers")
+        filters = {col: values for col, values in params.items()
+                   if col not in ('page', 'page_size', 'sort_by', 'ascending')}
+        ascending = self._param(params, 'ascending', '1').lower() not in ('0', 'false', 'no')
+        self._send_json(self.registry.detail_page(
+            county, dataset, page, page_size, filters, self._param(params, 'sort_by'), ascending
+        ))
+
+    def get_trend(self, params, county, dataset):
+        ingester, _, _ = self.registry.load(county, dataset)
+        trends = ingester.get_trend_series()
+        try:
+            top = self._param(params, 'top', str(DEFAULT_TOP_N))
+            top_n = None if top.lower() in ('all', '0') else int(top)
+        except ValueError:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, "top must be an integer or 'all'")
+        filters = {col: values for col, values in params.items() if col in trends.cube.dimensions}
+        try:
+            if 'fiscal_year' in filters:
+                filters['fiscal_year'] = [int(year) for year in filters['fiscal_year']]
+            payload = trends.payload(
+                by=self._param(params, 'by', 'fund_code'),
+                value_column=self._param(params, 'value', 'budgeted_amount'),
+                top_n=top_n, filters=filters, members=params.get('member'),
+                other=self._param(params, 'other', '1').lower() not in ('0', 'false', 'no'),
+                rank_by=self._param(params, 'rank_by', 'total')
+            )
+        except ValueError as e:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, str(e))
+        self._send_json(payload)
+
+    def get_rollup(self, params, county, dataset):
+        filters = {col: values for col, values in params.items() if col not in ('by', 'yoy')}
+        yoy = self._param(params, 'yoy', '0').lower() not in ('0', 'false', 'no')
+        self._send_json(self.registry.rollup(county, dataset, params.get('by'), filters, yoy))
+
+    def get_detail_parquet(self, params, county, dataset):
+        ingester, _, _ = self.registry.load(county, dataset)
+        self._send(parquet_bytes(ingester.standardized_data), 'application/octet-stream')
+
+    def get_summary_parquet(self, params, county, dataset):
+        ingester, _, _ = self.registry.load(county, dataset)
+        self._send(parquet_bytes(ingester.get_fund_summary()), 'application/octet-stream')
+
+    def post_upload(self, params, county):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            raise WorkspaceError(HTTPStatus.BAD_REQUEST, "Upload body is empty")
+        if length > self.server.max_upload_bytes:
+            raise WorkspaceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                 f"Upload exceeds {self.server.max_upload_bytes:,} bytes")
+        data = self.rfile.read(length)
+        record = self.registry.upload(county, data, self._param(params, 'system', 'auto'),
+                                      self._param(params, 'name'))
+        status = HTTPStatus.ACCEPTED if record['status'] == DATASET_PROCESSING else HTTPStatus.OK
+        self._send_json(record, status)
+
+
+class WorkspaceServer(ThreadingHTTPServer):
+    """HTTP server answering each request on its own thread"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], registry: WorkspaceRegistry,
+                 max_upload_bytes: int = MAX_UPLOAD_BYTES, verbose: bool = False):
+        super().__init__(address, WorkspaceHandler)
+        self.registry = registry
+        self.max_upload_bytes = max_upload_bytes
+        self.verbose = verbose
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class WorkspaceClient:
+    """Client of a workspace server (standard library HTTP)"""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 60.0):
+        """
+        Initialize client
+
+        Args:
+            base_url: Server address. Defaults to BUDGETBUDDY_SERVER_URL or
+                the local default port.
+            timeout: Seconds to wait for each response
+        """
+        base_url = base_url or os.environ.get('BUDGETBUDDY_SERVER_URL') \
+            or f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, params: Optional[Dict] = None,
+                 body: Optional[bytes] = None) -> bytes:
+        url = self.base_url + path
+        if params:
+            url += '?' + urllib.parse.urlencode(
+                {key: value for key, value in params.items() if value is not None}, doseq=True
+            )
+        request = urllib.request.Request(url, data=body, method=method)
+        if body is not None:
+            request.add_header('Content-Type', 'application/octet-stream')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read())['error']
+            except (ValueError, KeyError):
+                message = e.reason
+            raise WorkspaceError(e.code, message) from None
+
+    def _json(self, method: str, path: str, params: Optional[Dict] = None,
+              body: Optional[bytes] = None):
+        return json.loads(self._request(method, path, params, body))
+
+    @staticmethod
+    def _dataset_path(county: str, dataset: str) -> str:
+        return f"/counties/{urllib.parse.quote(county_id(county))}/datasets/{dataset}"
+
+    def stats(self) -> Dict:
+        return self._json('GET', '/stats')
+
+    def counties(self) -> List[Dict]:
+        return self._json('GET', '/counties')
+
+    def upload(self, county: str, data: bytes, system_type: str = 'auto',
+               name: Optional[str] = None) -> Dict:
+        """Send an export; returns its dataset record (check status/job_id)"""
+        return self._json('POST', f"/counties/{urllib.parse.quote(county_id(county))}/uploads",
+                          {'system': system_type, 'name': name}, data)
+
+    def job(self, job_id: str) -> Dict:
+        return self._json('GET', f"/jobs/{job_id}")
+
+    def datasets(self, county: str) -> List[Dict]:
+        return self._json('GET', f"/counties/{urllib.parse.quote(county_id(county))}/datasets")
+
+    def dataset(self, county: str, dataset: str) -> Dict:
+        return self._json('GET', self._dataset_path(county, dataset))
+
+    def forget(self, county: str, dataset: str) -> Dict:
+        return self._json('DELETE', self._dataset_path(county, dataset))
+
+    def summary(self, county: str, dataset: str) -> pd.DataFrame:
+        """Fund summary of a processed dataset"""
+        return pd.read_parquet(BytesIO(self._request(
+            'GET', self._dataset_path(county, dataset) + '/summary.parquet'
+        )))
+
+    def detail_parquet(self, county: str, dataset: str) -> bytes:
+        """Full cleaned detail of a processed dataset as a Parquet file"""
+        return self._request('GET', self._dataset_path(county, dataset) + '/detail.parquet')
+
+    def detail(self, county: str, dataset: str) -> pd.DataFrame:
+        """Full cleaned detail of a processed dataset"""
+        return pd.read_parquet(BytesIO(self.detail_parquet(county, dataset)))
+
+    def detail_page(self, county: str, dataset: str, page: int = 0,
+                    page_size: int = DEFAULT_PAGE_SIZE,
+                    filters: Optional[Dict[str, List]] = None,
+                    sort_by: Optional[str] = None,
+                    ascending: bool = True) -> Tuple[pd.DataFrame, Dict]:
+        """
+        One page of detail rows filtered on the server
+
+        Returns:
+            (page rows, rest of the page payload: total, rows_total, page,
+            page_size, options, rule_counts)
+        """
+        params = {'page': page, 'page_size': page_size, 'sort_by': sort_by,
+                  'ascending': int(ascending)}
+        for col, values in (filters or {}).items():
+            if values:
+                params[col] = [str(value) for value in values]
+        payload = self._json('GET', self._dataset_path(county, dataset) + '/detail', params)
+        rows = pd.DataFrame(payload.pop('rows'), columns=payload.pop('columns'))
+        return rows, payload
+
+    def rollup(self, county: str, dataset: str, by: Optional[List[str]] = None,
+               filters: Optional[Dict[str, List]] = None, yoy: bool = False) -> Dict:
+        """Amount sums for one cut of the data (see WorkspaceRegistry.rollup)"""
+        params = {'by': list(by or []), 'yoy': int(yoy)}
+        for col, values in (filters or {}).items():
+            params[col] = [str(value) for value in values] if isinstance(values, (list, tuple)) else str(values)
+        return self._json('GET', self._dataset_path(county, dataset) + '/rollup', params)
+
+    def trend(self, county: str, dataset: str, by: str = 'fund_code',
+              value_column: str = 'budgeted_amount', top_n: Optional[int] = DEFAULT_TOP_N,
+              filters: Optional[Dict[str, List]] = None, members: Optional[List[str]] = None,
+              other: bool = True, rank_by: str = 'total') -> Dict:
+        """Compact trend chart payload (see TrendSeries.payload)"""
+        params = {'by': by, 'value': value_column, 'top': top_n or 'all', 'other': int(other),
+                  'rank_by': rank_by, 'member': members}
+        for col, values in (filters or {}).items():
+            params[col] = [str(value) for value in values] if isinstance(values, (list, tuple)) else str(values)
+        return self._json('GET', self._dataset_path(county, dataset) + '/trend', params)
+
+    def open(self, county: str, dataset: str) -> 'RemoteDataset':
+        """Handle on a processed dataset for the front end's views"""
+        return RemoteDataset(self, self.dataset(county, dataset))
+
+
+class RemoteCube:
+    """Rollup cube of a server-side dataset; every query runs on the server"""
+
+    def __init__(self, client: WorkspaceClient, county: str, dataset: str):
+        self.client = client
+        self.county = county
+        self.dataset = dataset
+        self._dimensions: Optional[List[str]] = None
+
+    def _rollup(self, by: Sequence[str], filters: Optional[Dict[str, List]], yoy: bool = False) -> pd.DataFrame:
+        payload = self.client.rollup(self.county, self.dataset, list(by),
+                                     RollupCube._normalize_filters(filters), yoy)
+        self._dimensions = payload['dimensions']
+        return pd.DataFrame(payload['rows'], columns=payload['columns'])
+
+    @property
+    def dimensions(self) -> List[str]:
+        if self._dimensions is None:
+            self._rollup([], None)
+        return self._dimensions
+
+    def query(self, by: Sequence[str] = ('fiscal_year',),
+              filters: Optional[FilterValues] = None) -> pd.DataFrame:
+        """See RollupCube.query"""
+        return self._rollup(by, filters)
+
+    def drill_down(self, path: Optional[Dict[str, object]] = None,
+                   level: str = 'dept_code', by_year: bool = True) -> pd.DataFrame:
+        """See RollupCube.drill_down"""
+        by = [level] + (['fiscal_year'] if by_year and 'fiscal_year' in self.dimensions else [])
+        return self._rollup(by, path)
+
+    def year_over_year(self, by: Sequence[str] = ('fund_code',),
+                       filters: Optional[FilterValues] = None) -> pd.DataFrame:
+        """See RollupCube.year_over_year"""
+        return self._rollup(by, filters, yoy=True)
+
+
+class RemoteTrendSeries:
+    """Trend chart payloads of a server-side dataset"""
+
+    def __init__(self, client: WorkspaceClient, county: str, dataset: str):
+        self.client = client
+        self.county = county
+        self.dataset = dataset
+
+    def payload(self, by: str = 'fund_code', value_column: str = 'budgeted_amount',
+                top_n: Optional[int] = DEFAULT_TOP_N,
+                filters: Optional[FilterValues] = None,
+                members: Optional[Sequence[str]] = None,
+                other: bool = True, rank_by: str = 'total') -> Dict:
+        """See TrendSeries.payload"""
+        return self.client.trend(self.county, self.dataset, by, value_column, top_n,
+                                 RollupCube._normalize_filters(filters),
+                                 list(members) if members is not None else None, other, rank_by)
+
+
+class RemoteDataset:
+    """
+    Processed dataset on a workspace server, standing in for a local ingester
+
+    Views read the fund summary, rollup sums, detail pages and trend series
+    from the server; the full detail is only fetched for file exports.
+    """
+
+    def __init__(self, client: WorkspaceClient, record: Dict):
+        """
+        Args:
+            client: Client of the server holding the dataset
+            record: Dataset record (see CountyWorkspace); must be ready
+        """
+        self.client = client
+        self.county = record['county']
+        self.dataset = record['dataset']
+        self.rows = record['rows']
+        self.detected_system = record['system_type']
+        self.is_valid = record['is_valid']
+        self.issues = record['issues']
+        self._fund_summary: Optional[pd.DataFrame] = None
+        self._rollup_cube = RemoteCube(client, self.county, self.dataset)
+        self._trend_series = RemoteTrendSeries(client, self.county, self.dataset)
+
+    def get_fund_summary(self) -> pd.DataFrame:
+        """Fund summary, fetched once"""
+        if self._fund_summary is None:
+            self._fund_summary = self.client.summary(self.county, self.dataset)
+        return self._fund_summary.copy()
+
+    def get_rollup_cube(self) -> RemoteCube:
+        return self._rollup_cube
+
+    def get_trend_series(self) -> RemoteTrendSeries:
+        return self._trend_series
+
+    def detail_page(self, page: int = 0, page_size: int = DEFAULT_PAGE_SIZE,
+                    filters: Optional[Dict[str, List]] = None, sort_by: Optional[str] = None,
+                    ascending: bool = True) -> Tuple[pd.DataFrame, Dict]:
+        """See WorkspaceClient.detail_page"""
+        return self.client.detail_page(self.county, self.dataset, page, page_size,
+                                       filters, sort_by, ascending)
+
+    def detail(self) -> pd.DataFrame:
+        """Full cleaned detail (large; for file exports only)"""
+        return self.client.detail(self.county, self.dataset)
+
+    def detail_parquet(self) -> bytes:
+        """Full cleaned detail as the server's Parquet file"""
+        return self.client.detail_parquet(self.county, self.dataset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Uploads processed concurrently")
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_BYTES // 1024 ** 2,
+                        help="Memory budget for processed datasets, all counties together")
+    parser.add_argument('--workspace-dir', default=None,
+                        help="Folder for workspace indexes (default: BUDGETBUDDY_WORKSPACE_DIR)")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    registry = WorkspaceRegistry(args.workspace_dir, max_workers=args.workers,
+                                 memory_bytes=args.memory_mb * 1024 ** 2)
+    server = WorkspaceServer((args.host, args.port), registry, verbose=args.verbose)
+    print(f"✓ BudgetBuddy workspace server on {server.url} "
+          f"({args.workers} workers, {args.memory_mb:,} MB dataset memory)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        registry.shutdown()
+
+
+if __name__ == "__main__":
+    main()